@@ -6,46 +6,46 @@ from dotenv import load_dotenv
 from typing import List, Dict, Optional
 import json
 import asyncio
-import shutil # 파일 저장을 위한 shutil 임포트
+import time
+from contextvars import ContextVar
 
 # FastAPI 및 관련 모듈 임포트
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel # 요청 바디 유효성 검사를 위한 Pydantic BaseModel
 
 # LangChain 패키지
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+# 무거운 모듈(langchain_openai, 체인/에이전트, FAISS, 문서 로더)은 처음 사용할 때 임포트하여 기동 시간을 줄입니다.
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder # MessagesPlaceholder 추가
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, UnstructuredWordDocumentLoader # DOCX 로더 추가
-
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain.chains import create_retrieval_chain
 from langchain_core.output_parsers import JsonOutputParser
-from langchain.tools import tool # @tool 데코레이터 사용을 위해 임포트
-from langchain.agents import AgentExecutor, create_tool_calling_agent # AgentExecutor 관련 임포트
+from langchain_core.tools import tool # @tool 데코레이터 사용을 위해 임포트
 from langchain_core.messages import HumanMessage, AIMessage # 대화 기록용
 
-# 'unstructured' 라이브러리 설치 안내 (DOCX 지원용)
-try:
-    from unstructured.partition.auto import partition
-except ImportError:
-    print("경고: 'unstructured' 라이브러리가 설치되지 않았습니다.")
-    print("DOCX 파일 처리를 위해 'pip install unstructured'를 실행해주세요.")
-    print("또한, 'unstructured[docx]' 설치가 필요할 수 있습니다.")
-
+from vector_store_registry import VectorStoreRegistry, compute_file_hash, remember_file_hash # 업로드 시 생성한 벡터 저장소 재사용
+from shared_vector_index import SharedVectorIndex # 사용자 공통(멀티 테넌트) 벡터 인덱스
+from faiss_index_store import FaissIndexStore # 벡터 인덱스 디스크 저장/로드
+from local_cache import LruSqliteCache # 메모리 LRU + SQLite 캐시
+from embedding_cache import CachedEmbeddings # 청크 단위 임베딩 캐시
+from embedding_backends import EmbeddingBackend # 설정으로 선택하는 임베딩 백엔드
+from model_clients import ModelClients # 공유 HTTP 연결 풀을 사용하는 LLM/임베딩 클라이언트
+from embedding_pipeline import build_faiss_from_documents # 배치 단위 동시 임베딩
+from ingestion_jobs import IngestionJobManager, JOB_FAILED # 백그라운드 이력서 수집 작업
+from upload_storage import UploadSizeLimitMiddleware, UploadTooLargeError, save_upload_streaming # 스트리밍 업로드 저장
+from document_processing import CHUNK_SIZE_UNIT, deduplicate_documents, extract_documents, split_documents # 문서 추출/분할/중복 제거 (프로세스 풀)
+from chunk_dedup import strip_repeated_lines # 페이지마다 반복되는 머리말/꼬리말 제거
+from extracted_text_store import ExtractedTextStore # 파일 해시별 추출 텍스트 저장소
+from token_budget import get_packing_stats, pack_documents # 프롬프트 {context} 토큰 예산
+from full_context import ContextRouter, FullDocumentRetriever, PATH_FULL_CONTEXT, PATH_RETRIEVAL # 짧은 문서 전체 텍스트 사용
+from resume_sections import SECTION_EXPERIENCE, SECTION_INTRODUCTION, SECTION_PROJECTS, SECTION_SKILLS # 이력서 섹션 라벨
+from resume_profile import ResumeProfileStore, extract_profile, format_profile # 업로드 시 추출한 이력서 프로필
+from tool_response_cache import ToolResponseCache # 같은 입력의 툴 결과 캐시
+from latency_stats import LatencyStats # 모드별 처리 시간 통계
 
 # 환경 변수에서 API 키 가져오기
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
-
-print(f"OPENAI_API_KEY 로드 완료: {OPENAI_API_KEY[:5]}...") # 보안을 위해 앞부분만 출력
-
 # FastAPI 앱 초기화
 app = FastAPI(
     title="AI Career Assistant API",
@@ -64,79 +64,344 @@ app.add_middleware(
 
 # 서버 측에서 사용자별 벡터 저장소 및 대화 기록을 관리하기 위한 딕셔너리
 # 실제 프로덕션 환경에서는 데이터베이스(예: Firestore)를 사용하는 것이 좋습니다.
-user_data_store = {} # {user_id: {'vectorstore': ..., 'file_path': ..., 'chat_history': []}}
+user_data_store = {} # {user_id: {'file_path': ..., 'ingestion_job_id': ..., 'chat_history': []}}
 
 # 파일 업로드 경로 설정
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.state.UPLOAD_FOLDER = UPLOAD_FOLDER # FastAPI 앱 상태에 저장
 
+# LLM/임베딩 API 호출이 공유하는 HTTP 연결 풀 (요청마다 클라이언트를 만들지 않고 keep-alive 연결을 재사용)
+CHAT_MODEL = 'gpt-3.5-turbo'
+model_clients = ModelClients(
+    OPENAI_API_KEY,
+    CHAT_MODEL,
+    max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")),
+    keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30")),
+    timeout=float(os.getenv("OPENAI_TIMEOUT", "60")),
+)
+
+# 임베딩 백엔드 설정 (openai | local | hashing | fake)
+# openai 이외의 백엔드는 네트워크 없이 문서 수집이 가능하므로 오프라인 실행/부하 테스트에 사용합니다.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL") # 비어 있으면 백엔드별 기본 모델 사용
+# 임베딩 벡터 차원 (text-embedding-3 계열은 256/512/1024 등으로 축소 가능, 비어 있으면 모델 기본 차원)
+# 인덱스 메타데이터에 기록되며, 다른 차원으로 만든 인덱스는 사용하지 않습니다.
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+embedding_backend = EmbeddingBackend(
+    EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, api_key=OPENAI_API_KEY, http_clients=model_clients
+)
+
+# 청크 임베딩 캐시 (메모리 LRU + 업로드 볼륨의 SQLite 파일)
+# 같은 텍스트(재업로드, 여러 사용자가 올린 같은 파일, 중복 청크)는 임베딩 API를 다시 호출하지 않습니다.
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2000"))
+embedding_cache = LruSqliteCache(
+    os.path.join(UPLOAD_FOLDER, ".cache", "embeddings.sqlite3"),
+    table="embeddings",
+    max_items=EMBEDDING_CACHE_SIZE,
+)
+
+# 임베딩 배치 설정 (배치 크기, 동시에 진행할 최대 요청 수, 배치별 재시도 횟수)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+# 임베딩 전 중복 청크 제거 (완전히 같은 청크 + 글자 n-gram Jaccard 유사도가 임계값 이상인 청크, 1 이상이면 완전히 같은 청크만)
+CHUNK_DEDUP_ENABLED = os.getenv("CHUNK_DEDUP_ENABLED", "true").lower() == "true"
+CHUNK_DEDUP_THRESHOLD = float(os.getenv("CHUNK_DEDUP_THRESHOLD", "0.85"))
+
+def _get_embeddings():
+    return CachedEmbeddings(embedding_backend.get(), embedding_cache, embedding_backend.backend_id)
+
+# 이력서별 벡터 인덱스 저장 경로 (업로드 볼륨에 저장되어 재시작/재배포 후에도 유지됨)
+INDEX_FOLDER = os.path.join(UPLOAD_FOLDER, ".indexes")
+faiss_index_store = FaissIndexStore(
+    INDEX_FOLDER, _get_embeddings, embedding_backend.backend_id, CHUNK_SIZE_UNIT, embedding_backend.dimensions
+)
+
+# 파일 해시별 추출 텍스트 저장 경로 (청크 파라미터를 바꾸거나 인덱스를 다시 만들 때 문서를 다시 파싱하지 않음)
+TEXT_FOLDER = os.path.join(UPLOAD_FOLDER, ".text")
+extracted_text_store = ExtractedTextStore(TEXT_FOLDER)
+
+# 파일 경로 / 내용 해시 / 청크 파라미터별 벡터 저장소 레지스트리
+# 파일별 인덱스를 디스크에서 로드하거나 새로 생성/저장하며, 같은 파일을 동시에 중복 생성하지 않도록 합니다.
+# 생성/로드한 인덱스는 메모리에 보관하지 않고 아래 공유 인덱스로 복사합니다.
+vector_store_registry = VectorStoreRegistry(faiss_index_store, keep_in_memory=False)
+
+# 모든 사용자의 청크 벡터를 담는 공유 인덱스 (청크마다 user_id/file_hash 메타데이터, 검색은 사용자별로 제한)
+# 사용자마다 FAISS 객체를 따로 두지 않아 사용자 수가 많아도 메모리 오버헤드가 작습니다.
+# VECTOR_INDEX_TYPE으로 벡터 저장 방식을 선택합니다. (flat | sq_fp16 | sq8 | ivfpq, flat 이외는 근사 벡터로 메모리 절약)
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+IVFPQ_NLIST = int(os.getenv("IVFPQ_NLIST", "64"))
+IVFPQ_M = int(os.getenv("IVFPQ_M", "64"))
+IVFPQ_TRAIN_SIZE = int(os.getenv("IVFPQ_TRAIN_SIZE", "10000"))
+shared_vector_index = SharedVectorIndex(
+    _get_embeddings, VECTOR_INDEX_TYPE, ivf_nlist=IVFPQ_NLIST, pq_m=IVFPQ_M, train_size=IVFPQ_TRAIN_SIZE
+)
+
+# 현재 요청의 사용자 ID (툴이 공유 인덱스에서 해당 사용자의 벡터만 검색하도록 채팅 요청에서 설정)
+current_user_id: ContextVar[str] = ContextVar("current_user_id", default="anonymous_user")
+
+# 이력서 수집(파싱/분할/임베딩/인덱싱) 백그라운드 작업자 풀
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+ingestion_jobs = IngestionJobManager(max_workers=INGESTION_WORKERS)
+
+# 채팅 요청 시 진행 중인 수집 작업을 기다리는 최대 시간(초)
+CHAT_INDEX_WAIT_SECONDS = float(os.getenv("CHAT_INDEX_WAIT_SECONDS", "20"))
+
+# 툴 프롬프트의 {context}에 넣을 검색 결과의 최대 토큰 수 (0이면 제한 없음)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# 툴의 검색 방식 (hybrid: 벡터 + BM25 키워드 순위 융합, similarity: 벡터 검색만)
+# hybrid는 기술 이름을 그대로 언급한 청크를 놓치지 않으므로 더 적은 청크(k)로 짧은 프롬프트를 만듭니다.
+RETRIEVAL_SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "hybrid")
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "3" if RETRIEVAL_SEARCH_TYPE == "hybrid" else "5"))
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20")) # 융합 전 각 검색에서 가져올 후보 수
+# 섹션을 지정한 툴이 사용할 최대 청크 수 (해당 섹션 청크가 이 수 이하이면 임베딩/검색 없이 그대로 사용)
+SECTION_RETRIEVAL_K = int(os.getenv("SECTION_RETRIEVAL_K", "4"))
+
+# 면접 답변 피드백 툴의 생성 방식 (이력서 검색은 두 방식 모두 한 번만 수행)
+# combined: 피드백과 개선된 답변을 하나의 JSON으로 한 번에 생성 (LLM 호출 1회)
+# sequential: 피드백을 먼저 생성하고, 그 개선 제안을 반영하여 개선된 답변을 생성 (LLM 호출 2회)
+FEEDBACK_MODES = ("combined", "sequential")
+FEEDBACK_MODE = os.getenv("FEEDBACK_MODE", "combined")
+feedback_latency = LatencyStats()
+
+# 툴별로 필요한 이력서 섹션 (없으면 섹션 구분 없이 검색)
+JOB_RECOMMENDATION_SECTIONS = [SECTION_SKILLS, SECTION_EXPERIENCE, SECTION_PROJECTS]
+INTERVIEW_TYPE_SECTIONS = {
+    "technical": [SECTION_SKILLS, SECTION_PROJECTS],
+    "behavioral": [SECTION_EXPERIENCE, SECTION_INTRODUCTION],
+}
+
+# 추출 텍스트가 이 토큰 수 이하인 문서는 임베딩/벡터 검색 없이 전체 텍스트를 프롬프트에 사용 (0이면 항상 벡터 검색)
+FULL_CONTEXT_MAX_TOKENS = int(os.getenv("FULL_CONTEXT_MAX_TOKENS", "4000"))
+context_router = ContextRouter(extracted_text_store, extract_documents, FULL_CONTEXT_MAX_TOKENS)
+
+# 업로드 시 이력서 프로필(학력, 경력, 핵심 역량, 강점, 커리어 목표)을 한 번 추출하여 파일 해시별로 인덱스 옆에 저장하고 모든 툴이 재사용
+# 프로필이 있으면 툴은 원본 청크를 PROFILE_RETRIEVAL_K개만 함께 사용합니다. (전체 텍스트를 쓰는 짧은 문서는 프로필 없이 사용)
+RESUME_PROFILE_ENABLED = os.getenv("RESUME_PROFILE_ENABLED", "true").lower() == "true"
+PROFILE_RETRIEVAL_K = int(os.getenv("PROFILE_RETRIEVAL_K", "2"))
+PROFILE_SOURCE_MAX_TOKENS = int(os.getenv("PROFILE_SOURCE_MAX_TOKENS", "6000")) # 프로필 추출 시 모델에 전달할 최대 토큰 수
+resume_profile_store = ResumeProfileStore(INDEX_FOLDER, extractor_id=CHAT_MODEL)
+
+# 툴 결과 캐시 (메모리 LRU + 업로드 볼륨의 SQLite 파일, TOOL_CACHE_TTL_SECONDS가 지난 결과는 사용하지 않음, 0이면 만료 없음)
+# SQLite 파일에는 최대 TOOL_CACHE_DISK_ITEMS개까지 보관하고, 만료/초과 결과는 기록 시 주기적으로 삭제합니다.
+# 같은 파일(내용 해시), 같은 파라미터, 같은 모델/temperature의 직무 추천/면접 질문 생성은 LLM을 다시 호출하지 않습니다.
+# temperature가 0인 호출만 기본으로 캐시하고, 그 외에는 툴 입력의 use_cache=true 또는 TOOL_CACHE_ALL_TEMPERATURES=true일 때 캐시합니다.
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_TTL_SECONDS = int(os.getenv("TOOL_CACHE_TTL_SECONDS", "86400"))
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "500"))
+TOOL_CACHE_DISK_ITEMS = int(os.getenv("TOOL_CACHE_DISK_ITEMS", "5000"))
+TOOL_CACHE_ALL_TEMPERATURES = os.getenv("TOOL_CACHE_ALL_TEMPERATURES", "false").lower() == "true"
+tool_response_cache = ToolResponseCache(
+    LruSqliteCache(
+        os.path.join(UPLOAD_FOLDER, ".cache", "tool_responses.sqlite3"),
+        table="tool_responses",
+        max_items=TOOL_CACHE_SIZE,
+        ttl_seconds=TOOL_CACHE_TTL_SECONDS,
+        max_disk_items=TOOL_CACHE_DISK_ITEMS,
+    ),
+    cache_all_temperatures=TOOL_CACHE_ALL_TEMPERATURES,
+)
+
+# 최대 파일 크기 제한 (기본 10MB)
+MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+
+# 업로드 요청 본문은 받는 대로 크기를 세어 제한을 넘으면 multipart 파싱 도중에 중단 (업로드 경로에만 적용)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    path="/api/resume/upload",
+    max_bytes=MAX_FILE_SIZE_BYTES,
+    detail=f"파일 크기가 너무 큽니다. 최대 {MAX_FILE_SIZE_MB}MB까지만 허용됩니다.",
+)
+
 # 헬퍼 함수: 문서 로딩 및 벡터 저장소 생성
-def _load_document_to_vector_store(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 100):
+def _load_document_to_vector_store(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 100, progress=None,
+                                   previous_chunks=None, stats=None, file_hash: Optional[str] = None):
     """
     문서 파일을 로드하고 텍스트를 분할하여 FAISS 벡터 저장소를 생성합니다.
     지원 형식: PDF, DOCX, TXT
+    progress(단계, 진행률)가 주어지면 처리 단계마다 호출합니다.
+    previous_chunks(이전 청크 본문과 벡터 목록)가 주어지면 내용이 바뀌지 않은 청크는 다시 임베딩하지 않습니다.
+    CHUNK_DEDUP_ENABLED이면 반복 머리말/꼬리말과 중복 청크를 임베딩 전에 제거하고, 제거한 수를 stats에 기록합니다.
+    file_hash(업로드 시 계산한 해시)가 주어지면 그 내용으로만 생성하며, 파일 내용이 바뀌었으면 FileContentChangedError를 발생시킵니다.
     """
+    progress = progress or (lambda stage, percent=None: None)
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
 
     print(f"문서 파일 로딩 중: {file_path}")
 
-    file_extension = file_path.lower().split('.')[-1]
-
-    if file_extension == "pdf":
-        loader = PyPDFLoader(file_path)
-    elif file_extension == "txt":
-        loader = TextLoader(file_path)
-    elif file_extension == "docx":
-        try:
-            loader = UnstructuredWordDocumentLoader(file_path)
-        except ImportError:
-            raise ValueError(
-                "DOCX 파일 처리를 위해 'unstructured' 라이브러리가 필요합니다. "
-                "설치하려면 'pip install unstructured' 및 'pip install unstructured[docx]'를 실행해주세요."
-            )
-    elif file_extension == "doc": # .doc 파일은 구형 형식으로 직접 지원하지 않음
-        raise ValueError(
-            "'.doc' 파일은 구형 형식으로 직접 지원되지 않습니다. "
-            "파일을 '.docx' 또는 '.pdf'로 변환하여 업로드해주세요."
-        )
-    else:
-        raise ValueError("지원되지 않는 파일 형식입니다. PDF, DOCX, TXT 파일만 업로드해주세요.")
-
-    documents = loader.load()
+    # 텍스트 추출과 청크 분할은 CPU 작업이므로 프로세스 풀에서 실행 (큰 PDF는 페이지 구간별 병렬 추출)
+    # 같은 파일 내용에서 이미 추출한 텍스트가 있으면 파싱을 건너뜀
+    progress("extracting", 5)
+    documents = extracted_text_store.load_or_extract(file_path, file_hash or compute_file_hash(file_path), extract_documents)
 
     if not documents:
         raise ValueError("파일에서 텍스트를 추출할 수 없습니다. 파일 내용을 확인해주세요.")
 
     print(f"총 {len(documents)}개 문서/페이지 로드됨")
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ".", " ", ""]
-    )
-    splits = text_splitter.split_documents(documents)
+    progress("splitting", 20)
+    stats = stats if stats is not None else {}
+    if CHUNK_DEDUP_ENABLED:
+        documents, stats["repeated_lines_removed"] = strip_repeated_lines(documents)
+    splits = split_documents(documents, chunk_size, chunk_overlap)
     print(f"총 {len(splits)}개 청크로 분할됨")
-
-    embeddings = OpenAIEmbeddings(api_key=OPENAI_API_KEY, model="text-embedding-3-small")
+    if CHUNK_DEDUP_ENABLED:
+        # 중복/유사 청크는 임베딩하지 않고, 남은 청크의 metadata["duplicates"]에 제거된 수를 기록
+        splits, dedup_stats = deduplicate_documents(splits, CHUNK_DEDUP_THRESHOLD)
+        stats.update(dedup_stats)
+        print(f"중복 청크 제거: 동일 {dedup_stats['chunks_duplicate_exact']}개, 유사 {dedup_stats['chunks_duplicate_near']}개 "
+              f"(반복 머리말/꼬리말 {stats['repeated_lines_removed']}줄 제거) → {len(splits)}개 청크")
+
+    embeddings = _get_embeddings()
     print("FAISS 벡터 저장소 생성 중...")
-    vectorstore = FAISS.from_documents(
-        documents=splits,
-        embedding=embeddings
+    # 청크를 배치로 나누어 동시에 임베딩한 뒤 인덱스는 마지막에 한 번만 생성
+    vectorstore = build_faiss_from_documents(
+        splits,
+        embeddings,
+        batch_size=EMBEDDING_BATCH_SIZE,
+        max_in_flight=EMBEDDING_MAX_IN_FLIGHT,
+        max_retries=EMBEDDING_MAX_RETRIES,
+        progress_callback=lambda done, total: progress("embedding", 25 + int(70 * done / total)),
+        previous_chunks=previous_chunks,
+        stats=stats,
     )
     print("벡터 저장소 생성 완료!")
     return vectorstore
 
+def _get_vector_store(file_path: str, file_hash: Optional[str] = None):
+    """
+    파일의 벡터 저장소를 디스크에서 로드하거나, 저장된 인덱스가 없으면 새로 생성하여 반환합니다.
+    생성은 레지스트리가 키로 사용하는 파일 해시의 내용으로만 수행합니다.
+    """
+    return vector_store_registry.get_or_build(file_path, _load_document_to_vector_store, file_hash=file_hash)
+
+def _get_retriever(file_path: str, k: Optional[int] = None, sections: Optional[List[str]] = None):
+    """
+    툴이 사용할 검색기를 반환합니다.
+    짧은 문서는 벡터 저장소 없이 전체 문서를 반환하는 검색기를, 그 외에는 RETRIEVAL_SEARCH_TYPE 방식의 검색기를 사용합니다.
+    sections가 주어지면 해당 이력서 섹션의 청크만 사용합니다. (섹션을 찾지 못한 문서는 전체 검색)
+    """
+    # 이후 단계(전체 텍스트/인덱스/프로필)는 모두 이 해시의 내용으로만 처리
+    file_hash = compute_file_hash(file_path)
+    documents = context_router.full_text_documents(file_path, file_hash)
+    if documents is not None:
+        context_router.record("tool_call", PATH_FULL_CONTEXT)
+        return FullDocumentRetriever(documents=documents)
+    context_router.record("tool_call", PATH_RETRIEVAL)
+    # 현재 사용자의 공유 인덱스에 이 파일의 벡터가 없으면(업로드 외의 파일 등) 로드/생성하여 교체
+    # 사용자당 한 파일의 벡터만 보관하므로 증분 인덱싱 통계(user_chunks)에 다른 파일의 청크가 섞이지 않음
+    user_id = current_user_id.get()
+    if not shared_vector_index.has(user_id, file_hash):
+        shared_vector_index.add_vectorstore(
+            user_id, file_hash, _get_vector_store(file_path, file_hash), replace_user=True
+        )
+    return shared_vector_index.as_retriever(
+        user_id, file_hash, k=k or (SECTION_RETRIEVAL_K if sections else RETRIEVAL_K),
+        search_type=RETRIEVAL_SEARCH_TYPE, fetch_k=HYBRID_FETCH_K, sections=sections,
+    )
+
+def _chat_model(temperature: float):
+    """
+    툴과 에이전트가 사용하는 채팅 모델을 반환합니다.
+    모든 모델이 하나의 HTTP 연결 풀을 공유하며, temperature가 달라도 클라이언트를 새로 만들지 않습니다.
+    """
+    return model_clients.chat(temperature)
+
+def _get_or_extract_profile(file_path: str, file_hash: str) -> dict:
+    """
+    파일의 이력서 프로필을 반환합니다. 저장된 프로필이 없으면 추출 텍스트로 한 번 추출하여 저장합니다.
+    file_hash는 업로드/검색기가 사용하는 해시이며, 추출 텍스트는 이 해시의 내용인지 확인한 뒤에만 사용합니다.
+    추출에 실패한 파일은 재시도 대기 시간이 지날 때까지 다시 추출하지 않고 ProfileUnavailableError를 발생시킵니다.
+    """
+    return resume_profile_store.get_or_extract(
+        file_hash,
+        lambda: extract_profile(
+            extracted_text_store.load_or_extract(file_path, file_hash, extract_documents),
+            _chat_model(0.0),
+            PROFILE_SOURCE_MAX_TOKENS,
+        ),
+        source_path=file_path,
+    )
+
+def _get_resume_context(file_path: str, sections: Optional[List[str]] = None):
+    """
+    툴이 사용할 (검색기, 프롬프트의 {profile}에 넣을 프로필 블록)을 반환합니다.
+    벡터 검색을 쓰는 문서에 프로필이 있으면 프로필과 함께 PROFILE_RETRIEVAL_K개의 청크만 사용하고,
+    프로필을 사용하지 않거나 추출에 실패하면 프로필 블록은 빈 문자열입니다.
+    """
+    retriever = _get_retriever(file_path, sections=sections)
+    if not RESUME_PROFILE_ENABLED or isinstance(retriever, FullDocumentRetriever):
+        return retriever, ""
+    try:
+        # 검색기가 사용하는 인덱스와 같은 해시의 프로필을 사용
+        profile_text = format_profile(_get_or_extract_profile(file_path, retriever.file_hash))
+    except Exception as e:
+        print(f"이력서 프로필을 사용할 수 없어 청크만 사용합니다 ({file_path}): {e}")
+        return retriever, ""
+    if not profile_text:
+        return retriever, ""
+    retriever.k = min(retriever.k, PROFILE_RETRIEVAL_K)
+    return retriever, f"<지원자 프로필>\n{profile_text}\n</지원자 프로필>\n"
+
+def _create_rag_chain(retriever, prompt, model):
+    """
+    검색기로 찾은 이력서 청크를 프롬프트의 {context}에 채워 넣는 RAG 체인을 생성합니다.
+    검색 결과는 CONTEXT_TOKEN_BUDGET 토큰을 넘지 않도록 순위대로 채워 넣습니다. (전체 문서를 쓰는 경우 제외)
+    """
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+    from langchain.chains import create_retrieval_chain
+    from langchain_core.runnables import RunnableLambda
+
+    if isinstance(retriever, FullDocumentRetriever):
+        return create_retrieval_chain(retriever, create_stuff_documents_chain(model, prompt))
+    packed_retriever = (
+        RunnableLambda(lambda inputs: inputs["input"])
+        | retriever
+        | RunnableLambda(lambda documents: pack_documents(documents, CONTEXT_TOKEN_BUDGET))
+    )
+    document_chain = create_stuff_documents_chain(model, prompt)
+    return create_retrieval_chain(packed_retriever, document_chain)
+
+async def _retrieve_context_documents(retriever, query: str):
+    """
+    이력서 청크를 한 번 검색하여 프롬프트의 {context}에 넣을 문서 목록을 반환합니다.
+    _create_rag_chain과 같이 검색 결과는 CONTEXT_TOKEN_BUDGET에 맞게 채워 넣습니다. (전체 문서를 쓰는 경우 제외)
+    여러 프롬프트가 같은 검색 결과를 사용할 때 사용합니다.
+    """
+    documents = await retriever.ainvoke(query)
+    if isinstance(retriever, FullDocumentRetriever):
+        return documents
+    return pack_documents(documents, CONTEXT_TOKEN_BUDGET)
+
+async def _cached_tool_response(tool_name: str, file_path: str, params: dict, temperature: float,
+                                use_cache: Optional[bool]):
+    """
+    툴 결과 캐시를 조회하여 (캐시 키, 저장된 결과)를 반환합니다.
+    캐시를 사용하지 않는 호출이면 키가 None이고, 저장된 결과가 없으면 결과가 None입니다.
+    """
+    if not TOOL_CACHE_ENABLED or not tool_response_cache.enabled_for(temperature, use_cache):
+        return None, None
+    file_hash = await asyncio.to_thread(compute_file_hash, file_path)
+    cache_key = tool_response_cache.make_key(file_hash, tool_name, params, CHAT_MODEL, temperature)
+    return cache_key, await asyncio.to_thread(tool_response_cache.get, cache_key)
+
 # --- @tool 데코레이터가 붙은 함수들 (에이전트가 사용할 툴) ---
 # 이 함수들은 AgentExecutor가 호출할 수 있도록 @tool 데코레이터를 사용합니다.
+# 툴은 비동기 함수로, LLM 호출은 ainvoke로 기다리고 파일/인덱스 준비 같은 블로킹 작업은 스레드에서 실행하여
+# 하나의 uvicorn 작업자가 여러 채팅 요청을 동시에 처리할 수 있도록 합니다. (에이전트는 ainvoke로 실행)
 
 @tool
-def recommend_job_and_skills_tool(input_json: str) -> str:
+async def recommend_job_and_skills_tool(input_json: str) -> str:
     """
     이력서 파일을 기반으로 지원자에게 가장 적합한 직무와 해당 직무에 필요한 핵심 역량을 추천합니다.
-    입력은 JSON 문자열이어야 하며, 'file_path'(필수), 'temperature'(선택), 'num_recommendations'(선택) 키를 포함해야 합니다.
-    결과는 JSON 문자열 형태로 반환됩니다.
+    입력은 JSON 문자열이어야 하며, 'file_path'(필수), 'temperature'(선택), 'num_recommendations'(선택), 'use_cache'(선택) 키를 포함해야 합니다.
+    결과는 JSON 문자열 형태로 반환됩니다. 같은 입력의 이전 결과를 재사용하려면 'use_cache'를 true로 지정합니다. (temperature가 0이면 기본으로 재사용)
     예시: recommend_job_and_skills_tool('{"file_path": "./uploads/예시 파일 (마케터).pdf", "temperature": 0.6, "num_recommendations": 2}')
     """
     try:
@@ -150,14 +415,20 @@ def recommend_job_and_skills_tool(input_json: str) -> str:
         if not os.path.exists(file_path):
             return json.dumps({"error": f"파일을 찾을 수 없습니다: {file_path}. 파일을 먼저 업로드해주세요."}, ensure_ascii=False)
 
-        vectorstore = _load_document_to_vector_store(file_path)
-        retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+        cache_key, cached = await _cached_tool_response(
+            "recommend_job_and_skills_tool", file_path, {"num_recommendations": num_recommendations},
+            temperature, params.get('use_cache'),
+        )
+        if cached is not None:
+            return cached
+
+        retriever, profile = await asyncio.to_thread(_get_resume_context, file_path, JOB_RECOMMENDATION_SECTIONS)
 
         template = f"""
 당신은 커리어 컨설턴트이며, 제공된 이력서 내용을 바탕으로 지원자에게 가장 적합한 직무와 해당 직무에 필요한 핵심 역량을 추천해야 합니다.
 응답은 반드시 JSON 형식으로만 반환해야 합니다.
 
-<이력서 내용>
+{{profile}}<이력서 내용>
 {{context}}
 </이력서 내용>
 
@@ -186,24 +457,26 @@ def recommend_job_and_skills_tool(input_json: str) -> str:
 
 답변:"""
         prompt = ChatPromptTemplate.from_template(template)
-        model = ChatOpenAI(model='gpt-3.5-turbo', temperature=float(temperature), api_key=OPENAI_API_KEY)
+        model = _chat_model(temperature)
         parser = JsonOutputParser()
-        document_chain = create_stuff_documents_chain(model, prompt)
-        rag_chain = create_retrieval_chain(retriever, document_chain)
+        rag_chain = _create_rag_chain(retriever, prompt, model)
 
-        response = rag_chain.invoke({'input': "이력서 기반 직무 및 역량 추천을 해주세요."})
+        response = await rag_chain.ainvoke({'input': "이력서 기반 직무 및 역량 추천을 해주세요.", 'profile': profile})
         parsed_response = parser.parse(response['answer'])
-        return json.dumps(parsed_response, ensure_ascii=False, indent=2)
+        result = json.dumps(parsed_response, ensure_ascii=False, indent=2)
+        if cache_key:
+            await asyncio.to_thread(tool_response_cache.set, cache_key, result)
+        return result
 
     except Exception as e:
         return json.dumps({"error": f"직무 및 역량 추천 중 오류 발생: {str(e)}"}, ensure_ascii=False)
 
 @tool
-def generate_interview_questions_tool(input_json: str) -> str:
+async def generate_interview_questions_tool(input_json: str) -> str:
     """
     이력서 파일을 기반으로 특정 회사, 면접 유형, 희망 직무에 맞는 면접 예상 질문 목록을 생성합니다.
-    입력은 JSON 문자열이어야 하며, 'file_path'(필수), 'company_name'(선택), 'interview_type'(선택), 'desired_job_role'(선택), 'temperature'(선택) 키를 포함해야 합니다.
-    결과는 JSON 문자열 형태로 반환됩니다.
+    입력은 JSON 문자열이어야 하며, 'file_path'(필수), 'company_name'(선택), 'interview_type'(선택), 'desired_job_role'(선택), 'temperature'(선택), 'use_cache'(선택) 키를 포함해야 합니다.
+    결과는 JSON 문자열 형태로 반환됩니다. 같은 입력의 이전 결과를 재사용하려면 'use_cache'를 true로 지정합니다. (temperature가 0이면 기본으로 재사용)
     예시: generate_interview_questions_tool('{"file_path": "./uploads/예시 파일 (마케터).pdf", "company_name": "ABC 마케팅", "interview_type": "general", "desired_job_role": "디지털 마케터"}')
     """
     try:
@@ -219,8 +492,17 @@ def generate_interview_questions_tool(input_json: str) -> str:
         if not os.path.exists(file_path):
             return json.dumps({"error": f"파일을 찾을 수 없습니다: {file_path}. 파일을 먼저 업로드해주세요."}, ensure_ascii=False)
 
-        vectorstore = _load_document_to_vector_store(file_path)
-        retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+        cache_key, cached = await _cached_tool_response(
+            "generate_interview_questions_tool", file_path,
+            {"company_name": company_name, "interview_type": interview_type, "desired_job_role": desired_job_role},
+            temperature, params.get('use_cache'),
+        )
+        if cached is not None:
+            return cached
+
+        retriever, profile = await asyncio.to_thread(
+            _get_resume_context, file_path, INTERVIEW_TYPE_SECTIONS.get(interview_type)
+        )
 
         type_instructions = {
             "general": "지원자의 전반적인 경험, 역량, 회사 적합성 등을 평가할 수 있는 종합적인 질문을 생성해주세요.",
@@ -243,7 +525,7 @@ def generate_interview_questions_tool(input_json: str) -> str:
 다음 지침에 따라 질문을 생성하고, 각 질문에 대한 간략한 답변 가이드라인도 함께 제공해주세요.
 응답은 반드시 JSON 형식으로만 반환해야 합니다.
 
-<이력서 내용>
+{{profile}}<이력서 내용>
 {{context}}
 </이력서 내용>
 
@@ -273,20 +555,22 @@ def generate_interview_questions_tool(input_json: str) -> str:
 
 답변:"""
         prompt = ChatPromptTemplate.from_template(template)
-        model = ChatOpenAI(model='gpt-3.5-turbo', temperature=float(temperature), api_key=OPENAI_API_KEY)
+        model = _chat_model(temperature)
         parser = JsonOutputParser()
-        document_chain = create_stuff_documents_chain(model, prompt)
-        rag_chain = create_retrieval_chain(retriever, document_chain)
+        rag_chain = _create_rag_chain(retriever, prompt, model)
 
-        response = rag_chain.invoke({'input': "면접 질문을 생성해주세요."})
+        response = await rag_chain.ainvoke({'input': "면접 질문을 생성해주세요.", 'profile': profile})
         parsed_response = parser.parse(response['answer'])
-        return json.dumps(parsed_response, ensure_ascii=False, indent=2)
+        result = json.dumps(parsed_response, ensure_ascii=False, indent=2)
+        if cache_key:
+            await asyncio.to_thread(tool_response_cache.set, cache_key, result)
+        return result
 
     except Exception as e:
         return json.dumps({"error": f"면접 질문 생성 중 오류 발생: {str(e)}"}, ensure_ascii=False)
 
 @tool
-def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
+async def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
     """
     주어진 면접 질문과 사용자 답변에 대해 AI 피드백을 제공하고, 해당 피드백을 반영한 개선된 답변을 생성합니다.
     입력은 JSON 문자열이어야 하며, 'file_path'(필수), 'original_question'(필수), 'user_answer'(필수), 'company_name'(선택), 'job_role'(선택), 'temperature'(선택) 키를 포함해야 합니다.
@@ -307,23 +591,95 @@ def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
         if not os.path.exists(file_path):
             return json.dumps({"error": f"파일을 찾을 수 없습니다: {file_path}. 파일을 먼저 업로드해주세요."}, ensure_ascii=False)
 
-        vectorstore = _load_document_to_vector_store(file_path)
-        retriever = vectorstore.as_retriever(search_type="similarity", search_kwargs={"k": 5})
+        # 피드백 모드 (툴 입력의 feedback_mode로 호출마다 지정 가능, 지연 시간 비교용)
+        feedback_mode = params.get('feedback_mode') or FEEDBACK_MODE
+        if feedback_mode not in FEEDBACK_MODES:
+            return json.dumps({"error": f"지원하지 않는 feedback_mode입니다: {feedback_mode} (가능한 값: {', '.join(FEEDBACK_MODES)})"}, ensure_ascii=False)
+
+        from langchain.chains.combine_documents import create_stuff_documents_chain
 
-        # 피드백 프롬프트
-        feedback_context_info = ""
+        started = time.perf_counter()
+        retriever, profile = await asyncio.to_thread(_get_resume_context, file_path)
+        # 이력서 검색은 한 번만 수행하고, 모든 프롬프트에 같은 검색 결과를 사용
+        documents = await _retrieve_context_documents(retriever, "사용자 답변에 대한 피드백을 생성해주세요.")
+        retrieved = time.perf_counter()
+        model = _chat_model(temperature)
+        parser = JsonOutputParser()
+        llm_calls = 1
+
+        context_info = ""
         if company_name and job_role:
-            feedback_context_info = f"지원하는 회사는 '{company_name}'이고, 직무는 '{job_role}'입니다. 이 맥락에서 답변을 평가해주세요."
+            context_info = f"지원하는 회사는 '{company_name}'이고, 직무는 '{job_role}'입니다."
         elif company_name:
-            feedback_context_info = f"지원하는 회사는 '{company_name}'입니다. 이 맥락에서 답변을 평가해주세요."
+            context_info = f"지원하는 회사는 '{company_name}'입니다."
         elif job_role:
-            feedback_context_info = f"지원하는 직무는 '{job_role}'입니다. 이 맥락에서 답변을 평가해주세요."
+            context_info = f"지원하는 직무는 '{job_role}'입니다."
 
-        feedback_template = f"""
+        if feedback_mode == "combined":
+            combined_template = f"""
+당신은 면접관이자 커리어 코치입니다. 다음 질문과 지원자의 답변을 평가하여 건설적인 피드백을 작성하고,
+그 피드백을 반영하여 가장 효과적이고 설득력 있는 답변으로 개선한 결과를 하나의 JSON으로 제공해주세요.
+평가 시 지원자의 이력서 내용도 참고하여 답변의 적합성과 깊이를 판단해주세요.
+
+{{profile}}<이력서/자소서 내용>
+{{context}}
+</이력서/자소서 내용>
+
+<원래 질문>
+{original_question}
+</원래 질문>
+
+<지원자 답변>
+{user_answer}
+</지원자 답변>
+
+지침:
+1.  feedback에는 다음 항목을 작성하세요.
+    - **overall_assessment**: 답변에 대한 전반적인 평가를 1-2문장으로 요약하세요.
+    - **strengths**: 답변의 주요 강점 2-3가지를 목록으로 제시하세요.
+    - **areas_for_improvement**: 답변에서 개선이 필요한 부분 2-3가지를 목록으로 제시하세요.
+    - **actionable_suggestions**: 각 개선점에 대해 구체적이고 실용적인 개선 제안 2-3가지를 목록으로 제시하세요.
+    - **score_out_of_5**: 답변에 대한 5점 만점 점수를 소수점 첫째 자리까지 매겨주세요. (예: 3.5)
+    - **next_steps_advice**: 향후 유사한 질문에 답변할 때 도움이 될 만한 전반적인 방향성 조언을 1~2문장으로 제공해주세요.
+2.  improved_answer에는 위 actionable_suggestions를 최우선적으로 반영하여 개선한 답변만 작성하세요.
+    원래 질문에 직접적으로 답변하고, 이력서 내용과 연관된 경험이나 역량을 효과적으로 강조하며, 명확하고 간결하게 작성하세요.
+    추가적인 설명이나 서론은 필요 없습니다.
+3.  {context_info + " 이 맥락에서 답변을 평가하고 개선해주세요." if context_info else ""}
+
+응답 JSON 스키마:
+{{{{
+  "feedback": {{{{
+    "overall_assessment": "전반적인 답변에 대한 평가 요약",
+    "strengths": [
+      "강점 1",
+      "강점 2"
+    ],
+    "areas_for_improvement": [
+      "개선 필요 부분 1",
+      "개선 필요 부분 2"
+    ],
+    "actionable_suggestions": [
+      "구체적 제안 1",
+      "구체적 제안 2"
+    ],
+    "score_out_of_5": 3.5,
+    "next_steps_advice": "향후 답변 방향성 조언"
+  }}}},
+  "improved_answer": "개선된 답변"
+}}}}
+
+답변:"""
+            combined_chain = create_stuff_documents_chain(model, ChatPromptTemplate.from_template(combined_template))
+            combined_results = parser.parse(await combined_chain.ainvoke({'context': documents, 'profile': profile}))
+            improved_answer_text = combined_results.pop('improved_answer', "")
+            # 모델이 feedback 객체 없이 항목을 최상위에 나열한 경우도 같은 스키마로 맞춤
+            feedback_results = combined_results.get('feedback') or combined_results
+        else:
+            feedback_template = f"""
 당신은 면접관이자 커리어 코치입니다. 다음 질문과 지원자의 답변을 평가하고, 건설적인 피드백을 JSON 형식으로 제공해주세요.
 평가 시 지원자의 이력서 내용도 참고하여 답변의 적합성과 깊이를 판단해주세요.
 
-<이력서/자소서 내용>
+{{profile}}<이력서/자소서 내용>
 {{context}}
 </이력서/자소서 내용>
 
@@ -342,7 +698,7 @@ def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
 4.  **actionable_suggestions**: 각 개선점에 대해 구체적이고 실용적인 개선 제안 2-3가지를 목록으로 제시하세요.
 5.  **score_out_of_5**: 답변에 대한 5점 만점 점수를 소수점 첫째 자리까지 매겨주세요. (예: 3.5)
 6.  **next_steps_advice**: 향후 유사한 질문에 답변할 때 도움이 될 만한 전반적인 방향성 조언을 1~2문장으로 제공해주세요.
-7.  {feedback_context_info}
+7.  {context_info + " 이 맥락에서 답변을 평가해주세요." if context_info else ""}
 
 응답 JSON 스키마:
 {{{{
@@ -366,33 +722,21 @@ def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
 질문: 이 답변에 대한 피드백을 제공해주세요.
 
 답변:"""
-        feedback_prompt = ChatPromptTemplate.from_template(feedback_template)
-        model = ChatOpenAI(model='gpt-3.5-turbo', temperature=float(temperature), api_key=OPENAI_API_KEY)
-        parser = JsonOutputParser()
-        feedback_document_chain = create_stuff_documents_chain(model, feedback_prompt)
-        feedback_rag_chain = create_retrieval_chain(retriever, feedback_document_chain)
-
-        feedback_response = feedback_rag_chain.invoke({'input': "사용자 답변에 대한 피드백을 생성해주세요."})
-        feedback_results = parser.parse(feedback_response['answer'])
+            feedback_chain = create_stuff_documents_chain(model, ChatPromptTemplate.from_template(feedback_template))
+            feedback_results = parser.parse(await feedback_chain.ainvoke({'context': documents, 'profile': profile}))
+            improved_answer_text = ""
 
-        # 개선된 답변 생성 프롬프트
-        actionable_suggestions = "\n".join([f"- {s}" for s in feedback_results.get('actionable_suggestions', [])])
-        if not actionable_suggestions:
-            actionable_suggestions = "제공된 피드백에 구체적인 개선 제안이 없습니다. 답변의 명확성, 간결성, 질문과의 연관성에 중점을 두어 개선해주세요."
-
-        improved_context_info = ""
-        if company_name and job_role:
-            improved_context_info = f"지원하는 회사는 '{company_name}'이고, 직무는 '{job_role}'입니다. 이 맥락에서 답변을 개선해주세요."
-        elif company_name:
-            improved_context_info = f"지원하는 회사는 '{company_name}'입니다. 이 맥락에서 답변을 개선해주세요."
-        elif job_role:
-            improved_context_info = f"지원하는 직무는 '{job_role}'입니다. 이 맥락에서 답변을 개선해주세요."
+        # 개선된 답변 생성 프롬프트 (sequential 모드, 또는 combined 응답에 개선된 답변이 빠진 경우)
+        if not improved_answer_text:
+            actionable_suggestions = "\n".join([f"- {s}" for s in feedback_results.get('actionable_suggestions', [])])
+            if not actionable_suggestions:
+                actionable_suggestions = "제공된 피드백에 구체적인 개선 제안이 없습니다. 답변의 명확성, 간결성, 질문과의 연관성에 중점을 두어 개선해주세요."
 
-        improved_answer_template = f"""
+            improved_answer_template = f"""
 당신은 면접 답변 개선 전문가입니다. 다음 면접 질문, 지원자의 초기 답변, 그리고 해당 답변에 대한 AI 피드백을 참고하여,
 가장 효과적이고 설득력 있는 답변으로 개선해주세요.
 
-<이력서/자소서 내용>
+{{profile}}<이력서/자소서 내용>
 {{context}}
 </이력서/자소서 내용>
 
@@ -413,16 +757,19 @@ def get_interview_feedback_and_improved_answer_tool(input_json: str) -> str:
 2.  원래 질문에 직접적으로 답변하고, 이력서 내용과 연관된 경험이나 역량을 효과적으로 강조하세요.
 3.  답변은 명확하고 간결하며, 설득력 있게 작성되어야 합니다.
 4.  불필요한 내용은 제거하고, 핵심 메시지를 전달하는 데 집중하세요.
-5.  {improved_context_info}
+5.  {context_info + " 이 맥락에서 답변을 개선해주세요." if context_info else ""}
 6.  개선된 답변만 직접적으로 제공해주세요. 추가적인 설명이나 서론은 필요 없습니다.
 
 개선된 답변:"""
-        improved_answer_prompt = ChatPromptTemplate.from_template(improved_answer_template)
-        improved_answer_document_chain = create_stuff_documents_chain(model, improved_answer_prompt)
-        improved_answer_rag_chain = create_retrieval_chain(retriever, improved_answer_document_chain)
-
-        improved_answer_response = improved_answer_rag_chain.invoke({'input': "개선된 면접 답변을 작성해주세요."})
-        improved_answer_text = improved_answer_response['answer']
+            improved_answer_chain = create_stuff_documents_chain(model, ChatPromptTemplate.from_template(improved_answer_template))
+            improved_answer_text = await improved_answer_chain.ainvoke({'context': documents, 'profile': profile})
+            llm_calls += 1
+
+        finished = time.perf_counter()
+        feedback_latency.record(
+            feedback_mode, finished - started, retrieval_s=retrieved - started, generation_s=finished - retrieved,
+            llm_calls=llm_calls,
+        )
 
         # 피드백 결과와 개선된 답변을 하나의 JSON으로 묶어 반환
         full_result = {
@@ -450,7 +797,7 @@ def get_agent_executor(user_id: str, temperature: float = 0.0):
     tools = [recommend_job_and_skills_tool, generate_interview_questions_tool, get_interview_feedback_and_improved_answer_tool]
     
     # 에이전트의 판단을 위한 LLM (낮은 temperature로 설정하여 일관성 유지)
-    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=temperature, api_key=OPENAI_API_KEY)
+    llm = _chat_model(temperature)
 
     # 프롬프트를 안전하게 구성 - JSON 예시 제거
     system_message = """
@@ -479,6 +826,8 @@ def get_agent_executor(user_id: str, temperature: float = 0.0):
         ]
     )
 
+    from langchain.agents import AgentExecutor, create_tool_calling_agent # AgentExecutor 관련 임포트
+
     agent = create_tool_calling_agent(llm, tools, prompt)
     agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
     return agent_executor
@@ -520,32 +869,135 @@ async def upload_resume(
 
     file_path = os.path.join(app.state.UPLOAD_FOLDER, file.filename)
     
-    # 파일 저장
+    # 파일 저장 (청크 단위로 스트리밍하며 해시를 계산하고, 크기 제한을 넘으면 즉시 중단)
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        print(f"파일 '{file.filename}' 저장 완료: {file_path}")
+        saved_size, file_hash = await save_upload_streaming(file, file_path, MAX_FILE_SIZE_BYTES)
+        remember_file_hash(file_path, file_hash)
+        print(f"파일 '{file.filename}' 저장 완료: {file_path} ({saved_size} bytes)")
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"파일 크기가 너무 큽니다. 최대 {MAX_FILE_SIZE_MB}MB까지만 허용됩니다."
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"파일 저장 중 오류 발생: {str(e)}")
 
-    try:
-        vectorstore = _load_document_to_vector_store(file_path, chunkSize, chunkOverlap)
-        # 사용자 데이터 스토어에 벡터 저장소와 파일 경로 저장
-        if userId not in user_data_store:
-            user_data_store[userId] = {'chat_history': []}
-        user_data_store[userId]['vectorstore'] = vectorstore
-        user_data_store[userId]['file_path'] = file_path
-        
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={"message": f"이력서 '{file.filename}'가 성공적으로 업로드 및 처리되었습니다.", "file_path": file_path}
+    # 사용자 데이터 스토어에 파일 경로를 먼저 저장하고, 벡터 저장소는 수집 작업이 끝나면 저장
+    if userId not in user_data_store:
+        user_data_store[userId] = {'chat_history': []}
+    user_data_store[userId]['file_path'] = file_path
+
+    def _is_current_upload():
+        # 처리 도중 같은 사용자가 다른 파일을 업로드했거나 사용자 데이터가 삭제되었다면 반영하지 않음
+        return user_data_store.get(userId, {}).get('file_path') == file_path
+
+    def _ingest(job):
+        # 짧은 문서는 임베딩/인덱스를 만들지 않고 툴 호출 시 전체 텍스트를 사용
+        job.update("extracting", 5)
+        if context_router.full_text_documents(file_path, file_hash) is not None:
+            context_router.record("ingestion", PATH_FULL_CONTEXT)
+            if _is_current_upload():
+                shared_vector_index.delete_user(userId)
+            return {"mode": PATH_FULL_CONTEXT, "context_tokens": context_router.token_count(file_hash), "num_chunks": 0}
+        context_router.record("ingestion", PATH_RETRIEVAL)
+
+        stats = {}
+        # 같은 내용의 파일이 같은 청크 설정으로 이미 처리되었다면 기존 인덱스를 재사용
+        # 새로 생성하는 경우 이전에 업로드한 이력서의 청크 벡터를 증분 인덱싱에 재사용
+        vectorstore = vector_store_registry.get_or_build(
+            file_path,
+            lambda path, size, overlap, file_hash: _load_document_to_vector_store(
+                path, size, overlap, progress=job.update, previous_chunks=shared_vector_index.user_chunks(userId),
+                stats=stats, file_hash=file_hash,
+            ),
+            chunkSize,
+            chunkOverlap,
+            file_hash=file_hash,
         )
-    except ValueError as ve:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"파일 처리 중 오류 발생: {str(e)}")
+        # 공유 인덱스의 사용자 벡터를 새 이력서의 벡터로 교체
+        if _is_current_upload():
+            shared_vector_index.add_vectorstore(userId, file_hash, vectorstore, replace_user=True)
+        # 툴이 재사용할 이력서 프로필을 한 번 추출 (실패해도 수집은 완료하고, 툴 호출 시 다시 시도)
+        profile_ready = False
+        if RESUME_PROFILE_ENABLED and OPENAI_API_KEY:
+            job.update("profiling", 96)
+            try:
+                _get_or_extract_profile(file_path, file_hash)
+                profile_ready = True
+            except Exception as e:
+                print(f"이력서 프로필 추출 실패 ({file_path}): {e}")
+        # 재사용/신규 임베딩 청크 수 (인덱스를 새로 만들지 않고 그대로 재사용한 경우 index_reused=True)
+        return {"mode": PATH_RETRIEVAL, "num_chunks": vectorstore.index.ntotal, "index_reused": not stats,
+                "profile": profile_ready, **stats}
+
+    # 파싱/분할/임베딩은 백그라운드 작업으로 실행하고 작업 ID를 바로 반환
+    job = ingestion_jobs.submit(userId, file_path, _ingest)
+    user_data_store[userId]['ingestion_job_id'] = job.job_id
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": f"이력서 '{file.filename}'가 업로드되었습니다. 문서 처리가 진행 중입니다.",
+            "file_path": file_path,
+            "job_id": job.job_id,
+            "status": job.status,
+        }
+    )
+
+
+@app.get("/api/resume/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """
+    이력서 수집 작업의 상태(단계, 진행률, 결과 또는 오류)를 조회합니다.
+    """
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+
+@app.delete("/api/users/{user_id}")
+async def delete_user_data(user_id: str):
+    """
+    사용자의 벡터(공유 인덱스)와 업로드/대화 기록을 삭제합니다.
+    """
+    removed_vectors = shared_vector_index.delete_user(user_id)
+    user_data = user_data_store.pop(user_id, None)
+    if user_data is None and removed_vectors == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="사용자 데이터를 찾을 수 없습니다.")
+    return {"user_id": user_id, "removed_vectors": removed_vectors}
 
 
+async def _chat_precheck_message(user_id: str) -> Optional[str]:
+    """
+    에이전트를 실행할 수 없는 상태이면 사용자에게 보여줄 안내 메시지를, 실행할 수 있으면 None을 반환합니다.
+    이력서 처리 작업이 진행 중이면 CHAT_INDEX_WAIT_SECONDS까지 기다립니다.
+    """
+    # 사용자 데이터 스토어에서 데이터 가져오기
+    user_data = user_data_store.get(user_id)
+    if not user_data or 'file_path' not in user_data:
+        # 파일 경로가 없으면 업로드 요청
+        return "어떤 파일로 작업을 진행할까요? 파일 경로를 먼저 알려주세요. (예: ./uploads/예시 파일 (마케터).pdf)"
+
+    # 이력서 처리 작업이 아직 진행 중이면 잠시 기다리고, 끝나지 않으면 진행 상태를 안내
+    job = ingestion_jobs.get(user_data.get('ingestion_job_id', ''))
+    if job is not None and not job.done:
+        await ingestion_jobs.wait(job, CHAT_INDEX_WAIT_SECONDS)
+    if job is not None and job.status == JOB_FAILED:
+        return f"이력서 처리 중 오류가 발생했습니다: {job.error}. 파일을 확인한 후 다시 업로드해주세요."
+    if job is not None and not job.done:
+        return f"이력서를 아직 처리하고 있습니다. (단계: {job.stage}, 진행률: {job.progress}%) 잠시 후 다시 질문해주세요."
+    return None
+
+def _append_chat_history(user_id: str, user_message: str, ai_message: str):
+    """
+    대화 기록을 서버 메모리에 추가합니다. (오류 메시지도 기록에 남김)
+    """
+    user_data = user_data_store.setdefault(user_id, {'chat_history': []})
+    chat_history = user_data.setdefault('chat_history', [])
+    chat_history.append(HumanMessage(content=user_message))
+    chat_history.append(AIMessage(content=ai_message))
+
 @app.post("/api/chat/ask")
 async def chat_with_ai(request_data: ChatRequest):
     """
@@ -559,26 +1011,25 @@ async def chat_with_ai(request_data: ChatRequest):
     if not user_message:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="질문을 입력해주세요.")
 
-    # 사용자 데이터 스토어에서 데이터 가져오기
-    user_data = user_data_store.get(user_id)
-    if not user_data or 'file_path' not in user_data:
-        # 파일 경로가 없으면 업로드 요청
-        return JSONResponse(
-            status_code=status.HTTP_200_OK, # 200 OK로 반환하여 프론트엔드에서 메시지 처리
-            content={"aiResponse": "어떤 파일로 작업을 진행할까요? 파일 경로를 먼저 알려주세요. (예: ./uploads/예시 파일 (마케터).pdf)"}
-        )
-    
+    # 파일이 없거나 이력서 처리가 끝나지 않았으면 안내 메시지 반환 (200 OK로 반환하여 프론트엔드에서 메시지 처리)
+    notice = await _chat_precheck_message(user_id)
+    if notice is not None:
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"aiResponse": notice})
+
+    user_data = user_data_store[user_id]
     file_path = user_data['file_path']
     chat_history = user_data.get('chat_history', [])
+    current_user_id.set(user_id)
 
     # LangChain AgentExecutor 생성
     # get_agent_executor 함수에 file_path와 temperature를 전달합니다.
     agent_executor = get_agent_executor(user_id, temperature)
 
     try:
-        # AgentExecutor 실행 - await 제거!
+        # AgentExecutor 비동기 실행 (LLM 응답을 기다리는 동안 이벤트 루프가 다른 요청을 처리)
         # AgentExecutor는 chat_history를 사용하여 대화 맥락을 유지합니다.
-        result = agent_executor.invoke({
+        # file_path는 시스템 프롬프트에 이미 포함되어 있으므로, 여기서는 input과 chat_history만 전달합니다.
+        result = await agent_executor.ainvoke({
             "input": user_message,
             "chat_history": chat_history,
         })
@@ -586,9 +1037,7 @@ async def chat_with_ai(request_data: ChatRequest):
         ai_response_text = result.get('output', '죄송합니다. 답변을 생성하는 데 실패했습니다.')
         
         # 대화 기록 업데이트 (서버 메모리에서 관리)
-        chat_history.append(HumanMessage(content=user_message))
-        chat_history.append(AIMessage(content=ai_response_text))
-        user_data_store[user_id]['chat_history'] = chat_history
+        _append_chat_history(user_id, user_message, ai_response_text)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -599,12 +1048,99 @@ async def chat_with_ai(request_data: ChatRequest):
         print(f"챗봇 처리 중 오류 발생: {e}")
         # 오류 발생 시에도 대화 기록에 추가하여 사용자에게 알립니다.
         error_message = f"요청 처리 중 오류가 발생했습니다: {str(e)}. 다시 시도해주세요."
-        chat_history.append(HumanMessage(content=user_message))
-        chat_history.append(AIMessage(content=error_message))
-        user_data_store[user_id]['chat_history'] = chat_history # 오류 메시지도 기록에 남김
+        _append_chat_history(user_id, user_message, error_message)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_message)
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/chat/stream")
+async def chat_with_ai_stream(request_data: ChatRequest):
+    """
+    /api/chat/ask의 스트리밍 버전입니다. Server-Sent Events로 진행 상황과 최종 답변 토큰을 도착하는 즉시 전송합니다.
+    이벤트: status(처리 시작), tool_start / retrieval_done / tool_end(툴 진행 상황), token(최종 답변 토큰),
+    final(전체 답변, 안내 메시지 포함), error(오류)
+    """
+    user_id = request_data.userId
+    user_message = request_data.userMessage
+    temperature = request_data.temperature
+
+    if not user_message:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="질문을 입력해주세요.")
+
+    async def event_stream():
+        # 첫 바이트를 바로 보내고, 이력서 처리 대기와 에이전트 실행은 그 이후에 진행
+        yield _sse_event("status", {"stage": "started"})
+        notice = await _chat_precheck_message(user_id)
+        if notice is not None:
+            yield _sse_event("final", {"aiResponse": notice})
+            return
+
+        current_user_id.set(user_id)
+        agent_executor = get_agent_executor(user_id, temperature)
+        chat_history = list(user_data_store.get(user_id, {}).get('chat_history', []))
+        tool_runs = set() # 실행 중인 툴의 run_id (툴 내부 RAG 체인의 토큰은 전송하지 않음)
+        output = None
+        try:
+            async for event in agent_executor.astream_events(
+                {"input": user_message, "chat_history": chat_history}, version="v2"
+            ):
+                kind = event["event"]
+                if kind == "on_tool_start":
+                    tool_runs.add(event["run_id"])
+                    yield _sse_event("tool_start", {"tool": event["name"]})
+                elif kind == "on_tool_end":
+                    tool_runs.discard(event["run_id"])
+                    yield _sse_event("tool_end", {"tool": event["name"]})
+                elif kind == "on_retriever_end":
+                    documents = (event["data"].get("output") or [])
+                    yield _sse_event("retrieval_done", {"documents": len(documents)})
+                elif kind == "on_chat_model_stream":
+                    if tool_runs.intersection(event.get("parent_ids", [])):
+                        continue
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield _sse_event("token", {"content": content})
+                elif kind == "on_chain_end" and event["name"] == agent_executor.get_name() \
+                        and not event.get("parent_ids"):
+                    output = (event["data"].get("output") or {}).get("output")
+        except Exception as e:
+            print(f"챗봇 스트리밍 처리 중 오류 발생: {e}")
+            error_message = f"요청 처리 중 오류가 발생했습니다: {str(e)}. 다시 시도해주세요."
+            _append_chat_history(user_id, user_message, error_message)
+            yield _sse_event("error", {"detail": error_message})
+            return
+
+        ai_response_text = output or '죄송합니다. 답변을 생성하는 데 실패했습니다.'
+        _append_chat_history(user_id, user_message, ai_response_text)
+        yield _sse_event("final", {"aiResponse": ai_response_text})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # 프록시(nginx 등)가 응답을 모아서 보내지 않도록 버퍼링 비활성화
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    캐시 적중률 등 서비스 내부 지표를 반환합니다.
+    """
+    return {
+        "embedding_backend": embedding_backend.backend_id,
+        "embedding_cache": embedding_cache.get_stats(),
+        "tool_response_cache": tool_response_cache.get_stats(),
+        "feedback_latency": feedback_latency.get_stats(),
+        "model_clients": model_clients.get_stats(),
+        "context_packing": get_packing_stats(),
+        "context_path": context_router.get_stats(),
+        "shared_vector_index": shared_vector_index.get_stats(),
+    }
+
+
 # FastAPI 애플리케이션을 실행하려면 터미널에서 다음 명령어를 실행하세요:
 # uvicorn backend_api:app --reload --host 0.0.0.0 --port 5000
 # --reload: 코드 변경 시 자동 재시작 (개발용)
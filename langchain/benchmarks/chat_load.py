@@ -0,0 +1,116 @@
+# chat_load.py
+
+# 실행 중인 서비스에 동시 채팅 요청을 보내 동시성 수준별 처리량과 지연 시간을 측정합니다.
+# 채팅 처리가 이벤트 루프를 막으면 동시 요청이 순서대로 처리되어 처리량이 늘지 않고,
+# 비동기로 처리되면 동시성 수준에 비례하여 처리량이 늘어납니다. (동시성 1 대비 배율로 보고)
+# 가상 사용자마다 sample_resumes의 이력서를 업로드하고 수집 작업이 끝난 뒤 측정합니다.
+# 채팅은 실제 LLM을 호출하므로 서비스에 OPENAI_API_KEY가 필요합니다.
+#
+# 사용 예:
+#   uvicorn backend_api_js:app --port 5000 --workers 1
+#   python benchmarks/chat_load.py --base-url http://localhost:5000 --concurrency 1 4 16 --requests-per-user 2
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_resumes")
+
+DEFAULT_MESSAGE = "이력서를 바탕으로 기술 면접 질문 3개 만들어주세요."
+
+
+async def prepare_users(client, users: int, timeout: float):
+    """
+    가상 사용자마다 샘플 이력서를 업로드하고 수집 작업이 끝날 때까지 기다립니다.
+    """
+    samples = sorted(name for name in os.listdir(SAMPLE_DIR) if name.endswith(".txt"))
+
+    async def upload(index: int) -> str:
+        user_id = f"load-user-{index}"
+        name = samples[index % len(samples)]
+        with open(os.path.join(SAMPLE_DIR, name), "rb") as f:
+            response = await client.post(
+                "/api/resume/upload",
+                files={"file": (f"load_{index}_{name}", f.read(), "text/plain")},
+                data={"userId": user_id},
+            )
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = (await client.get(f"/api/resume/jobs/{job_id}")).json()
+            if job["status"] == "failed":
+                raise RuntimeError(f"{user_id} 이력서 처리 실패: {job['error']}")
+            if job["status"] == "completed":
+                return user_id
+            await asyncio.sleep(0.5)
+        raise TimeoutError(f"{user_id} 이력서 처리가 {timeout}초 안에 끝나지 않았습니다.")
+
+    return await asyncio.gather(*(upload(index) for index in range(users)))
+
+
+async def run_level(client, user_ids, concurrency: int, requests_per_user: int, message: str) -> dict:
+    """
+    concurrency명의 사용자가 각자 requests_per_user번 순서대로 채팅하고, 전체 처리량과 지연 시간을 반환합니다.
+    """
+    latencies, errors = [], 0
+
+    async def user_session(user_id: str):
+        nonlocal errors
+        for _ in range(requests_per_user):
+            started = time.perf_counter()
+            response = await client.post("/api/chat/ask", json={"userId": user_id, "userMessage": message})
+            latencies.append(time.perf_counter() - started)
+            errors += int(response.status_code != 200)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_session(user_id) for user_id in user_ids[:concurrency]))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_s": statistics.median(latencies),
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def main_async(args):
+    import httpx
+
+    levels = sorted(set(args.concurrency))
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=max(levels) * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        user_ids = await prepare_users(client, max(levels), args.ingestion_timeout)
+        results = []
+        for level in levels:
+            result = await run_level(client, user_ids, level, args.requests_per_user, args.message)
+            results.append(result)
+            print(f"동시성 {level:>3}: 요청 {result['requests']:>4}개 (오류 {result['errors']}), "
+                  f"처리량 {result['throughput_rps']:6.2f} req/s, p50 {result['p50_s']:6.2f}s, p95 {result['p95_s']:6.2f}s")
+
+    baseline = results[0]["throughput_rps"]
+    print(f"\n동시성 {levels[0]} 대비 처리량 배율 (동시 처리가 잘 되면 동시성 비율에 가까움)")
+    for result in results:
+        print(f"  동시성 {result['concurrency']:>3}: x{result['throughput_rps'] / baseline:5.2f} "
+              f"(이상적 x{result['concurrency'] / levels[0]:.0f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 채팅 요청 처리량 측정")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests-per-user", type=int, default=2)
+    parser.add_argument("--message", default=DEFAULT_MESSAGE)
+    parser.add_argument("--request-timeout", type=float, default=180.0)
+    parser.add_argument("--ingestion-timeout", type=float, default=300.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
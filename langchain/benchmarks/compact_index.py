@@ -0,0 +1,114 @@
+# compact_index.py
+
+# 공유 벡터 인덱스의 저장 방식(flat, sq_fp16, sq8, ivfpq)별 메모리 사용량과
+# 정확한 flat 인덱스 대비 검색 결과 일치율(top-k overlap)을 비교합니다.
+# 벡터는 --vectors로 지정한 .npy 파일(실제 임베딩)을 사용하거나,
+# 지정하지 않으면 사용자별로 비슷한 청크가 모이는 저차원 구조의 합성 벡터를 생성합니다.
+#
+# 사용 예:
+#   python benchmarks/compact_index.py
+#   python benchmarks/compact_index.py --users 3000 --chunks 8 --dimension 1536 --queries 300 --k 5
+#   python benchmarks/compact_index.py --vectors embeddings.npy --chunks 8
+import argparse
+import os
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+import numpy as np
+
+from shared_vector_index import INDEX_TYPES, SharedVectorIndex
+
+
+def _normalize(x):
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype("float32")
+
+
+def synthetic_vectors(users: int, chunks: int, dimension: int, latent: int = 64, seed: int = 0):
+    """
+    (users*chunks, dimension) 벡터와 사용자별 질의 생성용 중심 벡터를 반환합니다.
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((latent, dimension))
+    centers = rng.standard_normal((users, latent))
+    latents = np.repeat(centers, chunks, axis=0) + 0.7 * rng.standard_normal((users * chunks, latent))
+    vectors = _normalize(latents @ basis + 0.3 * rng.standard_normal((users * chunks, dimension)))
+    return vectors, (centers, basis)
+
+
+def build(index_type: str, vectors, users: int, chunks: int, args) -> SharedVectorIndex:
+    index = SharedVectorIndex(lambda: None, index_type, ivf_nlist=args.nlist, pq_m=args.pq_m,
+                              train_size=min(args.train_size, len(vectors)))
+    for user in range(users):
+        rows = vectors[user * chunks:(user + 1) * chunks]
+        index.add(str(user), f"hash{user}", [f"{user}:{chunk}" for chunk in range(chunks)], rows,
+                  [{"chunk": chunk} for chunk in range(chunks)])
+    return index
+
+
+def index_bytes(index: SharedVectorIndex) -> int:
+    import faiss
+
+    return len(faiss.serialize_index(index._index))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공유 벡터 인덱스 저장 방식별 메모리/검색 일치율 비교")
+    parser.add_argument("--users", type=int, default=2000, help="사용자 수 (--vectors 사용 시 벡터 수로 결정)")
+    parser.add_argument("--chunks", type=int, default=8, help="사용자당 청크 수")
+    parser.add_argument("--dimension", type=int, default=1536, help="합성 벡터 차원")
+    parser.add_argument("--vectors", help="실제 임베딩 벡터 .npy 파일 (행 순서대로 사용자당 --chunks개씩 배정)")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--k", type=int, default=5, help="검색 결과 수")
+    parser.add_argument("--nlist", type=int, default=64, help="IVF 리스트 수")
+    parser.add_argument("--pq-m", type=int, default=64, help="PQ 서브 양자화기 수 (벡터당 바이트)")
+    parser.add_argument("--train-size", type=int, default=10000, help="IVF-PQ 학습 벡터 수")
+    parser.add_argument("--types", nargs="*", default=list(INDEX_TYPES), help="비교할 인덱스 종류")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    if args.vectors:
+        vectors = _normalize(np.load(args.vectors).astype("float32"))
+        users = len(vectors) // args.chunks
+        vectors = vectors[:users * args.chunks]
+        # 실제 임베딩에서는 같은 사용자의 청크에 잡음을 더해 질의로 사용
+        query_users = rng.integers(0, users, args.queries)
+        queries = _normalize(vectors[query_users * args.chunks + rng.integers(0, args.chunks, args.queries)]
+                             + 0.05 * rng.standard_normal((args.queries, vectors.shape[1])))
+    else:
+        users = args.users
+        vectors, (centers, basis) = synthetic_vectors(users, args.chunks, args.dimension)
+        query_users = rng.integers(0, users, args.queries)
+        queries = _normalize((centers[query_users] + 0.7 * rng.standard_normal((args.queries, basis.shape[0])))
+                             @ basis + 0.3 * rng.standard_normal((args.queries, basis.shape[1])))
+
+    print(f"사용자 {users}명, 사용자당 청크 {args.chunks}개, 벡터 {len(vectors)}개, 차원 {vectors.shape[1]}, "
+          f"질의 {args.queries}개, k={args.k}")
+
+    exact = None
+    flat_bytes = None
+    for index_type in ["flat"] + [t for t in args.types if t != "flat"]:
+        started = time.perf_counter()
+        index = build(index_type, vectors, users, args.chunks, args)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = [
+            [doc.page_content for doc in index.search_by_vector(str(user), query, args.k)]
+            for user, query in zip(query_users, queries)
+        ]
+        query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        size = index_bytes(index)
+        if exact is None:
+            exact, flat_bytes = results, size
+        overlap = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(results, exact)])
+        print(f"  {index_type:>8} ({index.get_stats()['active_index_type']:>7}): "
+              f"인덱스 {size / 1024 / 1024:8.2f}MB ({flat_bytes / size:5.1f}배 절약), "
+              f"top-{args.k} 일치율 {overlap * 100:5.1f}%, 질의 {query_ms:6.2f}ms, 생성 {build_seconds:5.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# embedding_dimensions.py
+
+# 임베딩 차원(256/512/1024/1536)별 인덱스 크기, 검색 지연 시간,
+# 가장 큰 차원 대비 top-k 검색 결과 일치율을 샘플 이력서 코퍼스(benchmarks/sample_resumes)로 측정합니다.
+# - truncate(기본): 가장 큰 차원으로 한 번 임베딩한 뒤 앞부분을 잘라 다시 정규화합니다.
+#   text-embedding-3 계열의 dimensions 파라미터와 같은 방식이므로 API를 한 번만 호출합니다.
+# - native: 차원마다 dimensions 파라미터로 다시 임베딩합니다.
+#
+# 사용 예:
+#   python benchmarks/embedding_dimensions.py
+#   python benchmarks/embedding_dimensions.py --dims 256 512 1024 1536 --k 5 --method native
+#   EMBEDDING_BACKEND=hashing python benchmarks/embedding_dimensions.py   (오프라인 동작 확인용)
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_DIR = os.path.join(SERVICE_DIR, "benchmarks", "sample_resumes")
+sys.path.insert(0, SERVICE_DIR)
+os.environ.setdefault("DOCUMENT_WORKERS", "0")  # 분할은 현재 프로세스에서 실행
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from document_processing import split_documents
+from embedding_backends import EmbeddingBackend
+
+# 툴 프롬프트/검색에서 실제로 쓰이는 형태의 질의
+QUERIES = [
+    "이력서 기반 직무 및 역량 추천을 해주세요.",
+    "이 지원자의 주요 기술 스택은 무엇인가요?",
+    "가장 큰 성과를 낸 프로젝트는 무엇인가요?",
+    "경력 기간과 담당 업무를 알려주세요.",
+    "학력 사항을 알려주세요.",
+    "성능 개선 경험이 있나요?",
+    "데이터 분석 도구 사용 경험",
+    "협업과 커뮤니케이션 경험",
+    "캠페인 기획과 광고 운영 성과",
+    "사용자 리서치와 사용성 테스트",
+    "자기소개서에서 강조한 강점",
+    "면접에서 물어볼 만한 기술 질문",
+]
+
+
+def _normalize(x):
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype("float32")
+
+
+def load_corpus(chunk_size: int, chunk_overlap: int):
+    documents = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            documents.append(Document(page_content=f.read(), metadata={"source": os.path.basename(path)}))
+    chunks = split_documents(documents, chunk_size, chunk_overlap, unit="chars")
+    return [chunk.page_content for chunk in chunks], [chunk.metadata["source"] for chunk in chunks]
+
+
+def embed(backend_name: str, model, dims, texts):
+    embeddings = EmbeddingBackend(backend_name, model, dims, api_key=os.getenv("OPENAI_API_KEY")).create()
+    # 질의는 서비스와 같이 embed_query로 임베딩 (질의/문서를 다르게 처리하는 백엔드에서도 실제 검색과 같은 조건)
+    return (_normalize(np.asarray(embeddings.embed_documents(texts), dtype="float32")),
+            _normalize(np.asarray([embeddings.embed_query(query) for query in QUERIES], dtype="float32")))
+
+
+def search(vectors, queries, k: int, sources, repeats: int):
+    """
+    코퍼스 전체 검색과 이력서별(테넌트) 검색 결과, 질의당 평균 지연 시간(ms)을 반환합니다.
+    """
+    import faiss
+
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _, found = index.search(queries, k)
+        timings.append((time.perf_counter() - started) * 1000 / len(queries))
+
+    per_source = {}
+    for source in sorted(set(sources)):
+        ids = np.asarray([i for i, s in enumerate(sources) if s == source], dtype="int64")
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(ids))
+        _, per_source[source] = index.search(queries, min(k, len(ids)), params=params)
+    return found, per_source, statistics.median(timings), len(faiss.serialize_index(index))
+
+
+def agreement(found, reference) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, reference)]))
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="임베딩 차원별 인덱스 크기/검색 지연/top-k 일치율 비교")
+    parser.add_argument("--dims", type=int, nargs="*", default=[256, 512, 1024, 1536], help="비교할 차원")
+    parser.add_argument("--k", type=int, default=5, help="검색 결과 수")
+    parser.add_argument("--chunk-size", type=int, default=150, help="청크 크기 (문자)")
+    parser.add_argument("--chunk-overlap", type=int, default=30, help="청크 겹침 (문자)")
+    parser.add_argument("--method", choices=("truncate", "native"), default="truncate", help="축소 차원 생성 방식")
+    parser.add_argument("--repeats", type=int, default=20, help="지연 시간 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--embedding-backend", default=os.getenv("EMBEDDING_BACKEND", "openai"))
+    parser.add_argument("--embedding-model", default=os.getenv("EMBEDDING_MODEL"))
+    args = parser.parse_args()
+
+    texts, sources = load_corpus(args.chunk_size, args.chunk_overlap)
+    dims = sorted(args.dims)
+    full_vectors, full_queries = embed(args.embedding_backend, args.embedding_model, dims[-1], texts)
+    print(f"코퍼스: 이력서 {len(set(sources))}개, 청크 {len(texts)}개, 질의 {len(QUERIES)}개, k={args.k}, "
+          f"백엔드 {args.embedding_backend}, 방식 {args.method}")
+
+    results = {}
+    for dim in dims:
+        if dim == dims[-1]:
+            vectors, queries = full_vectors, full_queries
+        elif args.method == "truncate":
+            vectors, queries = _normalize(full_vectors[:, :dim]), _normalize(full_queries[:, :dim])
+        else:
+            vectors, queries = embed(args.embedding_backend, args.embedding_model, dim, texts)
+        results[dim] = search(vectors, queries, args.k, sources, args.repeats)
+
+    reference_global, reference_per_source = results[dims[-1]][0], results[dims[-1]][1]
+    for dim in dims:
+        found, per_source, latency_ms, size = results[dim]
+        per_source_agreement = statistics.mean(
+            agreement(per_source[source], reference_per_source[source]) for source in per_source
+        )
+        print(f"  {dim:>5}차원: 인덱스 {size / 1024:8.1f}KB, 검색 {latency_ms * 1000:7.1f}us/질의, "
+              f"top-{args.k} 일치율 전체 {agreement(found, reference_global) * 100:5.1f}% "
+              f"/ 이력서별 {per_source_agreement * 100:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
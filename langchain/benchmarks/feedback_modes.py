@@ -0,0 +1,64 @@
+# feedback_modes.py
+
+# 면접 답변 피드백 툴의 두 생성 방식(combined: LLM 호출 1회, sequential: LLM 호출 2회)의 지연 시간을 비교합니다.
+# 두 방식 모두 이력서 검색은 한 번만 수행하며, 샘플 이력서(benchmarks/sample_resumes)로 같은 질문/답변을 번갈아 실행합니다.
+# 실제 LLM을 호출하므로 OPENAI_API_KEY가 필요합니다. (실행 중인 서비스의 /api/metrics의 feedback_latency에서도 확인 가능)
+#
+# 사용 예:
+#   python benchmarks/feedback_modes.py
+#   python benchmarks/feedback_modes.py --resume backend_developer.txt --runs 5
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(os.path.join(__file__, os.pardir)))
+SAMPLE_DIR = os.path.join(SERVICE_DIR, "benchmarks", "sample_resumes")
+sys.path.insert(0, SERVICE_DIR)
+os.chdir(SERVICE_DIR)  # 서비스와 같은 업로드/인덱스 경로 사용
+
+QUESTION = "가장 어려웠던 프로젝트와 그 문제를 어떻게 해결했는지 말씀해주세요."
+ANSWER = "이전 회사에서 주문 API 응답이 느려지는 문제가 있었는데, 원인을 찾아서 캐시를 적용해 해결했습니다. 팀원들과 협업도 잘 했습니다."
+
+
+async def main_async(args):
+    import backend_api_js as service
+
+    file_path = os.path.join(SAMPLE_DIR, args.resume)
+    modes = list(service.FEEDBACK_MODES)
+    for run in range(args.warmup + args.runs):
+        for mode in modes if run % 2 == 0 else reversed(modes):
+            result = json.loads(await service.get_interview_feedback_and_improved_answer_tool.ainvoke(json.dumps({
+                "file_path": file_path,
+                "original_question": QUESTION,
+                "user_answer": ANSWER,
+                "temperature": args.temperature,
+                "feedback_mode": mode,
+            }, ensure_ascii=False)))
+            if "error" in result:
+                raise RuntimeError(f"{mode}: {result['error']}")
+        if run + 1 == args.warmup:
+            service.feedback_latency = service.LatencyStats()  # 인덱스 생성/프로필 추출이 포함된 준비 실행은 제외
+
+    stats = service.feedback_latency.get_stats()
+    print(f"{'모드':<12}{'실행':>6}{'평균(s)':>10}{'p50(s)':>10}{'p95(s)':>10}{'검색(s)':>10}{'생성(s)':>10}{'LLM 호출':>10}")
+    for mode in modes:
+        row = stats[mode]
+        print(f"{mode:<12}{row['calls']:>6}{row['avg_s']:>10.2f}{row['p50_s']:>10.2f}{row['p95_s']:>10.2f}"
+              f"{row['avg_retrieval_s']:>10.3f}{row['avg_generation_s']:>10.2f}{row['avg_llm_calls']:>10.1f}")
+    if stats["sequential"]["avg_s"]:
+        print(f"\ncombined / sequential 평균 지연 시간: {stats['combined']['avg_s'] / stats['sequential']['avg_s']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="면접 답변 피드백 툴 생성 방식별 지연 시간 비교")
+    parser.add_argument("--resume", default="backend_developer.txt")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--temperature", type=float, default=0.5)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
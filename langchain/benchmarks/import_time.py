@@ -0,0 +1,101 @@
+# import_time.py
+
+# 서비스 모듈 임포트(기동) 시간을 `python -X importtime`으로 측정하여 보고합니다.
+# - 여러 번 측정한 중앙값이 예산(--budget-ms)을 넘거나,
+# - 기동 시 임포트되면 안 되는 무거운 모듈(--forbid)이 임포트되면 종료 코드 1로 실패합니다.
+#
+# 사용 예:
+#   python benchmarks/import_time.py
+#   python benchmarks/import_time.py --module backend_api_js --budget-ms 1200 --runs 5 --top 15
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 첫 사용 시점에 임포트되어야 하는 무거운 의존성
+DEFAULT_FORBIDDEN = [
+    "langchain_openai",
+    "openai",
+    "faiss",
+    "pypdf",
+    "unstructured",
+    "langchain.agents",
+    "langchain.chains",
+    "langchain_community.vectorstores",
+    "langchain_community.document_loaders",
+]
+
+
+def measure(module: str):
+    """
+    새 인터프리터에서 모듈을 임포트하고 {모듈 이름: (self_us, cumulative_us, depth)}를 반환합니다.
+    """
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-import-benchmark")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"'{module}' 임포트 실패:\n{completed.stderr[-2000:]}")
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+        timings[raw_name.strip()] = (self_us, cumulative_us, depth)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서비스 기동 시 임포트 시간 측정")
+    parser.add_argument("--module", default="backend_api_js", help="측정할 서비스 모듈 (기본: Dockerfile에서 실행하는 모듈)")
+    parser.add_argument("--runs", type=int, default=3, help="측정 횟수 (중앙값 사용)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1200")),
+                        help="허용하는 임포트 시간 (밀리초)")
+    parser.add_argument("--top", type=int, default=10, help="보고서에 표시할 최상위 패키지 수")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN, help="기동 시 임포트되면 안 되는 모듈")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    # 마지막 측정 결과 기준으로 최상위 패키지별 누적 시간 보고
+    last = runs[-1]
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in last.items() if depth <= 1 and name != args.module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    print(f"모듈: {args.module}")
+    print(f"임포트 시간: 중앙값 {median_ms:.1f}ms (측정값: {', '.join(f'{t:.1f}' for t in totals_ms)}), 예산 {args.budget_ms:.0f}ms")
+    print(f"상위 {args.top}개 임포트 (누적):")
+    for name, cumulative in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failures = []
+    imported_forbidden = [name for name in args.forbid if name in last]
+    if imported_forbidden:
+        failures.append(f"기동 시 임포트되면 안 되는 모듈이 임포트되었습니다: {', '.join(imported_forbidden)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"임포트 시간이 예산을 초과했습니다: {median_ms:.1f}ms > {args.budget_ms:.0f}ms")
+
+    for failure in failures:
+        print(f"실패: {failure}")
+    if failures:
+        sys.exit(1)
+    print("통과")
+
+
+if __name__ == "__main__":
+    main()
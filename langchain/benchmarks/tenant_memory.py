@@ -0,0 +1,118 @@
+# tenant_memory.py
+
+# 사용자별 FAISS 객체(기존 구조)와 공유 멀티 테넌트 인덱스의 사용자당 메모리 사용량을 비교합니다.
+# 각 구조를 별도 프로세스에서 만들고, 생성 전후 상주 메모리(RSS) 차이를 사용자 수로 나누어 보고합니다.
+# 임베딩 API는 호출하지 않으며, 벡터는 무작위 값을 사용합니다.
+#
+# 사용 예:
+#   python benchmarks/tenant_memory.py
+#   python benchmarks/tenant_memory.py --users 2000 --chunks 10 --dimension 1536 --embedding-backend openai
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAYOUTS = ("per_user", "shared")
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _chunk_text(user: int, chunk: int, chunk_chars: int) -> str:
+    return (f"사용자 {user} 이력서 청크 {chunk}: Spring Boot, Kafka, Redis 기반 백엔드 개발 경험. " * 20)[:chunk_chars]
+
+
+def run_layout(layout: str, users: int, chunks: int, dimension: int, chunk_chars: int, backend: str):
+    """
+    (현재 프로세스에서) 한 가지 구조로 users명의 인덱스를 만들고 메모리 사용량을 반환합니다.
+    """
+    sys.path.insert(0, SERVICE_DIR)
+    import gc
+    import numpy as np
+    from langchain_community.vectorstores import FAISS
+    from embedding_backends import EmbeddingBackend
+    from shared_vector_index import SharedVectorIndex
+
+    embedding_backend = EmbeddingBackend(backend, dimensions=dimension,
+                                         api_key=os.getenv("OPENAI_API_KEY", "sk-memory-benchmark"))
+    rng = np.random.default_rng(0)
+    # 라이브러리 초기화 비용이 측정에 섞이지 않도록 한 번 만들어 둠
+    FAISS.from_embeddings([("warmup", rng.random(dimension).tolist())], embedding_backend.create())
+    shared = SharedVectorIndex(embedding_backend.create)
+    gc.collect()
+    before = _rss_bytes()
+
+    per_user = {}
+    for user in range(users):
+        texts = [_chunk_text(user, chunk, chunk_chars) for chunk in range(chunks)]
+        vectors = rng.random((chunks, dimension), dtype=np.float32)
+        metadatas = [{"source": f"uploads/user{user}.pdf", "page": chunk} for chunk in range(chunks)]
+        if layout == "per_user":
+            # 기존 구조: 사용자마다 FAISS 객체, docstore, 임베딩 객체를 따로 보관
+            per_user[str(user)] = FAISS.from_embeddings(
+                list(zip(texts, vectors.tolist())), embedding_backend.create(), metadatas=metadatas
+            )
+        else:
+            shared.add(str(user), f"hash{user}", texts, vectors, metadatas)
+
+    gc.collect()
+    used = _rss_bytes() - before
+    vector_bytes = users * chunks * dimension * 4
+    return {
+        "layout": layout,
+        "users": users,
+        "chunks_per_user": chunks,
+        "dimension": dimension,
+        "rss_increase_mb": round(used / 1024 / 1024, 1),
+        "bytes_per_user": used // users,
+        "overhead_bytes_per_user": (used - vector_bytes) // users,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="사용자별 인덱스와 공유 인덱스의 사용자당 메모리 비교")
+    parser.add_argument("--users", type=int, default=1000, help="사용자(이력서) 수")
+    parser.add_argument("--chunks", type=int, default=8, help="사용자당 청크 수")
+    parser.add_argument("--dimension", type=int, default=1536, help="벡터 차원")
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="청크 본문 길이(문자)")
+    parser.add_argument("--embedding-backend", default="fake",
+                        help="사용자별 구조에서 인덱스마다 생성하는 임베딩 객체의 백엔드 (openai이면 API 클라이언트 포함)")
+    parser.add_argument("--layout", choices=LAYOUTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.layout:
+        result = run_layout(args.layout, args.users, args.chunks, args.dimension, args.chunk_chars,
+                            args.embedding_backend)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for layout in LAYOUTS:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--layout", layout, "--users", str(args.users),
+             "--chunks", str(args.chunks), "--dimension", str(args.dimension),
+             "--chunk-chars", str(args.chunk_chars), "--embedding-backend", args.embedding_backend],
+            cwd=SERVICE_DIR, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"'{layout}' 측정 실패:\n{completed.stderr[-2000:]}")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    vector_kb = args.chunks * args.dimension * 4 / 1024
+    print(f"사용자 {args.users}명, 사용자당 청크 {args.chunks}개, 차원 {args.dimension} "
+          f"(사용자당 벡터 {vector_kb:.1f}KB), 임베딩 백엔드 {args.embedding_backend}")
+    for result in results:
+        print(f"  {result['layout']:>8}: RSS 증가 {result['rss_increase_mb']:8.1f}MB, "
+              f"사용자당 {result['bytes_per_user'] / 1024:8.1f}KB "
+              f"(벡터 외 오버헤드 {result['overhead_bytes_per_user'] / 1024:8.1f}KB)")
+
+
+if __name__ == "__main__":
+    main()
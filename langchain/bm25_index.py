@@ -0,0 +1,104 @@
+# bm25_index.py
+
+# 청크 본문에 대한 프로세스 내 역색인(BM25)과 검색 결과 순위 융합(RRF)
+# - "Spring Boot 2.x", "Kafka", "QueryDSL"처럼 기술 이름을 그대로 언급하는 질의가
+#   벡터 검색에서 놓친 청크를 키워드 일치로 찾도록 합니다.
+# - 한국어는 띄어쓰기 단위에 조사가 붙으므로, 흔한 조사를 떼어낸 어간과 글자 2-gram을 함께 색인합니다.
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+# 영문/숫자 토큰은 '.', '+', '#'을 포함한 형태(2.x, node.js, c++, c#)를 유지하고, 한글은 연속된 음절 단위
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+(?:[.+#]+[0-9a-z]*)*|[가-힣]+")
+
+# 떼어낼 조사 (긴 것부터 확인)
+_JOSA = sorted([
+    "으로서", "으로써", "에서는", "로서", "로써", "에게서", "까지", "부터", "에서", "에게", "으로", "보다", "처럼", "이나", "이며",
+    "은", "는", "이", "가", "을", "를", "에", "의", "로", "와", "과", "도", "만", "나",
+], key=len, reverse=True)
+
+# BM25 파라미터
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# RRF 순위 상수 (값이 클수록 하위 순위의 영향이 커짐)
+RRF_K = 60
+
+
+def _strip_josa(word: str) -> str:
+    for josa in _JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[:-len(josa)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰 목록을 만듭니다.
+    영문/숫자는 소문자 토큰(구분자가 있으면 부분 토큰도 추가), 한글은 조사를 뗀 어간과 글자 2-gram을 사용합니다.
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        if word[0] < "가":
+            tokens.append(word)
+            parts = [part for part in re.split(r"[.+#]+", word) if part]
+            if len(parts) > 1:
+                tokens.extend(parts)
+            continue
+        if word in _JOSA:
+            continue  # 영문/숫자 뒤에 붙어 분리된 조사 ("2.x와", "QueryDSL을")
+        stem = _strip_josa(word)
+        tokens.append(stem)
+        if len(stem) > 2:
+            tokens.extend(f"#{stem[i:i + 2]}" for i in range(len(stem) - 1))
+    return tokens
+
+
+class Bm25Index:
+    """
+    한 문서(테넌트)의 청크 목록에 대한 BM25 역색인입니다. 생성 후에는 변경하지 않습니다.
+    """
+
+    def __init__(self, texts: Sequence[str]):
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}  # {토큰: [(청크 위치, 출현 횟수)]}
+        self._lengths: List[int] = []
+        for position, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self._lengths.append(sum(counts.values()))
+            for token, count in counts.items():
+                self._postings.setdefault(token, []).append((position, count))
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    @property
+    def num_terms(self) -> int:
+        return len(self._postings)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        질의와 키워드가 일치하는 청크를 BM25 점수 순으로 최대 k개 반환합니다. [(청크 위치, 점수)]
+        """
+        num_documents = len(self._lengths)
+        if not num_documents:
+            return []
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (num_documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[position] / (self._average_length or 1))
+                scores[position] = scores.get(position, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[int]:
+    """
+    여러 검색 결과 순위를 RRF(1 / (k + 순위)) 점수 합으로 융합한 순서를 반환합니다.
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
@@ -0,0 +1,146 @@
+# chunk_dedup.py
+
+# 임베딩 전에 중복/유사 청크를 제거합니다.
+# - 페이지마다 반복되는 머리말/꼬리말 줄("홍길동 이력서", "- 2 / 3 -")은 분할 전에 페이지에서 제거합니다.
+# - 정규화한 본문이 같은 청크는 해시로 바로 제거합니다.
+# - 글자 n-gram(shingle) 집합의 MinHash 서명과 LSH 밴드로 후보를 찾고, 실제 Jaccard 유사도가 임계값 이상이면 제거합니다.
+# 제거된 청크 수는 남은 청크의 metadata["duplicates"]와 반환 통계에 기록합니다.
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 밴드당 4행: Jaccard 약 0.5 이상이면 높은 확률로 후보가 됨
+
+# 머리말/꼬리말 후보로 볼 페이지 앞/뒤 줄 수와, 반복으로 판단할 최소 페이지 수/비율
+EDGE_LINES = 2
+REPEATED_LINE_MIN_PAGES = 3
+REPEATED_LINE_MIN_RATIO = 0.5
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+# 쪽 번호 줄 ("- 2 / 3 -", "Page 2 of 3", "2쪽")
+_PAGE_NUMBER = re.compile(r"^\W*(?:page|p\.|페이지)?\W*\d+(?:\W*(?:/|of)\W*\d+)?\W*(?:page|페이지|쪽)?\W*$")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+def _line_key(line: str) -> str:
+    # 쪽 번호 줄은 번호만 다른 줄("1 / 3", "2 / 3")을 같은 줄로 취급 (본문의 연도/수치는 그대로 비교)
+    normalized = _normalize(line)
+    return _DIGITS.sub("#", normalized) if _PAGE_NUMBER.match(normalized) else normalized
+
+
+def strip_repeated_lines(documents: List[Document]) -> Tuple[List[Document], int]:
+    """
+    여러 페이지의 앞/뒤 EDGE_LINES줄에 반복해서 나오는 머리말/꼬리말 줄을 제거합니다.
+    (제거 후 문서 목록, 제거한 줄 수)를 반환합니다.
+    """
+    if len(documents) < REPEATED_LINE_MIN_PAGES:
+        return documents, 0
+
+    def edge_positions(lines: List[str]) -> List[int]:
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        if len(non_empty) <= 2 * EDGE_LINES:
+            return []  # 본문이 짧은 페이지는 머리말/꼬리말과 구분할 수 없음
+        return non_empty[:EDGE_LINES] + non_empty[-EDGE_LINES:]
+
+    page_lines = [doc.page_content.splitlines() for doc in documents]
+    page_edges = [edge_positions(lines) for lines in page_lines]
+    counts = Counter(
+        key for lines, edges in zip(page_lines, page_edges) for key in {_line_key(lines[i]) for i in edges}
+    )
+    min_pages = max(REPEATED_LINE_MIN_PAGES, int(len(documents) * REPEATED_LINE_MIN_RATIO))
+    repeated = {key for key, count in counts.items() if count >= min_pages}
+    if not repeated:
+        return documents, 0
+
+    stripped, removed = [], 0
+    for doc, lines, edges in zip(documents, page_lines, page_edges):
+        # 머리말/꼬리말 위치의 줄만 제거 (본문 가운데 같은 줄은 유지)
+        removable = {i for i in edges if _line_key(lines[i]) in repeated}
+        kept = [line for i, line in enumerate(lines) if i not in removable]
+        removed += len(lines) - len(kept)
+        stripped.append(Document(page_content="\n".join(kept), metadata=doc.metadata))
+    return stripped, removed
+
+
+def _shingles(text: str) -> Set[int]:
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode("utf-8")) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _permutations():
+    import numpy as np
+
+    rng = np.random.default_rng(1)  # 실행마다 같은 서명이 나오도록 고정
+    a = rng.integers(1, _MERSENNE_PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+    return a, b
+
+
+def _minhash_bands(shingles: Set[int], a, b) -> List[Tuple[int, bytes]]:
+    import numpy as np
+
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))[None, :]
+    signature = ((a * values + b) % _MERSENNE_PRIME).min(axis=1)
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+
+def deduplicate_chunks(documents: List[Document], threshold: float = 0.85) -> Tuple[List[Document], Dict[str, int]]:
+    """
+    문서 순서를 유지하면서 완전히 같은 청크와 Jaccard 유사도가 threshold 이상인 청크를 제거합니다.
+    먼저 나온 청크를 남기며, threshold가 1 이상이면 완전히 같은 청크만 제거합니다.
+    (남은 청크 목록, {"chunks_duplicate_exact": n, "chunks_duplicate_near": n})를 반환합니다.
+    """
+    kept: List[Document] = []
+    kept_shingles: List[Set[int]] = []
+    exact_index: Dict[str, int] = {}
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    exact, near = 0, 0
+    permutations = _permutations() if threshold < 1 else None
+
+    def merge_into(position: int):
+        metadata = kept[position].metadata
+        metadata["duplicates"] = metadata.get("duplicates", 0) + 1
+
+    for doc in documents:
+        normalized = _normalize(doc.page_content)
+        if not normalized:
+            continue
+        if normalized in exact_index:
+            merge_into(exact_index[normalized])
+            exact += 1
+            continue
+
+        shingles: Set[int] = set()
+        bands: List[Tuple[int, bytes]] = []
+        duplicate_of: Optional[int] = None
+        if permutations is not None and len(normalized) >= SHINGLE_SIZE:
+            shingles = _shingles(normalized)
+            bands = _minhash_bands(shingles, *permutations)
+            candidates = {position for band in bands for position in buckets.get(band, ())}
+            for position in sorted(candidates):
+                other = kept_shingles[position]
+                if len(shingles & other) / len(shingles | other) >= threshold:
+                    duplicate_of = position
+                    break
+        if duplicate_of is not None:
+            merge_into(duplicate_of)
+            near += 1
+            continue
+
+        position = len(kept)
+        kept.append(Document(page_content=doc.page_content, metadata=dict(doc.metadata)))
+        kept_shingles.append(shingles)
+        exact_index[normalized] = position
+        for band in bands:
+            buckets.setdefault(band, []).append(position)
+    return kept, {"chunks_duplicate_exact": exact, "chunks_duplicate_near": near}
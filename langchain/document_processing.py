@@ -0,0 +1,220 @@
+# document_processing.py
+
+# 문서 텍스트 추출과 청크 분할(CPU 작업)을 프로세스 풀에서 실행합니다.
+# - 단일 uvicorn 이벤트 루프와 요청 처리 스레드가 파싱 작업 때문에 멈추지 않도록 합니다.
+# - 페이지가 많은 PDF는 페이지 구간별로 나누어 여러 프로세스에서 동시에 추출합니다.
+# - 작업자 수는 DOCUMENT_WORKERS 환경 변수로 지정하며, 기본값은 컨테이너 CPU 제한을 따릅니다.
+# - 청크 크기 단위는 CHUNK_SIZE_UNIT(chars | tokens)으로 지정합니다. tokens이면 chunk_size/chunk_overlap을 토큰 수로 봅니다.
+# - 분할한 청크 중 완전히 같거나 거의 같은 청크는 임베딩 전에 제거합니다. (chunk_dedup)
+# - 분할 전에 이력서 섹션(학력/경력/기술 스택/프로젝트/자기소개)을 찾아, 청크가 섹션 경계를 넘지 않고 section 메타데이터를 갖도록 합니다.
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+# PDF 한 작업에서 처리할 페이지 수 (이보다 많은 PDF는 페이지 구간별로 나누어 추출)
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+SUPPORTED_EXTENSIONS = ("pdf", "txt", "docx")
+
+CHUNK_SIZE_UNITS = ("chars", "tokens")
+CHUNK_SIZE_UNIT = os.getenv("CHUNK_SIZE_UNIT", "chars").lower()
+if CHUNK_SIZE_UNIT not in CHUNK_SIZE_UNITS:
+    raise ValueError(f"지원되지 않는 CHUNK_SIZE_UNIT입니다: {CHUNK_SIZE_UNIT} (지원: {', '.join(CHUNK_SIZE_UNITS)})")
+
+
+def detect_cpu_limit() -> int:
+    """
+    컨테이너 CPU 제한(cgroup v2/v1)을 읽어 사용할 수 있는 CPU 개수를 반환합니다.
+    제한이 없으면 현재 프로세스가 사용할 수 있는 CPU 개수를 반환합니다.
+    """
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r") as f:
+            limit, period = f.read().split()[:2]
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+    if quota:
+        return max(1, min(available, math.ceil(quota)))
+    return max(1, available)
+
+
+# 프로세스 풀 작업자 수 (0이면 프로세스 풀 없이 호출한 스레드에서 직접 처리)
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", str(detect_cpu_limit())))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if DOCUMENT_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # 여러 스레드가 동작 중인 서버 프로세스를 fork하지 않도록 forkserver/spawn 방식 사용
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=DOCUMENT_WORKERS, mp_context=context)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _run(fn, *args):
+    pool = _get_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+# --- 프로세스 풀에서 실행되는 함수들 (모듈 최상위에 있어야 pickle 가능) ---
+
+def _pdf_page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[Document]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    total_pages = len(reader.pages)
+    try:
+        page_labels = reader.page_labels
+    except Exception:
+        page_labels = []
+    documents = []
+    for page_number in range(start, min(end, total_pages)):
+        metadata = {"source": file_path, "total_pages": total_pages, "page": page_number}
+        if page_number < len(page_labels):
+            metadata["page_label"] = page_labels[page_number]
+        documents.append(Document(page_content=reader.pages[page_number].extract_text().strip(), metadata=metadata))
+    return documents
+
+
+def _load_with_loader(file_path: str, file_extension: str) -> List[Document]:
+    if file_extension == "txt":
+        from langchain_community.document_loaders import TextLoader
+
+        return TextLoader(file_path).load()
+    try:
+        from langchain_community.document_loaders import UnstructuredWordDocumentLoader
+
+        return UnstructuredWordDocumentLoader(file_path).load()
+    except ImportError:
+        raise ValueError(
+            "DOCX 파일 처리를 위해 'unstructured' 라이브러리가 필요합니다. "
+            "설치하려면 'pip install unstructured' 및 'pip install unstructured[docx]'를 실행해주세요."
+        )
+
+
+def _split(documents: List[Document], chunk_size: int, chunk_overlap: int, unit: str = "chars") -> List[Document]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    from resume_sections import split_sections
+
+    length_function = len
+    if unit == "tokens":
+        from token_budget import count_tokens
+
+        length_function = count_tokens
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=length_function,
+        separators=["\n\n", "\n", ".", " ", ""]
+    )
+    return text_splitter.split_documents(split_sections(documents))
+
+
+def _deduplicate(documents: List[Document], threshold: float):
+    from chunk_dedup import deduplicate_chunks
+
+    return deduplicate_chunks(documents, threshold)
+
+
+# --- 외부에서 사용하는 함수들 ---
+
+def get_file_extension(file_path: str) -> str:
+    """
+    지원 여부를 확인하고 소문자 확장자를 반환합니다. 지원하지 않는 형식이면 ValueError를 발생시킵니다.
+    """
+    file_extension = file_path.lower().split('.')[-1]
+    if file_extension == "doc": # .doc 파일은 구형 형식으로 직접 지원하지 않음
+        raise ValueError(
+            "'.doc' 파일은 구형 형식으로 직접 지원되지 않습니다. "
+            "파일을 '.docx' 또는 '.pdf'로 변환하여 업로드해주세요."
+        )
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError("지원되지 않는 파일 형식입니다. PDF, DOCX, TXT 파일만 업로드해주세요.")
+    return file_extension
+
+
+def extract_documents(file_path: str) -> List[Document]:
+    """
+    문서 파일에서 페이지/문서 단위 텍스트를 추출합니다. 지원 형식: PDF, DOCX, TXT
+    PDF는 PDF_PAGES_PER_TASK 페이지 단위로 나누어 프로세스 풀에서 동시에 추출합니다.
+    """
+    file_extension = get_file_extension(file_path)
+    if file_extension != "pdf":
+        return _run(_load_with_loader, file_path, file_extension)
+
+    total_pages = _run(_pdf_page_count, file_path)
+    pool = _get_pool()
+    if pool is None or total_pages <= PDF_PAGES_PER_TASK:
+        return _run(_extract_pdf_pages, file_path, 0, total_pages)
+
+    futures = [
+        pool.submit(_extract_pdf_pages, file_path, start, start + PDF_PAGES_PER_TASK)
+        for start in range(0, total_pages, PDF_PAGES_PER_TASK)
+    ]
+    return [document for future in futures for document in future.result()]
+
+
+def split_documents(documents: List[Document], chunk_size: int, chunk_overlap: int,
+                    unit: str = CHUNK_SIZE_UNIT) -> List[Document]:
+    """
+    문서를 섹션별로 나눈 뒤 청크로 분할합니다. 분할 작업은 프로세스 풀에서 실행합니다.
+    각 청크의 metadata["section"]에는 청크가 속한 이력서 섹션 이름이 기록됩니다.
+    unit이 tokens이면 chunk_size/chunk_overlap을 문자 수가 아닌 토큰 수로 계산합니다.
+    """
+    return _run(_split, documents, chunk_size, chunk_overlap, unit)
+
+
+def deduplicate_documents(documents: List[Document], threshold: float):
+    """
+    완전히 같거나 Jaccard 유사도가 threshold 이상인 청크를 제거합니다. 계산은 프로세스 풀에서 실행합니다.
+    (남은 청크 목록, 제거한 청크 수 통계)를 반환합니다.
+    """
+    return _run(_deduplicate, documents, threshold)
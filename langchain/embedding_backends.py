@@ -0,0 +1,146 @@
+# embedding_backends.py
+
+# 설정(EMBEDDING_BACKEND)으로 선택하는 임베딩 백엔드
+# - openai  : OpenAI 임베딩 API (기본값)
+# - local   : sentence-transformers 로컬 CPU 모델 (네트워크 없이 실행, 'pip install sentence-transformers' 필요)
+# - hashing : 단어/문자 n-gram 해싱 임베딩 (추가 의존성과 네트워크 없이 실행)
+# - fake    : 텍스트 해시로 고정되는 무작위 벡터 (벤치마크/부하 테스트용)
+# backend_id는 백엔드, 모델, 차원을 함께 나타내며 임베딩 캐시 네임스페이스와 인덱스 메타데이터에 기록됩니다.
+# backend_id가 다른 인덱스/캐시 벡터는 서로 섞어 쓰지 않습니다.
+# openai 백엔드는 http_clients(공유 연결 풀)가 주어지면 그 httpx 클라이언트를 사용합니다.
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import embedding_namespace
+
+SUPPORTED_BACKENDS = ("openai", "local", "hashing", "fake")
+
+# 백엔드별 기본 모델/차원
+DEFAULT_LOCAL_MODEL = "intfloat/multilingual-e5-small"
+DEFAULT_HASHING_DIMENSIONS = 1024
+DEFAULT_FAKE_DIMENSIONS = 1536
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    단어와 단어 내부 문자 n-gram(2~3자)을 해싱하여 고정 차원 벡터로 만듭니다.
+    조사가 붙은 한국어 단어도 n-gram으로 일부 일치하도록 합니다. 결과는 L2 정규화됩니다.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    @staticmethod
+    def _features(text: str) -> Counter:
+        features = Counter()
+        for word in _TOKEN_PATTERN.findall(text.lower()):
+            features[f"w:{word}"] += 1.0
+            for n in (2, 3):
+                for start in range(len(word) - n + 1):
+                    features[f"c:{word[start:start + n]}"] += 0.5
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature, count in self._features(text).items():
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dimensions] += sign * (1.0 + math.log(count))
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm:
+            vector = [value / norm for value in vector]
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class EmbeddingBackend:
+    """
+    선택한 임베딩 백엔드의 설정을 보관하고, 필요할 때 Embeddings 객체를 생성합니다.
+    """
+
+    def __init__(self, name: str, model: Optional[str] = None, dimensions: Optional[int] = None,
+                 api_key: Optional[str] = None, http_clients=None):
+        name = (name or "openai").lower()
+        if name not in SUPPORTED_BACKENDS:
+            raise ValueError(
+                f"지원되지 않는 임베딩 백엔드입니다: {name} (지원: {', '.join(SUPPORTED_BACKENDS)})"
+            )
+        if name == "openai" and not api_key:
+            raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+        if dimensions is not None and dimensions <= 0:
+            raise ValueError(f"임베딩 차원은 양수여야 합니다: {dimensions}")
+        if name == "local" and dimensions:
+            raise ValueError("local 임베딩 백엔드는 EMBEDDING_DIMENSIONS 설정을 지원하지 않습니다. (모델 고유 차원 사용)")
+        self.name = name
+        self.api_key = api_key
+        self.dimensions = dimensions
+        self.http_clients = http_clients  # http_client / http_async_client 속성을 가진 객체 (ModelClients)
+        self._shared = None
+        self._lock = threading.Lock()
+        if name == "openai":
+            self.model = model or "text-embedding-3-small"
+        elif name == "local":
+            self.model = model or DEFAULT_LOCAL_MODEL
+        elif name == "hashing":
+            self.model = "hashing-v1"
+            self.dimensions = dimensions or DEFAULT_HASHING_DIMENSIONS
+        else:
+            self.model = "fake-v1"
+            self.dimensions = dimensions or DEFAULT_FAKE_DIMENSIONS
+
+    @property
+    def backend_id(self) -> str:
+        """
+        임베딩 캐시 네임스페이스와 인덱스 메타데이터에 기록하는 식별자 (백엔드:모델:차원)
+        """
+        return f"{self.name}:{embedding_namespace(self.model, self.dimensions)}"
+
+    def get(self) -> Embeddings:
+        """
+        프로세스에서 공유하는 Embeddings 객체를 반환합니다. (처음 호출할 때 한 번만 생성)
+        """
+        with self._lock:
+            if self._shared is None:
+                self._shared = self.create()
+            return self._shared
+
+    def create(self) -> Embeddings:
+        if self.name == "openai":
+            from langchain_openai import OpenAIEmbeddings
+
+            # text-embedding-3 계열은 dimensions로 축소된 차원의 벡터를 반환 (None이면 모델 기본 차원)
+            client_kwargs = {}
+            if self.http_clients is not None:
+                client_kwargs = {"http_client": self.http_clients.http_client,
+                                 "http_async_client": self.http_clients.http_async_client}
+            return OpenAIEmbeddings(api_key=self.api_key, model=self.model, dimensions=self.dimensions, **client_kwargs)
+        if self.name == "local":
+            try:
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+
+                return HuggingFaceEmbeddings(model_name=self.model, model_kwargs={"device": "cpu"},
+                                             encode_kwargs={"normalize_embeddings": True})
+            except ImportError:
+                raise ValueError(
+                    "로컬 임베딩 모델 사용을 위해 'sentence-transformers' 라이브러리가 필요합니다. "
+                    "설치하려면 'pip install sentence-transformers'를 실행해주세요."
+                )
+        if self.name == "hashing":
+            return HashingEmbeddings(self.dimensions)
+
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+
+        return DeterministicFakeEmbedding(size=self.dimensions)
@@ -0,0 +1,68 @@
+# embedding_cache.py
+
+# 청크 단위 임베딩 캐시
+# 키: (임베딩 백엔드, 모델, 차원 수, sha256(청크 텍스트)) -> 같은 텍스트는 임베딩 API로 두 번 보내지 않습니다.
+import hashlib
+from array import array
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from local_cache import LruSqliteCache
+
+
+def _encode_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode_vector(value: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(value)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    다른 Embeddings 객체를 감싸서, 캐시에 없는 텍스트만 실제로 임베딩합니다.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: LruSqliteCache, namespace: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.namespace = namespace
+
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) 한 번에 임베딩
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+        if pending:
+            vectors = self.underlying.embed_documents(list(pending.values()))
+            new_items = {key: _encode_vector(vector) for key, vector in zip(pending.keys(), vectors)}
+            self.cache.set_many(new_items)
+            cached.update(new_items)
+
+        return [_decode_vector(cached[key]) for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        value = self.cache.get(key)
+        if value is None:
+            vector = self.underlying.embed_query(text)
+            self.cache.set(key, _encode_vector(vector))
+            return vector
+        return _decode_vector(value)
+
+
+def embedding_namespace(model: str, dimensions=None) -> str:
+    """
+    캐시 키 앞부분에 붙는 (모델, 차원) 식별자를 만듭니다.
+    """
+    return f"{model}:{dimensions or 'default'}"
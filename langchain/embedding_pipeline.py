@@ -0,0 +1,133 @@
+# embedding_pipeline.py
+
+# 청크 임베딩을 배치로 나누어 동시에 처리하는 수집(ingestion) 단계
+# - 배치 크기와 동시에 진행 중인 요청 수를 설정으로 제한합니다.
+# - 실패한 배치만 다시 시도하므로 전체 파일을 처음부터 다시 임베딩하지 않습니다.
+# - 이전 청크(본문, 벡터) 목록이 주어지면 내용(청크 해시)이 같은 청크의 벡터를 재사용하고, 새로 추가/변경된 청크만 임베딩합니다.
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+def _embed_batch_with_retry(embeddings: Embeddings, batch: List[str], batch_index: int,
+                            max_retries: int, retry_backoff: float) -> List[List[float]]:
+    attempt = 0
+    while True:
+        try:
+            return embeddings.embed_documents(batch)
+        except Exception as e:
+            attempt += 1
+            if attempt > max_retries:
+                raise RuntimeError(f"임베딩 배치 {batch_index} 처리 실패 ({max_retries}회 재시도): {e}") from e
+            delay = min(retry_backoff * (2 ** (attempt - 1)), 10.0)
+            print(f"임베딩 배치 {batch_index} 실패, {delay:.1f}초 후 재시도 ({attempt}/{max_retries}): {e}")
+            time.sleep(delay)
+
+
+def embed_texts_in_batches(embeddings: Embeddings, texts: List[str], batch_size: int = 64,
+                           max_in_flight: int = 4, max_retries: int = 3,
+                           retry_backoff: float = 0.5,
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> List[List[float]]:
+    """
+    텍스트 목록을 batch_size 단위로 나누어 최대 max_in_flight개 배치를 동시에 임베딩합니다.
+    반환되는 벡터 순서는 입력 텍스트 순서와 같습니다.
+    progress_callback(완료된 배치 수, 전체 배치 수)는 배치가 끝날 때마다 호출됩니다.
+    """
+    if not texts:
+        return []
+
+    batch_size = max(1, batch_size)
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    results = [None] * len(batches)
+    if len(batches) == 1 or max_in_flight <= 1:
+        for index, batch in enumerate(batches):
+            results[index] = _embed_batch_with_retry(embeddings, batch, index, max_retries, retry_backoff)
+            if progress_callback:
+                progress_callback(index + 1, len(batches))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(batches))) as executor:
+            futures = {
+                executor.submit(_embed_batch_with_retry, embeddings, batch, index, max_retries, retry_backoff): index
+                for index, batch in enumerate(batches)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(completed, len(batches))
+
+    print(f"임베딩 완료: 청크 {len(texts)}개, 배치 {len(batches)}개 (배치 크기 {batch_size}, 동시 요청 최대 {max_in_flight})")
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _reusable_vectors(previous_chunks: List[Tuple[str, Sequence[float]]], texts: List[str]):
+    """
+    이전 (청크 본문, 벡터) 목록에서 내용이 같은 청크의 벡터를 찾아
+    ({텍스트 위치: 벡터}, 더 이상 쓰이지 않는 벡터 수)를 반환합니다.
+    """
+    vectors_by_hash = {}
+    for text, vector in previous_chunks:
+        vectors_by_hash.setdefault(chunk_hash(text), []).append(vector)
+
+    reused = {}
+    for text_index, text in enumerate(texts):
+        vectors = vectors_by_hash.get(chunk_hash(text))
+        if vectors:
+            reused[text_index] = [float(value) for value in vectors.pop()]
+    stale = sum(len(vectors) for vectors in vectors_by_hash.values())
+    return reused, stale
+
+
+def build_faiss_from_documents(documents, embeddings: Embeddings, batch_size: int = 64,
+                               max_in_flight: int = 4, max_retries: int = 3,
+                               progress_callback: Optional[Callable[[int, int], None]] = None,
+                               previous_chunks: Optional[List[Tuple[str, Sequence[float]]]] = None,
+                               stats: Optional[dict] = None):
+    """
+    문서 청크를 배치 단위로 동시에 임베딩한 뒤, 모든 벡터로 FAISS 인덱스를 한 번에 생성합니다.
+    previous_chunks(이전 청크 본문과 벡터 목록)가 주어지면 변경되지 않은 청크는 이전 벡터를 그대로 사용합니다.
+    stats 딕셔너리가 주어지면 재사용/신규 임베딩/제거된 청크 수를 기록합니다.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    texts = [doc.page_content for doc in documents]
+    for doc, text in zip(documents, texts):
+        doc.metadata["chunk_hash"] = chunk_hash(text)
+
+    reused, stale = {}, 0
+    if previous_chunks:
+        reused, stale = _reusable_vectors(previous_chunks, texts)
+
+    pending = [index for index in range(len(texts)) if index not in reused]
+    new_vectors = embed_texts_in_batches(
+        embeddings, [texts[index] for index in pending], batch_size=batch_size,
+        max_in_flight=max_in_flight, max_retries=max_retries, progress_callback=progress_callback,
+    )
+    vectors = dict(reused)
+    vectors.update(zip(pending, new_vectors))
+    # 서로 다른 차원의 벡터(예: 차원 설정 변경 전 벡터)가 한 인덱스에 섞이지 않도록 확인
+    dimensions = {len(vector) for vector in vectors.values()}
+    if len(dimensions) > 1:
+        raise ValueError(f"임베딩 벡터 차원이 일치하지 않습니다: {sorted(dimensions)}")
+
+    if stats is not None:
+        stats.update({
+            "chunks_total": len(texts),
+            "chunks_reused": len(reused),
+            "chunks_embedded": len(pending),
+            "chunks_removed": stale,
+        })
+    if previous_chunks:
+        print(f"증분 인덱싱: 재사용 {len(reused)}개, 신규 임베딩 {len(pending)}개, 제거 {stale}개")
+
+    return FAISS.from_embeddings(
+        text_embeddings=[(texts[index], vectors[index]) for index in range(len(texts))],
+        embedding=embeddings,
+        metadatas=[doc.metadata for doc in documents],
+    )
@@ -0,0 +1,142 @@
+# extracted_text_store.py
+
+# 문서에서 추출한 텍스트를 파일 내용 해시별로 업로드 볼륨(PVC)에 저장합니다.
+# 추출 결과는 파일 바이트에만 의존하므로, 청크 파라미터 변경/인덱스 재생성/툴 호출 시
+# PDF·DOCX를 다시 파싱하지 않고 저장된 텍스트에서 바로 시작합니다.
+# 파일 구조: <root>/<파일 sha256>.json  (페이지 경계와 페이지별 메타데이터 포함)
+# 추출은 해시를 확인한 임시 사본에서 수행하므로, 처리 도중 같은 경로에 다른 파일이 업로드되어도
+# 다른 파일의 텍스트가 이 해시로 저장되지 않습니다.
+import os
+import hashlib
+import json
+import time
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+# 저장 형식이나 추출/정규화 방식이 바뀌면 버전을 올립니다. 버전이 다르면 다시 추출합니다.
+TEXT_FORMAT_VERSION = 1
+
+
+class FileContentChangedError(RuntimeError):
+    """
+    파일의 현재 내용이 처리하려던 해시와 다를 때 발생합니다. (처리 도중 같은 경로에 다른 파일이 업로드된 경우 등)
+    """
+
+
+@contextmanager
+def verified_copy(file_path: str, file_hash: str, tmp_dir: str) -> Iterator[str]:
+    """
+    파일의 현재 바이트를 임시 사본으로 복사하면서 해시를 계산하고, file_hash와 같으면 사본 경로를 제공합니다.
+    사본은 확장자를 유지하며 블록이 끝나면 삭제합니다. 해시가 다르면 FileContentChangedError를 발생시킵니다.
+    """
+    os.makedirs(tmp_dir, exist_ok=True)
+    extension = os.path.splitext(file_path)[1]
+    tmp_path = os.path.join(tmp_dir, f".snapshot-{file_hash[:12]}-{uuid.uuid4().hex[:8]}{extension}")
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for block in iter(lambda: src.read(1024 * 1024), b""):
+                digest.update(block)
+                dst.write(block)
+        if digest.hexdigest() != file_hash:
+            raise FileContentChangedError(
+                f"파일 내용이 처리 중인 업로드와 다릅니다 (처리 도중 같은 이름의 파일이 다시 업로드됨): {file_path}"
+            )
+        yield tmp_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def normalize_text(text: str) -> str:
+    """
+    추출 텍스트를 정규화합니다. (NFC 유니코드 정규화, 줄바꿈 통일)
+    macOS 등에서 자모가 분리된(NFD) 한글도 같은 텍스트로 취급되도록 합니다.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class ExtractedTextStore:
+    """
+    파일 해시별 추출 텍스트(페이지 단위 Document 목록)를 JSON 파일로 저장/로드합니다.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir  # 처음 저장할 때 생성
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.root_dir, f"{file_hash}.json")
+
+    def load(self, file_hash: str, source_path: Optional[str] = None) -> Optional[List[Document]]:
+        """
+        저장된 추출 텍스트를 불러옵니다. 없거나 형식 버전이 다르면 None을 반환합니다.
+        source_path가 주어지면 메타데이터의 source를 현재 파일 경로로 바꿉니다.
+        """
+        try:
+            with open(self._path(file_hash), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format_version") != TEXT_FORMAT_VERSION:
+            return None
+
+        documents = []
+        for page in data.get("pages", []):
+            metadata = dict(page.get("metadata") or {})
+            if source_path:
+                metadata["source"] = source_path
+            documents.append(Document(page_content=page["page_content"], metadata=metadata))
+        return documents
+
+    def save(self, file_hash: str, documents: List[Document], source_path: Optional[str] = None):
+        """
+        임시 파일에 기록한 뒤 교체하여, 중간에 실패해도 깨진 파일이 남지 않도록 합니다.
+        """
+        data = {
+            "format_version": TEXT_FORMAT_VERSION,
+            "file_hash": file_hash,
+            "source_path": source_path,
+            "num_pages": len(documents),
+            "created_at": time.time(),
+            "pages": [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in documents],
+        }
+        path = self._path(file_hash)
+        os.makedirs(self.root_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load_or_extract(self, file_path: str, file_hash: str,
+                        extract_fn: Callable[[str], List[Document]]) -> List[Document]:
+        """
+        저장된 추출 텍스트가 있으면 반환하고, 없으면 file_hash 내용의 사본에서 extract_fn으로 추출하여 저장합니다.
+        파일의 현재 내용이 file_hash와 다르면 추출/저장하지 않고 FileContentChangedError를 발생시킵니다.
+        """
+        documents = self.load(file_hash, file_path)
+        if documents is not None:
+            print(f"저장된 추출 텍스트 사용: {file_hash[:12]} ({len(documents)}개 문서/페이지)")
+            return documents
+
+        with verified_copy(file_path, file_hash, self.root_dir) as snapshot_path:
+            extracted = extract_fn(snapshot_path)
+        documents = [
+            Document(page_content=normalize_text(doc.page_content), metadata={**doc.metadata, "source": file_path})
+            for doc in extracted
+        ]
+        if documents:
+            try:
+                self.save(file_hash, documents, file_path)
+            except OSError as e:
+                print(f"추출 텍스트 저장 실패 ({file_hash[:12]}): {e}")
+        return documents
@@ -0,0 +1,177 @@
+# faiss_index_store.py
+
+# 이력서별 FAISS 인덱스를 업로드 볼륨(PVC)에 저장하고, 재시작 후 처음 접근할 때 다시 불러옵니다.
+# 디렉토리 구조: <root>/<파일 sha256>/c<chunk_size>_o<chunk_overlap>_<청크 단위>_b<임베딩 백엔드 해시>/
+#   - index.faiss   : FAISS 인덱스 (가능하면 메모리 매핑으로 로드)
+#   - docstore.json : 청크 본문과 메타데이터
+#   - meta.json     : 저장 형식 버전, 청크 파라미터, 임베딩 백엔드 등
+import os
+import hashlib
+import json
+import shutil
+import time
+import uuid
+from typing import Callable, Optional, Tuple
+
+# 저장 형식이 바뀌면 버전을 올립니다. 버전이 다른 인덱스는 로드하지 않고 새로 생성합니다.
+INDEX_FORMAT_VERSION = 3
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.json"
+META_FILE = "meta.json"
+
+
+def _read_faiss_index(path: str):
+    """
+    FAISS 인덱스 파일을 읽습니다. 지원되는 경우 메모리 매핑으로 읽어 상주 메모리를 줄입니다.
+    """
+    import faiss
+
+    for flag_name in ("IO_FLAG_MMAP_IFC", "IO_FLAG_MMAP"):
+        flag = getattr(faiss, flag_name, None)
+        if flag is None:
+            continue
+        try:
+            return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            continue
+    return faiss.read_index(path)
+
+
+class FaissIndexStore:
+    """
+    파일 내용 해시와 청크 파라미터별로 FAISS 인덱스를 디스크에 저장/로드합니다.
+    """
+
+    def __init__(self, root_dir: str, embeddings_factory: Callable, embedding_backend: str,
+                 chunk_size_unit: str = "chars", embedding_dimensions: Optional[int] = None):
+        self.root_dir = root_dir
+        self.embeddings_factory = embeddings_factory
+        self.embedding_backend = embedding_backend
+        self.chunk_size_unit = chunk_size_unit
+        self.embedding_dimensions = embedding_dimensions  # None이면 모델 기본 차원 (검사하지 않음)
+        # 백엔드/청크 단위별로 디렉토리를 나누어 설정을 바꿔도 기존 인덱스를 덮어쓰지 않도록 함
+        self._backend_tag = hashlib.sha1(embedding_backend.encode("utf-8")).hexdigest()[:8]
+
+    def _index_dir(self, file_hash: str, chunk_size: int, chunk_overlap: int) -> str:
+        return os.path.join(self.root_dir, file_hash, f"c{chunk_size}_o{chunk_overlap}_{self.chunk_size_unit}_b{self._backend_tag}")
+
+    def _read_meta(self, index_dir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(index_dir, META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("format_version") != INDEX_FORMAT_VERSION:
+            return None
+        # 다른 임베딩 백엔드(모델/차원)로 만든 인덱스는 섞어 쓰지 않음
+        if meta.get("embedding_backend") != self.embedding_backend:
+            return None
+        if meta.get("chunk_size_unit", "chars") != self.chunk_size_unit:
+            return None
+        # 설정된 차원과 다른 차원으로 만든 인덱스는 사용하지 않음
+        if self.embedding_dimensions and meta.get("embedding_dimensions") != self.embedding_dimensions:
+            return None
+        return meta
+
+    def latest_params(self, file_hash: str) -> Optional[Tuple[int, int]]:
+        """
+        해당 파일 내용으로 가장 최근에 저장된 인덱스의 (chunk_size, chunk_overlap)를 반환합니다.
+        """
+        hash_dir = os.path.join(self.root_dir, file_hash)
+        if not os.path.isdir(hash_dir):
+            return None
+        candidates = []
+        for name in os.listdir(hash_dir):
+            meta = self._read_meta(os.path.join(hash_dir, name))
+            if meta:
+                candidates.append((meta.get("created_at", 0), meta["chunk_size"], meta["chunk_overlap"]))
+        if not candidates:
+            return None
+        _, chunk_size, chunk_overlap = max(candidates)
+        return chunk_size, chunk_overlap
+
+    def save(self, vectorstore, file_hash: str, chunk_size: int, chunk_overlap: int,
+             source_path: Optional[str] = None):
+        """
+        벡터 저장소를 임시 디렉토리에 기록한 뒤 교체하여, 중간에 실패해도 깨진 인덱스가 남지 않도록 합니다.
+        """
+        import faiss
+
+        if self.embedding_dimensions and vectorstore.index.d != self.embedding_dimensions:
+            raise ValueError(
+                f"벡터 차원({vectorstore.index.d})이 설정된 임베딩 차원({self.embedding_dimensions})과 다릅니다."
+            )
+        index_dir = self._index_dir(file_hash, chunk_size, chunk_overlap)
+        tmp_dir = f"{index_dir}.tmp-{uuid.uuid4().hex[:8]}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            faiss.write_index(vectorstore.index, os.path.join(tmp_dir, INDEX_FILE))
+
+            documents = []
+            for position in range(vectorstore.index.ntotal):
+                doc_id = vectorstore.index_to_docstore_id[position]
+                doc = vectorstore.docstore.search(doc_id)
+                documents.append({"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata})
+            with open(os.path.join(tmp_dir, DOCSTORE_FILE), "w", encoding="utf-8") as f:
+                json.dump(documents, f, ensure_ascii=False)
+
+            meta = {
+                "format_version": INDEX_FORMAT_VERSION,
+                "file_hash": file_hash,
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "chunk_size_unit": self.chunk_size_unit,
+                "embedding_backend": self.embedding_backend,
+                "embedding_dimensions": vectorstore.index.d,
+                "num_vectors": vectorstore.index.ntotal,
+                "source_path": source_path,
+                "created_at": time.time(),
+            }
+            with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+
+            if os.path.isdir(index_dir):
+                shutil.rmtree(index_dir, ignore_errors=True)
+            os.replace(tmp_dir, index_dir)
+            print(f"벡터 인덱스 저장 완료: {index_dir}")
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def load(self, file_hash: str, chunk_size: int, chunk_overlap: int):
+        """
+        저장된 인덱스를 불러옵니다. 없거나 형식 버전/임베딩 백엔드가 다르면 None을 반환합니다.
+        """
+        from langchain_core.documents import Document
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+
+        index_dir = self._index_dir(file_hash, chunk_size, chunk_overlap)
+        meta = self._read_meta(index_dir)
+        if not meta:
+            return None
+
+        try:
+            index = _read_faiss_index(os.path.join(index_dir, INDEX_FILE))
+            with open(os.path.join(index_dir, DOCSTORE_FILE), "r", encoding="utf-8") as f:
+                documents = json.load(f)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"저장된 벡터 인덱스를 읽지 못했습니다 ({index_dir}): {e}")
+            return None
+        if meta.get("embedding_dimensions", index.d) != index.d:
+            print(f"저장된 벡터 인덱스의 차원이 메타데이터와 다릅니다 ({index_dir}): {index.d}")
+            return None
+
+        docstore = InMemoryDocstore({
+            item["id"]: Document(page_content=item["page_content"], metadata=item["metadata"])
+            for item in documents
+        })
+        index_to_docstore_id = {position: item["id"] for position, item in enumerate(documents)}
+        print(f"저장된 벡터 인덱스 로드 완료: {index_dir}")
+        return FAISS(
+            embedding_function=self.embeddings_factory(),
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
@@ -0,0 +1,85 @@
+# full_context.py
+
+# 짧은 문서는 벡터 검색 없이 전체 텍스트를 프롬프트에 넣습니다.
+# 대부분의 이력서는 1~3페이지이므로, 추출 텍스트가 토큰 임계값 이하이면
+# 임베딩/FAISS 인덱스를 만들지 않고 툴이 문서 전체를 {context}로 사용합니다.
+import threading
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from token_budget import count_tokens
+from vector_store_registry import compute_file_hash
+
+# 경로별 집계 이름
+PATH_FULL_CONTEXT = "full_context"
+PATH_RETRIEVAL = "retrieval"
+
+
+class FullDocumentRetriever(BaseRetriever):
+    """
+    질의와 관계없이 문서 전체(페이지 순서대로)를 반환하는 검색기입니다.
+    """
+
+    documents: List[Document]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return list(self.documents)
+
+
+class ContextRouter:
+    """
+    파일별로 전체 텍스트 사용 여부를 결정하고, 각 경로가 선택된 횟수를 집계합니다.
+    결정은 파일 내용 해시별 토큰 수로 하므로 같은 파일은 한 번만 계산합니다.
+    """
+
+    def __init__(self, text_store, extract_fn: Callable[[str], List[Document]], max_tokens: int):
+        self.text_store = text_store
+        self.extract_fn = extract_fn
+        self.max_tokens = max_tokens
+        self._token_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counts = {
+            "ingestion": {PATH_FULL_CONTEXT: 0, PATH_RETRIEVAL: 0},
+            "tool_call": {PATH_FULL_CONTEXT: 0, PATH_RETRIEVAL: 0},
+        }
+
+    def token_count(self, file_hash: str) -> Optional[int]:
+        with self._lock:
+            return self._token_counts.get(file_hash)
+
+    def full_text_documents(self, file_path: str, file_hash: Optional[str] = None) -> Optional[List[Document]]:
+        """
+        추출 텍스트가 임계값 이하이면 전체 문서를 반환하고, 아니면 None을 반환합니다.
+        임계값이 0 이하이면 항상 None을 반환합니다(항상 벡터 검색 사용).
+        """
+        if self.max_tokens <= 0:
+            return None
+        file_hash = file_hash or compute_file_hash(file_path)
+        with self._lock:
+            tokens = self._token_counts.get(file_hash)
+        if tokens is not None and tokens > self.max_tokens:
+            return None
+
+        documents = self.text_store.load_or_extract(file_path, file_hash, self.extract_fn)
+        if tokens is None:
+            tokens = count_tokens("\n\n".join(doc.page_content for doc in documents))
+            with self._lock:
+                self._token_counts[file_hash] = tokens
+        # 추출된 텍스트가 없으면 벡터 검색 경로에서 오류를 안내하도록 함
+        if tokens == 0 or tokens > self.max_tokens:
+            return None
+        return documents
+
+    def record(self, stage: str, path: str):
+        with self._lock:
+            self._counts[stage][path] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_tokens": self.max_tokens,
+                **{stage: dict(counts) for stage, counts in self._counts.items()},
+            }
@@ -0,0 +1,128 @@
+# ingestion_jobs.py
+
+# 이력서 수집(파싱 → 분할 → 임베딩 → 인덱싱)을 백그라운드 작업으로 실행하고 진행 상태를 관리합니다.
+# 업로드 요청은 작업 ID만 받고 바로 반환되며, 상태는 작업 ID로 조회합니다.
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class IngestionJob:
+    """
+    하나의 수집 작업에 대한 상태(단계, 진행률, 결과, 오류)를 보관합니다.
+    """
+
+    def __init__(self, user_id: str, file_path: str):
+        self.job_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.file_path = file_path
+        self.status = JOB_QUEUED
+        self.stage = JOB_QUEUED
+        self.progress = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+        self._future = None
+
+    def update(self, stage: str, progress: Optional[int] = None):
+        """
+        작업 단계와 진행률(0~100)을 갱신합니다. 수집 함수에서 콜백으로 호출됩니다.
+        """
+        with self._lock:
+            self.stage = stage
+            if progress is not None:
+                self.progress = max(self.progress, min(int(progress), 100))
+            self.updated_at = time.time()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "user_id": self.user_id,
+                "file_path": self.file_path,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+class IngestionJobManager:
+    """
+    제한된 크기의 작업자 풀에서 수집 작업을 실행합니다.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion")
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def _run(self, job: IngestionJob, fn: Callable):
+        job.status = JOB_RUNNING
+        job.update("started", 1)
+        started = time.time()
+        try:
+            result = fn(job)
+            job.result = result if isinstance(result, dict) else None
+            job.status = JOB_COMPLETED
+            job.update(JOB_COMPLETED, 100)
+            print(f"수집 작업 완료: {job.job_id} ({job.file_path}, {time.time() - started:.2f}초)")
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            job.update(JOB_FAILED)
+            print(f"수집 작업 실패: {job.job_id} ({job.file_path}): {e}")
+
+    def _prune(self):
+        # 오래된 완료 작업부터 정리하여 메모리 사용량을 제한
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.updated_at)
+        for job in finished[:len(self._jobs) - self.max_jobs]:
+            del self._jobs[job.job_id]
+
+    def submit(self, user_id: str, file_path: str, fn: Callable[[IngestionJob], Optional[dict]]) -> IngestionJob:
+        """
+        fn(job)을 백그라운드에서 실행하는 작업을 등록하고 즉시 반환합니다.
+        """
+        job = IngestionJob(user_id, file_path)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait(self, job: IngestionJob, timeout: float) -> bool:
+        """
+        작업이 끝날 때까지 최대 timeout초 기다립니다. 제한 시간 안에 끝나면 True를 반환합니다.
+        """
+        if job.done or job._future is None:
+            return job.done
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job._future)), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job.done
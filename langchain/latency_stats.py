@@ -0,0 +1,43 @@
+# latency_stats.py
+
+# 이름(모드)별 처리 시간 기록 (최근 window개 기준 평균/p50/p95, 단계별 평균)
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyStats:
+    """
+    이름별로 최근 window개의 전체 처리 시간과 단계별 시간(초)을 보관하고 요약 통계를 제공합니다.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[dict]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, total: float, **stages: float):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append({"total": total, **stages})
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+        stats = {}
+        for name, values in samples.items():
+            totals = sorted(value["total"] for value in values)
+            stages = {key for value in values for key in value if key != "total"}
+            stats[name] = {
+                "calls": counts[name],
+                "avg_s": round(sum(totals) / len(totals), 3),
+                "p50_s": round(totals[len(totals) // 2], 3),
+                "p95_s": round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 3),
+                **{
+                    f"avg_{stage}": round(sum(value.get(stage, 0) for value in values) / len(values), 3)
+                    for stage in sorted(stages)
+                },
+            }
+        return stats
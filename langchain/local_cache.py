@@ -0,0 +1,164 @@
+# local_cache.py
+
+# 메모리 LRU + 로컬 SQLite 파일로 구성된 2단계 키-값 캐시
+# 값은 bytes로 저장하며, 직렬화는 사용하는 쪽에서 담당합니다.
+# - ttl_seconds가 주어지면 저장 후 그 시간이 지난 값은 없는 것으로 취급합니다. (조회 시 miss로 집계)
+# - max_disk_items가 주어지면 SQLite 파일의 행 수를 그 이하로 유지합니다. (오래된 값부터 삭제)
+#   만료/초과 행 정리는 PRUNE_EVERY_WRITES번 기록할 때마다, 그리고 파일을 처음 열 때 수행합니다.
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+PRUNE_EVERY_WRITES = 100
+
+
+class LruSqliteCache:
+    """
+    자주 쓰는 값은 메모리 LRU에, 전체 값은 SQLite 파일에 보관합니다.
+    db_path가 None이면 메모리 계층만 사용합니다.
+    SQLite 파일(과 디렉토리)은 모듈 임포트 시점이 아니라 처음 사용할 때 생성합니다.
+    """
+
+    def __init__(self, db_path: Optional[str], table: str, max_items: int = 2000,
+                 ttl_seconds: Optional[float] = None, max_disk_items: Optional[int] = None):
+        self.table = table
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds or None  # None(또는 0)이면 만료 없음
+        self.max_disk_items = max_disk_items or None  # None(또는 0)이면 행 수 제한 없음
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()  # {키: (값, 저장 시각)}
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "writes": 0, "pruned": 0}
+
+        self.db_path = db_path
+        self._conn = None
+
+    def _connection(self):
+        # self._lock을 잡은 상태에서 호출
+        if self._conn is None and self.db_path:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"(key TEXT PRIMARY KEY, value BLOB NOT NULL, created_at REAL NOT NULL DEFAULT 0)"
+            )
+            # created_at 열이 없던 파일은 열을 추가 (기존 행은 저장 시각 0: TTL이 있으면 만료로 취급)
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({self.table})")}
+            if "created_at" not in columns:
+                conn.execute(f"ALTER TABLE {self.table} ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_created_at ON {self.table} (created_at)")
+            conn.commit()
+            self._conn = conn
+            self._prune()
+        return self._conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _prune(self):
+        # self._lock을 잡은 상태에서 호출: 만료된 행과 max_disk_items를 넘는 오래된 행을 삭제
+        self._writes_since_prune = 0
+        conn = self._conn
+        removed = 0
+        if self.ttl_seconds is not None:
+            removed += conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        if self.max_disk_items is not None:
+            excess = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_disk_items
+            if excess > 0:
+                removed += conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY created_at ASC LIMIT ?)",
+                    (excess,),
+                ).rowcount
+        conn.commit()
+        self.stats["pruned"] += removed
+
+    def _remember(self, key: str, value: bytes, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """
+        캐시에 있는 (만료되지 않은) 키의 값만 담은 딕셔너리를 반환합니다.
+        """
+        found = {}
+        now = time.time()
+        with self._lock:
+            missing, expired = [], set()
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and self._expired(entry[1], now):
+                    del self._memory[key]
+                    expired.add(key)
+                    entry = None
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.append(key)
+
+            conn = self._connection() if missing else None
+            if conn is not None:
+                # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+                for start in range(0, len(missing), 500):
+                    part = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows = conn.execute(
+                        f"SELECT key, value, created_at FROM {self.table} WHERE key IN ({placeholders})", part
+                    ).fetchall()
+                    for key, value, created_at in rows:
+                        if self._expired(created_at, now):
+                            expired.add(key)
+                            continue
+                        found[key] = value
+                        self._remember(key, value, created_at)
+                        self.stats["disk_hits"] += 1
+
+            # 만료된 값도 miss로 집계
+            self.stats["misses"] += sum(1 for key in missing if key not in found)
+            self.stats["expired"] += len(expired)
+        return found
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, bytes]):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value, now)
+            conn = self._connection()
+            if conn is not None:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                    [(key, value, now) for key, value in items.items()],
+                )
+                conn.commit()
+                self._writes_since_prune += len(items)
+                if self._writes_since_prune >= PRUNE_EVERY_WRITES:
+                    self._prune()
+            self.stats["writes"] += len(items)
+
+    def set(self, key: str, value: bytes):
+        self.set_many({key: value})
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_items"] = len(self._memory)
+            stats["ttl_seconds"] = self.ttl_seconds
+            stats["max_disk_items"] = self.max_disk_items
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,157 @@
+# model_clients.py
+
+# 프로세스 전체에서 공유하는 LLM/임베딩 HTTP 클라이언트
+# - 동기/비동기 httpx 클라이언트를 하나씩만 만들어 모든 ChatOpenAI/OpenAIEmbeddings가 같은 연결 풀(keep-alive)을 사용합니다.
+#   요청마다 새 클라이언트를 만들면 연결 재사용 없이 TCP/TLS 연결을 매번 새로 맺게 됩니다.
+# - ChatOpenAI는 한 번만 생성하고, temperature별 모델은 그 복사본(같은 OpenAI 클라이언트 공유)으로 만들어 재사용합니다.
+#   temperature는 허용 범위(0~2)로 제한하고 0.1 단위로 반올림하므로 temperature별 모델은 최대 21개입니다.
+# - 연결 풀 지표(열린 연결, 유휴 연결, 연결을 기다린 요청 수)를 제공합니다.
+import math
+import threading
+from typing import Dict, Optional
+
+MAX_TEMPERATURE = 2.0
+TEMPERATURE_DECIMALS = 1
+
+
+def bucket_temperature(temperature: float) -> float:
+    """
+    temperature를 0~MAX_TEMPERATURE 범위로 제한하고 TEMPERATURE_DECIMALS 자리로 반올림합니다.
+    (요청마다 다른 값을 보내도 temperature별 모델이 계속 늘어나지 않도록 함, 숫자가 아니면 0)
+    """
+    temperature = float(temperature)
+    if math.isnan(temperature):
+        return 0.0
+    return round(min(max(temperature, 0.0), MAX_TEMPERATURE), TEMPERATURE_DECIMALS)
+
+
+class _PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waits = 0  # 요청 시점에 모든 연결이 사용 중이고 새 연결을 열 수 없었던 요청 수
+
+    def record(self, pool, max_connections: Optional[int]):
+        connections = pool.connections
+        saturated = bool(max_connections) and len(connections) >= max_connections and \
+            not any(connection.is_available() for connection in connections)
+        with self._lock:
+            self.requests += 1
+            self.waits += int(saturated)
+
+    @staticmethod
+    def snapshot_pool(pool) -> dict:
+        connections = list(pool.connections)
+        return {
+            "open": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+        }
+
+
+def _metered_transports(limits, stats: Dict[str, _PoolStats]):
+    """
+    요청마다 연결 풀 상태를 기록하는 동기/비동기 httpx 전송 계층을 만듭니다.
+    """
+    import httpx
+
+    class MeteredTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            stats["sync"].record(self._pool, limits.max_connections)
+            return super().handle_request(request)
+
+    class MeteredAsyncTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            stats["async"].record(self._pool, limits.max_connections)
+            return await super().handle_async_request(request)
+
+    return MeteredTransport(limits=limits), MeteredAsyncTransport(limits=limits)
+
+
+class ModelClients:
+    """
+    공유 HTTP 연결 풀과 그 위에서 동작하는 채팅 모델 클라이언트를 보관합니다. 처음 사용할 때 생성합니다.
+    """
+
+    def __init__(self, api_key: Optional[str], chat_model: str, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, keepalive_expiry: float = 30.0, timeout: float = 60.0):
+        self.api_key = api_key
+        self.chat_model = chat_model
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._http_client = None
+        self._http_async_client = None
+        self._transports = {}  # {"sync" | "async": 연결 풀 지표를 기록하는 httpx 전송 계층}
+        self._base_chat = None
+        self._chat_models: Dict[float, object] = {}
+        self._stats = {"sync": _PoolStats(), "async": _PoolStats()}
+        self._lock = threading.Lock()
+
+    def _ensure_http_clients(self):
+        import httpx
+
+        with self._lock:
+            if self._http_client is None:
+                limits = httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                )
+                self._transports["sync"], self._transports["async"] = _metered_transports(limits, self._stats)
+                timeout = httpx.Timeout(self.timeout, connect=10.0)
+                self._http_client = httpx.Client(transport=self._transports["sync"], timeout=timeout)
+                self._http_async_client = httpx.AsyncClient(transport=self._transports["async"], timeout=timeout)
+
+    @property
+    def http_client(self):
+        self._ensure_http_clients()
+        return self._http_client
+
+    @property
+    def http_async_client(self):
+        self._ensure_http_clients()
+        return self._http_async_client
+
+    def chat(self, temperature: float = 0.0):
+        """
+        temperature가 적용된 채팅 모델을 반환합니다.
+        모든 모델은 같은 OpenAI 클라이언트와 연결 풀을 사용하며, temperature별 모델은 한 번만 만듭니다.
+        temperature는 bucket_temperature로 제한/반올림한 값을 사용합니다.
+        """
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. .env 파일을 확인해주세요.")
+        temperature = bucket_temperature(temperature)
+        with self._lock:
+            model = self._chat_models.get(temperature)
+        if model is not None:
+            return model
+
+        from langchain_openai import ChatOpenAI
+
+        http_client, http_async_client = self.http_client, self.http_async_client
+        with self._lock:
+            if self._base_chat is None:
+                self._base_chat = ChatOpenAI(
+                    model=self.chat_model, temperature=0.0, api_key=self.api_key,
+                    http_client=http_client, http_async_client=http_async_client,
+                )
+            # 얕은 복사라서 내부 OpenAI 클라이언트(와 연결 풀)를 그대로 공유
+            return self._chat_models.setdefault(
+                temperature, self._base_chat.model_copy(update={"temperature": temperature})
+            )
+
+    def get_stats(self) -> dict:
+        stats = {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "chat_models": len(self._chat_models),
+        }
+        for name, pool_stats in self._stats.items():
+            transport = self._transports.get(name)
+            stats[name] = {
+                **(_PoolStats.snapshot_pool(transport._pool) if transport is not None else {"open": 0, "idle": 0}),
+                "requests": pool_stats.requests,
+                "waits": pool_stats.waits,
+            }
+        return stats
@@ -0,0 +1,207 @@
+# resume_profile.py
+
+# 업로드 시 이력서에서 구조화된 프로필(학력, 경력 구분/연차, 핵심 역량, 주요 경력/프로젝트, 강점, 커리어 목표)을 한 번 추출하고,
+# 파일 내용 해시별로 인덱스 옆에 저장합니다. 툴은 매번 원본 청크에서 같은 사실을 다시 뽑는 대신
+# 이 짧은 프로필(과 필요한 소수의 청크)을 프롬프트에 사용합니다.
+# 파일 구조: <root>/<파일 sha256>/profile.json  (벡터 인덱스 디렉토리와 같은 파일 해시 디렉토리)
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# 저장 형식이나 추출 프롬프트/필드가 바뀌면 버전을 올립니다. 버전이 다른 프로필은 다시 추출합니다.
+PROFILE_FORMAT_VERSION = 1
+
+PROFILE_FILE = "profile.json"
+
+# 추출에 실패한 파일은 이 시간(초)이 지난 뒤 다시 시도하고, 연속으로 실패할 때마다 두 배로 늘립니다. (최대 RETRY_MAX_SECONDS)
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 3600.0
+
+# 프로필 필드와 프롬프트에 표시할 이름 (내보낸 면접 파일의 "개인 프로필 요약" 항목과 맞춤)
+PROFILE_FIELDS = {
+    "education": "학력",
+    "career_level": "경력구분",
+    "years_of_experience": "경력 연차",
+    "core_skills": "핵심 역량",
+    "experience": "주요 경력",
+    "projects": "주요 프로젝트",
+    "strengths": "성격 특성/강점",
+    "career_goal": "커리어 목표",
+}
+
+_EXTRACTION_TEMPLATE = """
+당신은 이력서 분석가입니다. 아래 이력서/자소서에서 지원자의 프로필을 추출하여 JSON 형식으로만 반환해주세요.
+이력서에 없는 내용은 추측하지 말고 빈 문자열 또는 빈 목록으로 두세요.
+
+<이력서 내용>
+{resume}
+</이력서 내용>
+
+응답 JSON 스키마:
+{{
+  "education": "최종 학력 (학교, 전공, 졸업 여부)",
+  "career_level": "신입 또는 경력",
+  "years_of_experience": "총 경력 기간 (예: 4년)",
+  "core_skills": ["기술 스택과 핵심 역량 (이력서 표기 그대로, 예: Spring Boot 2.x)"],
+  "experience": ["회사/직무/기간과 핵심 성과를 한 문장으로"],
+  "projects": ["프로젝트명: 사용 기술과 역할/성과를 한 문장으로"],
+  "strengths": ["성격 특성과 강점"],
+  "career_goal": "커리어 목표 또는 지원 동기 요약"
+}}
+"""
+
+
+class ProfileUnavailableError(RuntimeError):
+    """
+    최근 추출에 실패하여 재시도 대기 중인 파일의 프로필을 요청했을 때 발생합니다.
+    """
+
+
+def extract_profile(documents: List[Document], model, max_source_tokens: int = 6000) -> dict:
+    """
+    문서 전체 텍스트(최대 max_source_tokens 토큰)를 모델에 한 번 전달하여 프로필 딕셔너리를 추출합니다.
+    """
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+
+    from token_budget import truncate_to_tokens
+
+    resume = truncate_to_tokens("\n\n".join(doc.page_content for doc in documents), max_source_tokens)
+    chain = ChatPromptTemplate.from_template(_EXTRACTION_TEMPLATE) | model | JsonOutputParser()
+    result = chain.invoke({"resume": resume})
+    return {field: result.get(field, "") for field in PROFILE_FIELDS}
+
+
+def format_profile(profile: dict) -> str:
+    """
+    프로필을 프롬프트에 넣을 짧은 텍스트로 만듭니다. 비어 있는 항목은 생략합니다.
+    """
+    lines = []
+    for field, label in PROFILE_FIELDS.items():
+        value = profile.get(field)
+        if isinstance(value, list) and field == "core_skills":
+            value = ", ".join(str(item) for item in value if item)
+        elif isinstance(value, list):
+            value = "".join(f"\n  - {item}" for item in value if item)
+        if value:
+            lines.append(f"- {label}: {value}")
+    return "\n".join(lines)
+
+
+class ResumeProfileStore:
+    """
+    파일 해시별 이력서 프로필을 메모리와 디스크에 보관하고, 없으면 한 번만 추출합니다.
+    추출에 실패하면 재시도 대기 시간 동안은 다시 추출하지 않습니다.
+    """
+
+    def __init__(self, root_dir: str, extractor_id: str = "", retry_base_seconds: float = RETRY_BASE_SECONDS,
+                 retry_max_seconds: float = RETRY_MAX_SECONDS):
+        self.root_dir = root_dir
+        self.extractor_id = extractor_id  # 추출에 사용한 모델 (다른 모델로 만든 프로필은 다시 추출)
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._profiles: Dict[str, dict] = {}
+        self._failures: Dict[str, Tuple[int, float]] = {}  # {파일 해시: (연속 실패 횟수, 다시 시도할 수 있는 시각)}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.root_dir, file_hash, PROFILE_FILE)
+
+    def load(self, file_hash: str) -> Optional[dict]:
+        """
+        저장된 프로필을 불러옵니다. 없거나 형식 버전/추출 모델이 다르면 None을 반환합니다.
+        """
+        with self._lock:
+            profile = self._profiles.get(file_hash)
+        if profile is not None:
+            return profile
+        try:
+            with open(self._path(file_hash), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("format_version") != PROFILE_FORMAT_VERSION or data.get("extractor") != self.extractor_id:
+            return None
+        with self._lock:
+            self._profiles[file_hash] = data["profile"]
+        return data["profile"]
+
+    def save(self, file_hash: str, profile: dict, source_path: Optional[str] = None):
+        """
+        임시 파일에 기록한 뒤 교체하여, 중간에 실패해도 깨진 파일이 남지 않도록 합니다.
+        """
+        data = {
+            "format_version": PROFILE_FORMAT_VERSION,
+            "file_hash": file_hash,
+            "extractor": self.extractor_id,
+            "source_path": source_path,
+            "created_at": time.time(),
+            "profile": profile,
+        }
+        path = self._path(file_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._profiles[file_hash] = profile
+
+    def _check_backoff(self, file_hash: str):
+        with self._lock:
+            failure = self._failures.get(file_hash)
+        if failure is not None and time.time() < failure[1]:
+            raise ProfileUnavailableError(
+                f"이력서 프로필 추출이 {failure[0]}회 연속 실패하여 {failure[1] - time.time():.0f}초 후 다시 시도합니다: {file_hash[:12]}"
+            )
+
+    def _record_failure(self, file_hash: str):
+        with self._lock:
+            count = self._failures.get(file_hash, (0, 0.0))[0] + 1
+            delay = min(self.retry_base_seconds * 2 ** (count - 1), self.retry_max_seconds)
+            self._failures[file_hash] = (count, time.time() + delay)
+
+    def get_or_extract(self, file_hash: str, extract_fn: Callable[[], dict],
+                       source_path: Optional[str] = None) -> dict:
+        """
+        저장된 프로필을 반환하고, 없으면 extract_fn()으로 추출하여 저장합니다.
+        같은 파일을 동시에 요청해도 추출은 한 번만 수행합니다.
+        추출에 실패한 파일은 재시도 대기 시간이 지날 때까지 ProfileUnavailableError를 발생시킵니다.
+        """
+        profile = self.load(file_hash)
+        if profile is not None:
+            return profile
+        with self._lock:
+            file_lock = self._locks.setdefault(file_hash, threading.Lock())
+        with file_lock:
+            profile = self.load(file_hash)
+            if profile is not None:
+                return profile
+            self._check_backoff(file_hash)
+            started = time.perf_counter()
+            try:
+                profile = extract_fn()
+            except Exception:
+                self._record_failure(file_hash)
+                raise
+            with self._lock:
+                self._failures.pop(file_hash, None)
+            print(f"이력서 프로필 추출 완료: {file_hash[:12]} ({time.perf_counter() - started:.1f}초)")
+            try:
+                self.save(file_hash, profile, source_path)
+            except OSError as e:
+                print(f"이력서 프로필 저장 실패 ({file_hash[:12]}): {e}")
+                with self._lock:
+                    self._profiles[file_hash] = profile
+            return profile
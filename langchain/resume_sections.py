@@ -0,0 +1,82 @@
+# resume_sections.py
+
+# 이력서/자소서의 섹션(학력, 경력, 기술 스택, 프로젝트, 자기소개)을 찾아 문서를 섹션 단위로 나눕니다.
+# - 섹션 제목으로 보이는 짧은 줄을 만나면 새 섹션을 시작하고, 페이지가 바뀌어도 섹션은 이어집니다.
+# - 나눈 문서의 메타데이터에 section을 기록하므로 분할된 청크도 같은 섹션 라벨을 가집니다.
+# - 툴은 필요한 섹션을 지정하여 해당 라벨의 청크만 검색합니다.
+import re
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+SECTION_EDUCATION = "education"
+SECTION_EXPERIENCE = "experience"
+SECTION_SKILLS = "skills"
+SECTION_PROJECTS = "projects"
+SECTION_INTRODUCTION = "introduction"
+SECTION_OTHER = "other"  # 첫 섹션 제목 이전(이름, 연락처 등) 또는 섹션을 찾지 못한 문서
+
+# 섹션별 제목 키워드 (공백/기호를 제거하고 소문자로 비교)
+_SECTION_KEYWORDS = {
+    SECTION_EDUCATION: ["학력", "교육", "교육이수", "학업", "education"],
+    SECTION_EXPERIENCE: ["경력", "경험", "근무경험", "업무경험", "실무경험", "직무경험", "대외활동", "활동", "인턴",
+                         "experience", "workexperience", "employment", "career"],
+    SECTION_SKILLS: ["기술", "기술스택", "보유기술", "스킬", "역량", "핵심역량", "보유역량", "자격증", "자격", "어학",
+                     "skills", "techstack", "technicalskills", "certifications"],
+    SECTION_PROJECTS: ["프로젝트", "주요프로젝트", "프로젝트경험", "수행프로젝트", "포트폴리오", "projects", "portfolio"],
+    SECTION_INTRODUCTION: ["자기소개", "자기소개서", "소개", "지원동기", "성장과정", "성격의장단점", "장단점", "입사후포부",
+                           "포부", "aboutme", "summary", "profile", "introduction", "coverletter"],
+}
+
+# 제목 뒤에 붙는 흔한 접미사 ("경력 사항", "학력 내역")
+_HEADING_SUFFIXES = ("", "사항", "내역", "및경력")
+
+# 섹션 제목으로 볼 줄의 최대 길이 (본문 문장이 키워드로 시작해도 제목으로 오인하지 않도록)
+MAX_HEADING_LENGTH = 30
+
+_HEADINGS: Dict[str, str] = {
+    keyword + suffix: section
+    for section, keywords in _SECTION_KEYWORDS.items()
+    for keyword in keywords
+    for suffix in _HEADING_SUFFIXES
+}
+
+_NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+_NUMBERING = re.compile(r"^\s*(?:\d+|[ivx]+|[가-하])[.)]\s*")
+
+
+def detect_heading(line: str) -> Optional[str]:
+    """
+    줄이 섹션 제목이면 섹션 이름을, 아니면 None을 반환합니다. ("■ 경력 사항", "[기술 스택]", "2. 프로젝트 경험:")
+    """
+    line = line.strip()
+    if not line or len(line) > MAX_HEADING_LENGTH:
+        return None
+    normalized = _NON_WORD.sub("", _NUMBERING.sub("", line.lower()))
+    return _HEADINGS.get(normalized)
+
+
+def _append_section(sections: List[Document], lines: List[str], metadata: dict, section: str):
+    text = "\n".join(lines).strip()
+    # 제목 줄만 있는 섹션(페이지 끝의 제목 등)은 버리고, 섹션 라벨만 다음 페이지 본문으로 이어짐
+    if text and not (len(lines) == 1 and detect_heading(lines[0])):
+        sections.append(Document(page_content=text, metadata={**metadata, "section": section}))
+
+
+def split_sections(documents: List[Document]) -> List[Document]:
+    """
+    페이지/문서 목록을 섹션 단위 문서로 나누고 metadata["section"]에 섹션 이름을 기록합니다.
+    섹션 제목 줄은 해당 섹션 본문의 첫 줄로 유지합니다.
+    """
+    sections: List[Document] = []
+    current = SECTION_OTHER
+    for document in documents:
+        lines: List[str] = []
+        for line in document.page_content.splitlines():
+            section = detect_heading(line)
+            if section is not None:
+                _append_section(sections, lines, document.metadata, current)
+                lines, current = [], section
+            lines.append(line)
+        _append_section(sections, lines, document.metadata, current)
+    return sections
@@ -0,0 +1,367 @@
+# shared_vector_index.py
+
+# 모든 사용자의 청크 벡터를 하나의 FAISS 인덱스(기본: IndexIDMap2 + IndexFlatL2)에 보관합니다.
+# - 사용자마다 FAISS 객체/docstore/임베딩 클라이언트를 따로 두지 않아 사용자당 메모리 오버헤드를 줄입니다.
+# - 각 청크는 user_id / file_hash 메타데이터를 가지며, 검색은 해당 사용자(테넌트)의 벡터로만 제한합니다.
+# - 테넌트 삭제 시 해당 사용자의 벡터와 청크 본문을 모두 제거합니다.
+# - 벡터 검색은 FAISS 필터 검색(전체 벡터를 훑으며 ID를 거름) 대신 테넌트의 벡터만 복원하여 거리를 계산하므로,
+#   질의 비용은 전체 벡터 수가 아니라 해당 테넌트의 청크 수에 비례합니다. (복원 벡터 기준 거리라 인덱스 검색과 같은 순위)
+# 인덱스는 메모리에서 생성한 것만 사용하므로(메모리 매핑 아님) 추가/삭제가 가능합니다.
+#
+# 인덱스 종류 (index_type)
+# - flat    : float32 원본 벡터 (정확한 검색, 벡터당 4*d 바이트)
+# - sq_fp16 : float16 스칼라 양자화 (벡터당 2*d 바이트)
+# - sq8     : 8비트 스칼라 양자화 (벡터당 d 바이트, 첫 벡터 묶음으로 모든 차원에 공통인 범위를 학습)
+# - ivfpq   : IVF-PQ (벡터당 pq_m 바이트 + ID). 학습 데이터(train_size개)가 모일 때까지는 flat으로 보관하다가
+#             한 번에 학습/전환합니다. 사용자별 필터 검색이므로 모든 리스트를 탐색(nprobe=nlist)합니다.
+#             학습에 실패하면 flat 인덱스를 그대로 사용하고, train_size개가 더 모이면 다시 학습합니다.
+# flat 이외의 종류는 근사 벡터를 저장하므로 증분 인덱싱 시 벡터를 재사용하지 않습니다. (임베딩 캐시가 원본 벡터를 보관)
+#
+# 테넌트마다 청크 본문의 BM25 역색인을 함께 만들어, hybrid 검색에서 벡터 검색과 키워드 검색 순위를 RRF로 융합합니다.
+# 청크의 section 메타데이터(이력서 섹션)로 검색 대상을 좁힐 수 있으며, 해당 섹션 청크가 k개 이하이면 검색 없이 그대로 반환합니다.
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from bm25_index import Bm25Index, reciprocal_rank_fusion
+
+INDEX_TYPES = ("flat", "sq_fp16", "sq8", "ivfpq")
+
+# 검색 방식 (similarity: 벡터 검색만, hybrid: 벡터 + BM25 순위 융합)
+SEARCH_TYPES = ("similarity", "hybrid")
+
+# sq8 범위 학습 시 관측된 최소/최대 범위를 양쪽으로 넓히는 비율 (이후 벡터가 범위를 벗어나 잘리는 것을 줄임)
+# 차원별 범위(QT_8bit)는 첫 사용자의 적은 벡터로 학습하면 일치율이 떨어지므로 공통 범위(QT_8bit_uniform)를 사용
+SQ8_RANGE_MARGIN = 0.2
+
+# 8비트 PQ는 서브 양자화기마다 256개의 중심을 학습하므로 학습 벡터가 최소 256개 필요
+PQ_MIN_TRAIN_SIZE = 256
+
+
+class TenantRetriever(BaseRetriever):
+    """
+    공유 인덱스에서 한 사용자(와 파일)의 청크만 대상으로 유사도(또는 하이브리드) 검색을 수행하는 검색기입니다.
+    """
+
+    index: Any
+    user_id: str
+    file_hash: Optional[str] = None
+    k: int = 5
+    search_type: str = "similarity"
+    fetch_k: int = 20
+    sections: Optional[List[str]] = None  # 지정하면 이 섹션의 청크만 검색 (섹션 청크가 없으면 전체 검색)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.sections:
+            documents = self.index.section_search(
+                self.user_id, query, self.sections, self.k, file_hash=self.file_hash,
+                search_type=self.search_type, fetch_k=self.fetch_k,
+            )
+            if documents:
+                return documents
+        if self.search_type == "hybrid":
+            return self.index.hybrid_search(self.user_id, query, self.k, file_hash=self.file_hash, fetch_k=self.fetch_k)
+        return self.index.search(self.user_id, query, self.k, file_hash=self.file_hash)
+
+
+class SharedVectorIndex:
+    """
+    테넌트(user_id, file_hash)별 벡터를 하나의 인덱스에 저장하고, 테넌트 단위로 검색/삭제합니다.
+    """
+
+    def __init__(self, embeddings_factory: Callable, index_type: str = "flat", ivf_nlist: int = 64,
+                 pq_m: int = 64, train_size: int = 10000):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"지원되지 않는 벡터 인덱스 종류입니다: {index_type} (지원: {', '.join(INDEX_TYPES)})")
+        self.embeddings_factory = embeddings_factory
+        self.index_type = index_type
+        self.ivf_nlist = ivf_nlist
+        self.pq_m = pq_m
+        self.train_size = max(train_size, ivf_nlist, PQ_MIN_TRAIN_SIZE)
+        self._next_train_size = self.train_size  # 학습을 시도할 벡터 수 (실패하면 train_size개 뒤로 미룸)
+        self._embeddings = None
+        self._index = None  # 첫 벡터가 추가될 때 차원에 맞게 생성
+        self._active_type = None  # 현재 인덱스 종류 (ivfpq는 학습 전까지 flat)
+        self._next_id = 0
+        self._chunks: Dict[int, Tuple[str, dict]] = {}       # {벡터 ID: (청크 본문, 메타데이터)}
+        self._tenants: Dict[Tuple[str, str], List[int]] = {}  # {(user_id, file_hash): 벡터 ID 목록}
+        self._keyword_indexes: Dict[Tuple[str, str], Bm25Index] = {}  # {(user_id, file_hash): 청크 위치 순 BM25 색인}
+        self._lock = threading.RLock()
+
+    def _get_embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = self.embeddings_factory()
+        return self._embeddings
+
+    @property
+    def stores_exact_vectors(self) -> bool:
+        return self.index_type == "flat"
+
+    def _ensure_index(self, vectors):
+        import faiss
+
+        dimension = vectors.shape[1]
+        if self._index is not None:
+            if self._index.d != dimension:
+                raise ValueError(f"벡터 차원이 공유 인덱스와 다릅니다: {dimension} != {self._index.d}")
+            return
+        if self.index_type == "sq_fp16":
+            self._index = faiss.IndexIDMap2(
+                faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2))
+        elif self.index_type == "sq8":
+            quantizer = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_L2)
+            quantizer.sq.rangestat = faiss.ScalarQuantizer.RS_minmax
+            quantizer.sq.rangestat_arg = SQ8_RANGE_MARGIN
+            quantizer.train(vectors)
+            self._index = faiss.IndexIDMap2(quantizer)
+        else:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+        self._active_type = "flat" if self.index_type == "ivfpq" else self.index_type
+
+    def _pq_subquantizers(self, dimension: int) -> int:
+        # 차원을 나누어떨어지게 하는 가장 큰 서브 양자화기 수 (pq_m 이하)
+        return next(m for m in range(min(self.pq_m, dimension), 0, -1) if dimension % m == 0)
+
+    def _maybe_train_ivfpq(self):
+        """
+        ivfpq 설정에서 벡터가 train_size개 이상 모이면 IVF-PQ를 학습하고 기존 벡터를 옮깁니다.
+        새 인덱스는 학습/복사가 모두 끝난 뒤에 교체하므로, 실패해도 기존 flat 인덱스와 테넌트 정보는 그대로입니다.
+        """
+        if self.index_type != "ivfpq" or self._active_type == "ivfpq" or self._index.ntotal < self._next_train_size:
+            return
+        try:
+            self._train_ivfpq()
+        except Exception as e:
+            # 학습 실패로 업로드까지 실패하지 않도록 flat으로 계속 보관하고, 매 업로드마다 재시도하지 않음
+            self._next_train_size = self._index.ntotal + self.train_size
+            print(f"공유 벡터 인덱스 IVF-PQ 학습 실패 (벡터 {self._next_train_size}개에서 재시도): {e}")
+
+    def _train_ivfpq(self):
+        import faiss
+        import numpy as np
+
+        dimension = self._index.d
+        ids = np.asarray(sorted(self._chunks), dtype="int64")
+        vectors = np.vstack([self._index.reconstruct(int(vector_id)) for vector_id in ids]).astype("float32")
+
+        coarse = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(coarse, dimension, self.ivf_nlist, self._pq_subquantizers(dimension), 8)
+        index.train(vectors)
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)  # ID로 복원/삭제
+        index.add_with_ids(vectors, ids)
+        index.nprobe = self.ivf_nlist
+        self._index = index
+        self._active_type = "ivfpq"
+        print(f"공유 벡터 인덱스를 IVF-PQ로 전환: 벡터 {len(ids)}개, nlist {self.ivf_nlist}, "
+              f"pq_m {self._pq_subquantizers(dimension)}")
+
+    def _selector(self, ids: List[int]):
+        import faiss
+        import numpy as np
+
+        if self._active_type == "ivfpq":
+            # IVF의 해시 테이블 직접 매핑은 IDSelectorArray만 지원 (배열은 SWIG 객체가 참조하므로 함께 보관)
+            array = np.asarray(ids, dtype="int64")
+            selector = faiss.IDSelectorArray(array.size, faiss.swig_ptr(array))
+            selector.referenced_array = array
+            return selector
+        return faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+
+    def _remove_tenant(self, key: Tuple[str, str]) -> int:
+        self._keyword_indexes.pop(key, None)
+        return self._remove_ids(self._tenants.pop(key))
+
+    def _remove_ids(self, ids: List[int]) -> int:
+        if not ids:
+            return 0
+        self._index.remove_ids(self._selector(ids))
+        for vector_id in ids:
+            self._chunks.pop(vector_id, None)
+        return len(ids)
+
+    def has(self, user_id: str, file_hash: str) -> bool:
+        with self._lock:
+            return (user_id, file_hash) in self._tenants
+
+    def add(self, user_id: str, file_hash: str, texts: List[str], vectors, metadatas: List[dict],
+            replace_user: bool = False) -> int:
+        """
+        테넌트의 청크를 추가합니다. 같은 (user_id, file_hash)가 있으면 교체하고,
+        replace_user=True이면 해당 사용자의 다른 파일 벡터도 함께 제거합니다.
+        """
+        import numpy as np
+
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        with self._lock:
+            if len(texts):
+                self._ensure_index(vectors)
+            for key in list(self._tenants):
+                if key[0] == user_id and (replace_user or key[1] == file_hash):
+                    self._remove_tenant(key)
+
+            ids = list(range(self._next_id, self._next_id + len(texts)))
+            self._next_id += len(texts)
+            if ids:
+                self._index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+            for vector_id, text, metadata in zip(ids, texts, metadatas):
+                self._chunks[vector_id] = (text, {**metadata, "user_id": user_id, "file_hash": file_hash})
+            self._tenants[(user_id, file_hash)] = ids
+            self._keyword_indexes[(user_id, file_hash)] = Bm25Index(texts)
+            self._maybe_train_ivfpq()
+        return len(ids)
+
+    def add_vectorstore(self, user_id: str, file_hash: str, vectorstore, replace_user: bool = False) -> int:
+        """
+        파일별로 생성/로드한 LangChain FAISS 저장소의 벡터와 청크를 공유 인덱스로 복사합니다.
+        """
+        texts, metadatas = [], []
+        for position in range(vectorstore.index.ntotal):
+            doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
+            texts.append(doc.page_content)
+            metadatas.append(dict(doc.metadata))
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        return self.add(user_id, file_hash, texts, vectors, metadatas, replace_user=replace_user)
+
+    def user_chunks(self, user_id: str) -> List[Tuple[str, Any]]:
+        """
+        사용자의 (청크 본문, 벡터) 목록을 반환합니다. 수정본을 증분 인덱싱할 때 사용합니다.
+        근사 벡터를 저장하는 인덱스 종류에서는 빈 목록을 반환합니다.
+        """
+        if not self.stores_exact_vectors:
+            return []
+        with self._lock:
+            ids = [vector_id for key, ids in self._tenants.items() if key[0] == user_id for vector_id in ids]
+            return [(self._chunks[vector_id][0], self._index.reconstruct(vector_id)) for vector_id in ids]
+
+    def delete_user(self, user_id: str) -> int:
+        """
+        사용자의 모든 벡터와 청크를 제거하고 제거한 벡터 수를 반환합니다.
+        """
+        with self._lock:
+            removed = 0
+            for key in [key for key in self._tenants if key[0] == user_id]:
+                removed += self._remove_tenant(key)
+            return removed
+
+    def search(self, user_id: str, query: str, k: int = 5, file_hash: Optional[str] = None,
+               sections: Optional[List[str]] = None) -> List[Document]:
+        """
+        사용자(와 파일)의 벡터로 검색 범위를 제한하여 질의와 가까운 청크 k개를 반환합니다.
+        sections가 주어지면 해당 섹션의 청크만 검색합니다.
+        """
+        return self.search_by_vector(user_id, self._get_embeddings().embed_query(query), k, file_hash=file_hash,
+                                     sections=sections)
+
+    def _tenant_keys(self, user_id: str, file_hash: Optional[str]) -> List[Tuple[str, str]]:
+        return [key for key in self._tenants if key[0] == user_id and (file_hash is None or key[1] == file_hash)]
+
+    def _candidate_ids(self, keys: List[Tuple[str, str]], sections: Optional[List[str]] = None) -> List[int]:
+        ids = [vector_id for key in keys for vector_id in self._tenants[key]]
+        if sections:
+            ids = [vector_id for vector_id in ids if self._chunks[vector_id][1].get("section") in sections]
+        return ids
+
+    def _vector_search_ids(self, ids: List[int], vector, k: int) -> List[int]:
+        import numpy as np
+
+        if not ids:
+            return []
+        candidates = np.asarray(ids, dtype="int64")
+        vectors = self._index.reconstruct_batch(candidates)
+        distances = ((vectors - np.asarray(vector, dtype="float32")) ** 2).sum(axis=1)
+        k = min(k, len(ids))
+        top = np.argpartition(distances, k - 1)[:k]
+        return [int(candidates[position]) for position in top[np.argsort(distances[top], kind="stable")]]
+
+    def _keyword_search_ids(self, keys: List[Tuple[str, str]], query: str, k: int,
+                            allowed: Optional[List[int]] = None) -> List[int]:
+        # 파일이 여러 개이면 파일별 BM25 점수를 합쳐 상위 k개를 고름 (allowed가 있으면 그 청크만)
+        allowed = set(allowed) if allowed is not None else None
+        scored = [
+            (score, self._tenants[key][position])
+            for key in keys
+            for position, score in self._keyword_indexes[key].search(
+                query, k if allowed is None else len(self._tenants[key]))
+        ]
+        if allowed is not None:
+            scored = [item for item in scored if item[1] in allowed]
+        return [vector_id for _, vector_id in sorted(scored, key=lambda item: item[0], reverse=True)[:k]]
+
+    def _documents(self, ids: List[int]) -> List[Document]:
+        return [Document(page_content=self._chunks[vector_id][0], metadata=dict(self._chunks[vector_id][1]))
+                for vector_id in ids if vector_id in self._chunks]
+
+    def search_by_vector(self, user_id: str, vector, k: int = 5, file_hash: Optional[str] = None,
+                         sections: Optional[List[str]] = None) -> List[Document]:
+        with self._lock:
+            ids = self._candidate_ids(self._tenant_keys(user_id, file_hash), sections)
+            return self._documents(self._vector_search_ids(ids, vector, k))
+
+    def keyword_search(self, user_id: str, query: str, k: int = 5, file_hash: Optional[str] = None) -> List[Document]:
+        """
+        사용자(와 파일)의 청크 중 질의와 키워드가 일치하는 청크를 BM25 점수 순으로 최대 k개 반환합니다.
+        """
+        with self._lock:
+            return self._documents(self._keyword_search_ids(self._tenant_keys(user_id, file_hash), query, k))
+
+    def hybrid_search(self, user_id: str, query: str, k: int = 5, file_hash: Optional[str] = None,
+                      fetch_k: int = 20, sections: Optional[List[str]] = None) -> List[Document]:
+        """
+        벡터 검색과 BM25 검색에서 각각 fetch_k개의 후보를 찾고, 두 순위를 RRF로 융합하여 상위 k개를 반환합니다.
+        """
+        vector = self._get_embeddings().embed_query(query)
+        with self._lock:
+            keys = self._tenant_keys(user_id, file_hash)
+            ids = self._candidate_ids(keys, sections)
+            fetch_k = max(fetch_k, k)
+            rankings = [
+                self._vector_search_ids(ids, vector, fetch_k),
+                self._keyword_search_ids(keys, query, fetch_k, allowed=ids if sections else None),
+            ]
+            return self._documents(reciprocal_rank_fusion(rankings)[:k])
+
+    def section_search(self, user_id: str, query: str, sections: List[str], k: int = 5,
+                       file_hash: Optional[str] = None, search_type: str = "similarity",
+                       fetch_k: int = 20) -> List[Document]:
+        """
+        지정한 섹션의 청크를 반환합니다. k개 이하이면 임베딩/검색 없이 문서 순서대로 반환하고,
+        k개보다 많으면 해당 섹션 안에서 search_type 방식으로 검색한 상위 k개를 반환합니다.
+        """
+        with self._lock:
+            ids = self._candidate_ids(self._tenant_keys(user_id, file_hash), sections)
+            if len(ids) <= k:
+                return self._documents(ids)
+        if search_type == "hybrid":
+            return self.hybrid_search(user_id, query, k, file_hash=file_hash, fetch_k=fetch_k, sections=sections)
+        return self.search(user_id, query, k, file_hash=file_hash, sections=sections)
+
+    def as_retriever(self, user_id: str, file_hash: Optional[str] = None, k: int = 5, search_type: str = "similarity",
+                     fetch_k: int = 20, sections: Optional[List[str]] = None) -> TenantRetriever:
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"지원되지 않는 검색 방식입니다: {search_type} (지원: {', '.join(SEARCH_TYPES)})")
+        return TenantRetriever(index=self, user_id=user_id, file_hash=file_hash, k=k, search_type=search_type,
+                               fetch_k=fetch_k, sections=list(sections) if sections else None)
+
+    def _bytes_per_vector(self) -> int:
+        dimension = self._index.d
+        if self._active_type == "ivfpq":
+            return self._pq_subquantizers(dimension) + 8  # PQ 코드 + 역리스트의 ID
+        # IndexIDMap2는 ID(8바이트)를 함께 보관
+        return {"flat": 4 * dimension, "sq_fp16": 2 * dimension, "sq8": dimension}[self._active_type] + 8
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            num_vectors = self._index.ntotal if self._index is not None else 0
+            return {
+                "index_type": self.index_type,
+                "active_index_type": self._active_type or self.index_type,
+                "tenants": len(self._tenants),
+                "users": len({key[0] for key in self._tenants}),
+                "vectors": num_vectors,
+                "dimension": self._index.d if self._index is not None else 0,
+                "vector_bytes": num_vectors * self._bytes_per_vector() if self._index is not None else 0,
+                "keyword_terms": sum(index.num_terms for index in self._keyword_indexes.values()),
+            }
@@ -0,0 +1,7 @@
+# conftest.py
+
+# 서비스 모듈(langchain/*.py)을 테스트에서 바로 임포트할 수 있도록 경로를 추가합니다.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,60 @@
+# test_bm25_index.py
+
+from bm25_index import Bm25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_version_tokens_and_drops_attached_josa():
+    tokens = tokenize("Spring Boot 2.x와 QueryDSL을 사용")
+    assert {"spring", "boot", "2.x", "2", "x", "querydsl"} <= set(tokens)
+    # 영문/숫자 뒤에 붙어 분리된 조사는 토큰이 되지 않음
+    assert "와" not in tokens and "을" not in tokens
+
+
+def test_tokenize_strips_korean_josa_longest_first():
+    assert tokenize("개발자로서")[0] == "개발자"
+    assert tokenize("프로젝트에서는")[0] == "프로젝트"
+    assert tokenize("서비스를")[0] == "서비스"
+
+
+def test_tokenize_keeps_short_words_whose_stem_would_be_one_syllable():
+    # 조사를 떼면 한 글자만 남는 단어는 그대로 둠
+    assert tokenize("나는")[0] == "나는"
+    assert tokenize("회사")[0] == "회사"
+
+
+def test_tokenize_adds_bigrams_for_long_korean_stems():
+    tokens = tokenize("데이터분석")
+    assert tokens[0] == "데이터분석"
+    assert {"#데이", "#이터", "#터분", "#분석"} <= set(tokens)
+
+
+def test_search_ranks_keyword_match_first():
+    index = Bm25Index([
+        "Spring Boot 기반 주문 API 개발",
+        "Kafka로 이벤트 파이프라인을 구축하고 장애를 줄였습니다",
+        "팀원과 협업하여 일정 관리",
+    ])
+    results = index.search("Kafka 경험", k=3)
+    assert results[0][0] == 1
+    assert all(score > 0 for _, score in results)
+
+
+def test_search_matches_korean_query_with_different_josa():
+    index = Bm25Index(["카프카를 도입했습니다", "레디스 캐시 적용"])
+    assert index.search("카프카는", k=1)[0][0] == 0
+
+
+def test_search_returns_empty_without_matches_or_documents():
+    assert Bm25Index(["파이썬 백엔드"]).search("kubernetes", k=5) == []
+    assert Bm25Index([]).search("파이썬", k=5) == []
+
+
+def test_search_limits_results_to_k():
+    index = Bm25Index([f"python 프로젝트 {i}" for i in range(10)])
+    assert len(index.search("python", k=3)) == 3
+
+
+def test_reciprocal_rank_fusion_prefers_items_ranked_high_in_both():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]])
+    assert fused[0] == 1
+    assert set(fused) == {1, 2, 3, 4}
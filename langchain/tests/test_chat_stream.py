@@ -0,0 +1,127 @@
+# test_chat_stream.py
+
+import importlib
+import json
+import os
+
+import pytest
+
+pytest.importorskip("multipart")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")  # 서비스 모듈 임포트 시 확인 (테스트에서는 호출하지 않음)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.messages import AIMessageChunk  # noqa: E402
+
+AGENT_NAME = "AgentExecutor"
+
+
+class FakeAgentExecutor:
+    """
+    정해진 astream_events(v2) 이벤트를 내보내는 에이전트 대역입니다.
+    """
+
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+        self.inputs = None
+
+    def get_name(self):
+        return AGENT_NAME
+
+    async def astream_events(self, inputs, version):
+        assert version == "v2"
+        self.inputs = inputs
+        for event in self.events:
+            yield event
+        if self.error is not None:
+            raise self.error
+
+
+def _token(content, parent_ids):
+    return {"event": "on_chat_model_stream", "name": "ChatOpenAI", "run_id": "llm", "parent_ids": parent_ids,
+            "data": {"chunk": AIMessageChunk(content=content)}}
+
+
+AGENT_EVENTS = [
+    {"event": "on_chain_start", "name": AGENT_NAME, "run_id": "root", "parent_ids": [], "data": {}},
+    {"event": "on_tool_start", "name": "job_recommendation", "run_id": "tool", "parent_ids": ["root"], "data": {}},
+    _token("툴 내부 RAG 토큰", ["root", "tool", "chain"]),
+    {"event": "on_retriever_end", "name": "TenantRetriever", "run_id": "retriever", "parent_ids": ["root", "tool"],
+     "data": {"output": [Document(page_content="경력"), Document(page_content="기술")]}},
+    {"event": "on_tool_end", "name": "job_recommendation", "run_id": "tool", "parent_ids": ["root"], "data": {}},
+    _token("", ["root"]),
+    _token("백엔드 ", ["root"]),
+    _token("개발자를 추천합니다.", ["root"]),
+    {"event": "on_chain_end", "name": AGENT_NAME, "run_id": "nested", "parent_ids": ["root"],
+     "data": {"output": {"output": "중첩 실행 결과"}}},
+    {"event": "on_chain_end", "name": AGENT_NAME, "run_id": "root", "parent_ids": [],
+     "data": {"output": {"output": "백엔드 개발자를 추천합니다."}}},
+]
+
+
+@pytest.fixture(params=["backend_api", "backend_api_file", "backend_api_js"])
+def service(request, monkeypatch):
+    module = importlib.import_module(request.param)
+    monkeypatch.setattr(module, "user_data_store", {})
+    return module
+
+
+def _events(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-accel-buffering"] == "no"
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def _stream(service, user_id="user"):
+    with TestClient(service.app) as client:
+        return client.post("/api/chat/stream", json={"userId": user_id, "userMessage": "추천 직무는?", "temperature": 0})
+
+
+def test_stream_sends_progress_tokens_and_final_answer(service, monkeypatch):
+    agent = FakeAgentExecutor(AGENT_EVENTS)
+    monkeypatch.setattr(service, "get_agent_executor", lambda user_id, temperature: agent)
+    service.user_data_store["user"] = {"file_path": "uploads/resume.pdf", "chat_history": []}
+
+    events = _events(_stream(service))
+    assert events == [
+        ("status", {"stage": "started"}),
+        ("tool_start", {"tool": "job_recommendation"}),
+        ("retrieval_done", {"documents": 2}),
+        ("tool_end", {"tool": "job_recommendation"}),
+        ("token", {"content": "백엔드 "}),
+        ("token", {"content": "개발자를 추천합니다."}),
+        ("final", {"aiResponse": "백엔드 개발자를 추천합니다."}),
+    ]
+    assert agent.inputs["input"] == "추천 직무는?"
+    history = service.user_data_store["user"]["chat_history"]
+    assert [message.content for message in history] == ["추천 직무는?", "백엔드 개발자를 추천합니다."]
+
+
+def test_stream_without_uploaded_file_sends_notice_only(service, monkeypatch):
+    monkeypatch.setattr(service, "get_agent_executor", lambda *args: pytest.fail("에이전트를 실행하면 안 됨"))
+    events = _events(_stream(service, user_id="new-user"))
+    assert [name for name, _ in events] == ["status", "final"]
+    assert "파일" in events[1][1]["aiResponse"]
+
+
+def test_stream_reports_agent_errors(service, monkeypatch):
+    agent = FakeAgentExecutor(AGENT_EVENTS[:2], error=RuntimeError("rate limited"))
+    monkeypatch.setattr(service, "get_agent_executor", lambda user_id, temperature: agent)
+    service.user_data_store["user"] = {"file_path": "uploads/resume.pdf", "chat_history": []}
+
+    events = _events(_stream(service))
+    assert [name for name, _ in events] == ["status", "tool_start", "error"]
+    assert "rate limited" in events[-1][1]["detail"]
+    assert "rate limited" in service.user_data_store["user"]["chat_history"][-1].content
+
+
+def test_empty_message_is_rejected(service):
+    with TestClient(service.app) as client:
+        response = client.post("/api/chat/stream", json={"userId": "user", "userMessage": "", "temperature": 0})
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+# test_chunk_dedup.py
+
+import pytest
+from langchain_core.documents import Document
+
+pytest.importorskip("numpy")
+
+from chunk_dedup import deduplicate_chunks, strip_repeated_lines  # noqa: E402
+
+BODY = (
+    "주문 API의 응답 시간이 느려지는 문제를 분석하여 캐시를 적용하고 쿼리를 개선했습니다. "
+    "그 결과 평균 응답 시간을 800ms에서 200ms로 줄였고 장애 건수도 절반으로 감소했습니다."
+)
+
+
+def _docs(*texts):
+    return [Document(page_content=text, metadata={"position": i}) for i, text in enumerate(texts)]
+
+
+def test_exact_duplicates_ignore_case_and_whitespace():
+    kept, stats = deduplicate_chunks(_docs("Python  Kafka\n경험", "python kafka 경험", "Redis 캐시"))
+    assert [doc.metadata["position"] for doc in kept] == [0, 2]
+    assert kept[0].metadata["duplicates"] == 1
+    assert stats == {"chunks_duplicate_exact": 1, "chunks_duplicate_near": 0}
+
+
+def test_near_duplicate_is_removed_and_first_occurrence_kept():
+    near = BODY.replace("절반으로", "절반 가까이")
+    kept, stats = deduplicate_chunks(_docs(BODY, "전혀 다른 내용의 자기소개 문단입니다. 협업을 중요하게 생각합니다.", near))
+    assert [doc.metadata["position"] for doc in kept] == [0, 1]
+    assert stats["chunks_duplicate_near"] == 1
+    assert kept[0].metadata["duplicates"] == 1
+
+
+def test_threshold_of_one_removes_only_exact_duplicates():
+    near = BODY.replace("절반으로", "절반 가까이")
+    kept, stats = deduplicate_chunks(_docs(BODY, near, BODY), threshold=1.0)
+    assert len(kept) == 2
+    assert stats == {"chunks_duplicate_exact": 1, "chunks_duplicate_near": 0}
+
+
+def test_distinct_and_empty_chunks():
+    kept, stats = deduplicate_chunks(_docs("Spring Boot 백엔드 개발", "   ", "React 프론트엔드 개발", "SQL"))
+    assert [doc.page_content for doc in kept] == ["Spring Boot 백엔드 개발", "React 프론트엔드 개발", "SQL"]
+    assert stats == {"chunks_duplicate_exact": 0, "chunks_duplicate_near": 0}
+
+
+def test_input_metadata_is_not_mutated():
+    documents = _docs("같은 문장입니다", "같은 문장입니다")
+    deduplicate_chunks(documents)
+    assert "duplicates" not in documents[0].metadata
+
+
+def _page(number, total, body):
+    return Document(page_content="\n".join(["홍길동 이력서", *body, f"- {number} / {total} -"]),
+                    metadata={"page": number})
+
+
+def test_strip_repeated_lines_removes_headers_and_page_numbers():
+    pages = [_page(n, 3, [f"본문 {n}-1", f"본문 {n}-2", f"본문 {n}-3"]) for n in range(1, 4)]
+    stripped, removed = strip_repeated_lines(pages)
+    assert removed == 6
+    assert stripped[0].page_content == "본문 1-1\n본문 1-2\n본문 1-3"
+    assert [doc.metadata["page"] for doc in stripped] == [1, 2, 3]
+
+
+def test_strip_repeated_lines_keeps_repeated_lines_in_page_body():
+    pages = [_page(n, 3, ["첫 줄", "주요 기술: Python", "중간 줄", "끝 줄"]) for n in range(1, 4)]
+    stripped, _ = strip_repeated_lines(pages)
+    # 본문 가운데 반복되는 줄은 머리말/꼬리말 위치가 아니므로 유지
+    assert "주요 기술: Python" in stripped[0].page_content
+
+
+def test_strip_repeated_lines_skips_short_pages_and_few_pages():
+    short_pages = [Document(page_content="홍길동 이력서\n본문\n- 1 / 3 -", metadata={}) for _ in range(3)]
+    assert strip_repeated_lines(short_pages) == (short_pages, 0)
+    two_pages = [_page(n, 2, ["a", "b", "c"]) for n in range(1, 3)]
+    assert strip_repeated_lines(two_pages) == (two_pages, 0)
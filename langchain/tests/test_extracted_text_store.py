@@ -0,0 +1,86 @@
+# test_extracted_text_store.py
+
+import hashlib
+import os
+import unicodedata
+
+import pytest
+from langchain_core.documents import Document
+
+from extracted_text_store import ExtractedTextStore, FileContentChangedError
+
+
+class Extractor:
+    def __init__(self):
+        self.paths = []
+
+    def __call__(self, path):
+        self.paths.append(path)
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return [Document(page_content=f.read(), metadata={"source": path, "page": 0})]
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExtractedTextStore(str(tmp_path / ".text"))
+
+
+def test_text_is_extracted_once_and_reused(tmp_path, store):
+    resume = str(tmp_path / "resume.txt")
+    file_hash = _write(resume, unicodedata.normalize("NFD", "홍길동\r\n경력 3년"))
+    extract = Extractor()
+
+    documents = store.load_or_extract(resume, file_hash, extract)
+    assert documents[0].page_content == "홍길동\n경력 3년"  # NFC, 줄바꿈 통일
+    assert documents[0].metadata == {"source": resume, "page": 0}
+    # 추출은 같은 확장자의 임시 사본에서 수행하고, 사본은 바로 삭제
+    assert extract.paths[0] != resume and extract.paths[0].endswith(".txt")
+    assert not os.path.exists(extract.paths[0])
+
+    moved = str(tmp_path / "moved.txt")
+    os.replace(resume, moved)
+    again = store.load_or_extract(moved, file_hash, extract)
+    assert len(extract.paths) == 1
+    assert again[0].page_content == documents[0].page_content
+    assert again[0].metadata["source"] == moved
+
+
+def test_changed_content_is_not_extracted_under_the_old_hash(tmp_path, store):
+    resume = str(tmp_path / "resume.txt")
+    file_hash = _write(resume, "첫 번째 이력서")
+    _write(resume, "같은 이름으로 다시 올린 다른 이력서")
+    extract = Extractor()
+
+    with pytest.raises(FileContentChangedError):
+        store.load_or_extract(resume, file_hash, extract)
+    assert extract.paths == []
+    assert store.load(file_hash) is None
+    assert os.listdir(store.root_dir) == []  # 임시 사본도 남지 않음
+
+
+def test_snapshot_is_removed_when_extraction_fails(tmp_path, store):
+    resume = str(tmp_path / "resume.txt")
+    file_hash = _write(resume, "이력서")
+    seen = []
+
+    def failing(path):
+        seen.append(path)
+        raise ValueError("파싱 실패")
+
+    with pytest.raises(ValueError):
+        store.load_or_extract(resume, file_hash, failing)
+    assert not os.path.exists(seen[0])
+    assert store.load(file_hash) is None
+
+
+def test_empty_extraction_is_not_stored(tmp_path, store):
+    resume = str(tmp_path / "resume.txt")
+    file_hash = _write(resume, "")
+    assert store.load_or_extract(resume, file_hash, lambda path: []) == []
+    assert store.load(file_hash) is None
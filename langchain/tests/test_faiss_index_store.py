@@ -0,0 +1,83 @@
+# test_faiss_index_store.py
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_community.vectorstores import FAISS  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+
+from faiss_index_store import FaissIndexStore  # noqa: E402
+from vector_store_registry import VectorStoreRegistry, compute_file_hash  # noqa: E402
+
+DIMENSION = 16
+CHUNKS = ["주요 기술: Python, FastAPI", "경력: 주문 API 응답 시간 개선", "학력: 컴퓨터공학 학사"]
+
+
+def _embeddings():
+    return DeterministicFakeEmbedding(size=DIMENSION)
+
+
+def _store(root, backend="fake-16"):
+    return FaissIndexStore(str(root), _embeddings, backend, chunk_size_unit="tokens", embedding_dimensions=DIMENSION)
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, file_path, chunk_size, chunk_overlap, file_hash=None):
+        self.calls += 1
+        return FAISS.from_texts(CHUNKS, _embeddings(), metadatas=[{"position": i} for i in range(len(CHUNKS))])
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("\n".join(CHUNKS), encoding="utf-8")
+    return str(path)
+
+
+def test_saved_index_loads_with_same_vectors_and_chunks(tmp_path, resume):
+    store = _store(tmp_path / "indexes")
+    vectorstore = Builder()(resume, 500, 50)
+    store.save(vectorstore, "abc", 500, 50, source_path=resume)
+
+    loaded = store.load("abc", 500, 50)
+    assert loaded.index.ntotal == len(CHUNKS)
+    assert [loaded.docstore.search(loaded.index_to_docstore_id[i]).page_content for i in range(len(CHUNKS))] == CHUNKS
+    assert (loaded.index.reconstruct_n(0, len(CHUNKS)) == vectorstore.index.reconstruct_n(0, len(CHUNKS))).all()
+    assert store.latest_params("abc") == (500, 50)
+
+
+def test_index_is_not_loaded_for_other_params_or_backend(tmp_path, resume):
+    store = _store(tmp_path / "indexes")
+    store.save(Builder()(resume, 500, 50), "abc", 500, 50)
+    assert store.load("abc", 500, 0) is None
+    assert store.load("other", 500, 50) is None
+    assert _store(tmp_path / "indexes", backend="other-model").load("abc", 500, 50) is None
+
+
+def test_registry_reuses_persisted_index_after_restart(tmp_path, resume):
+    builder = Builder()
+    VectorStoreRegistry(_store(tmp_path / "indexes"), keep_in_memory=False).get_or_build(resume, builder, 500, 50)
+    assert builder.calls == 1
+
+    # 재시작: 메모리는 비어 있지만 디스크의 인덱스를 업로드 시의 청크 파라미터로 다시 사용
+    restarted = VectorStoreRegistry(_store(tmp_path / "indexes"), keep_in_memory=False)
+    vectorstore = restarted.get_or_build(resume, builder)
+    assert builder.calls == 1
+    assert vectorstore.index.ntotal == len(CHUNKS)
+
+
+def test_failed_build_persists_nothing(tmp_path, resume):
+    store = _store(tmp_path / "indexes")
+
+    def mismatched_builder(file_path, chunk_size, chunk_overlap, file_hash=None):
+        raise RuntimeError("file content changed")
+
+    with pytest.raises(RuntimeError):
+        VectorStoreRegistry(store).get_or_build(resume, mismatched_builder, 500, 50)
+    assert store.latest_params(compute_file_hash(resume)) is None
+    assert not (tmp_path / "indexes").exists()
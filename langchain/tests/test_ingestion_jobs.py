@@ -0,0 +1,79 @@
+# test_ingestion_jobs.py
+
+import asyncio
+import threading
+
+from ingestion_jobs import JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, IngestionJobManager
+
+
+def _wait(manager, job, timeout=5.0):
+    return asyncio.run(manager.wait(job, timeout))
+
+
+def test_job_reports_progress_and_result():
+    manager = IngestionJobManager(max_workers=1)
+
+    def ingest(job):
+        job.update("splitting", 30)
+        job.update("embedding", 20)  # 진행률은 줄어들지 않음
+        job.update("indexing", 150)  # 100을 넘지 않음
+        return {"num_chunks": 3}
+
+    job = manager.submit("user", "resume.pdf", ingest)
+    assert _wait(manager, job)
+    state = manager.get(job.job_id).to_dict()
+    assert (state["status"], state["stage"], state["progress"]) == (JOB_COMPLETED, JOB_COMPLETED, 100)
+    assert state["result"] == {"num_chunks": 3}
+    assert state["error"] is None
+
+
+def test_failed_job_keeps_the_error():
+    manager = IngestionJobManager(max_workers=1)
+
+    def ingest(job):
+        job.update("extracting", 5)
+        raise ValueError("지원되지 않는 파일 형식")
+
+    job = manager.submit("user", "resume.hwp", ingest)
+    assert _wait(manager, job)
+    state = job.to_dict()
+    assert state["status"] == JOB_FAILED
+    assert state["error"] == "지원되지 않는 파일 형식"
+    assert state["progress"] == 5 and state["result"] is None
+
+
+def test_jobs_wait_for_a_free_worker_and_wait_times_out():
+    manager = IngestionJobManager(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(job):
+        started.set()
+        release.wait(5)
+
+    first = manager.submit("a", "a.pdf", blocking)
+    second = manager.submit("b", "b.pdf", lambda job: {"ok": True})
+    assert started.wait(5)
+    assert first.status == JOB_RUNNING
+    assert second.status == JOB_QUEUED
+    assert asyncio.run(manager.wait(first, 0.05)) is False
+
+    release.set()
+    assert _wait(manager, first) and _wait(manager, second)
+    assert second.result == {"ok": True}
+
+
+def test_old_finished_jobs_are_pruned_but_running_jobs_are_kept():
+    manager = IngestionJobManager(max_workers=2, max_jobs=2)
+    release = threading.Event()
+    running = manager.submit("a", "a.pdf", lambda job: release.wait(5))
+    finished = [manager.submit("b", f"{i}.pdf", lambda job: None) for i in range(2)]
+    for job in finished:
+        assert _wait(manager, job)
+
+    latest = manager.submit("c", "c.pdf", lambda job: None)
+    assert manager.get(running.job_id) is running
+    assert manager.get(finished[0].job_id) is None
+    assert manager.get(latest.job_id) is latest
+    release.set()
+    assert _wait(manager, running) and _wait(manager, latest)
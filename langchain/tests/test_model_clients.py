@@ -0,0 +1,38 @@
+# test_model_clients.py
+
+import pytest
+
+from model_clients import MAX_TEMPERATURE, ModelClients, bucket_temperature
+
+
+@pytest.mark.parametrize("temperature, expected", [
+    (0, 0.0),
+    (0.04, 0.0),
+    (0.7, 0.7),
+    (0.74, 0.7),
+    (0.75, 0.8),
+    ("1.2", 1.2),
+    (-1, 0.0),
+    (7.5, MAX_TEMPERATURE),
+    (float("inf"), MAX_TEMPERATURE),
+    (float("nan"), 0.0),
+])
+def test_bucket_temperature(temperature, expected):
+    assert bucket_temperature(temperature) == expected
+
+
+def test_chat_models_are_shared_per_bucket_and_bounded():
+    pytest.importorskip("langchain_openai")
+    clients = ModelClients("test-key", "gpt-3.5-turbo")
+    assert clients.chat(0.71) is clients.chat(0.74)
+    assert clients.chat(0.71).temperature == 0.7
+    for i in range(1000):
+        clients.chat(i / 997 * 3 - 0.5)
+    assert clients.get_stats()["chat_models"] == 21
+    # 모든 모델이 같은 HTTP 클라이언트(연결 풀)를 사용
+    assert clients.chat(0).http_client is clients.chat(1.5).http_client is clients.http_client
+
+
+def test_chat_requires_an_api_key():
+    with pytest.raises(ValueError):
+        ModelClients(None, "gpt-3.5-turbo").chat(0)
@@ -0,0 +1,85 @@
+# test_resume_sections.py
+
+import pytest
+from langchain_core.documents import Document
+
+from resume_sections import (
+    MAX_HEADING_LENGTH,
+    SECTION_EDUCATION,
+    SECTION_EXPERIENCE,
+    SECTION_INTRODUCTION,
+    SECTION_OTHER,
+    SECTION_PROJECTS,
+    SECTION_SKILLS,
+    detect_heading,
+    split_sections,
+)
+
+
+@pytest.mark.parametrize("line, section", [
+    ("■ 경력 사항", SECTION_EXPERIENCE),
+    ("[기술 스택]", SECTION_SKILLS),
+    ("2. 프로젝트 경험:", SECTION_PROJECTS),
+    ("학력사항", SECTION_EDUCATION),
+    ("가. 자기소개서", SECTION_INTRODUCTION),
+    ("  Work Experience  ", SECTION_EXPERIENCE),
+    ("TECH STACK", SECTION_SKILLS),
+])
+def test_detect_heading_recognizes_heading_variants(line, section):
+    assert detect_heading(line) == section
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    "   ",
+    "경력 3년 동안 주문 시스템을 개발하며 응답 시간을 절반으로 줄였습니다.",
+    "경력직 채용",
+    "홍길동",
+])
+def test_detect_heading_ignores_body_lines(line):
+    assert detect_heading(line) is None
+
+
+def test_detect_heading_length_limit_boundary():
+    assert detect_heading("■" * (MAX_HEADING_LENGTH - 2) + "경력") == SECTION_EXPERIENCE
+    assert detect_heading("■" * (MAX_HEADING_LENGTH - 1) + "경력") is None
+    # 앞뒤 공백은 길이에 포함하지 않음
+    assert detect_heading("경력" + " " * MAX_HEADING_LENGTH) == SECTION_EXPERIENCE
+
+
+def test_split_sections_labels_preamble_and_sections():
+    page = Document(
+        page_content="홍길동\nhong@example.com\n■ 학력\n한국대학교 컴퓨터공학과\n■ 기술 스택\nPython, Kafka",
+        metadata={"source": "resume.pdf", "page": 0},
+    )
+    sections = split_sections([page])
+    assert [doc.metadata["section"] for doc in sections] == [SECTION_OTHER, SECTION_EDUCATION, SECTION_SKILLS]
+    # 제목 줄은 섹션 본문의 첫 줄로 유지되고, 원래 메타데이터도 유지됨
+    assert sections[1].page_content == "■ 학력\n한국대학교 컴퓨터공학과"
+    assert all(doc.metadata["source"] == "resume.pdf" for doc in sections)
+
+
+def test_split_sections_continues_section_across_pages():
+    pages = [
+        Document(page_content="■ 경력\nA사 백엔드 개발", metadata={"page": 0}),
+        Document(page_content="B사 플랫폼 개발\n■ 프로젝트\n주문 시스템 개편", metadata={"page": 1}),
+    ]
+    sections = split_sections(pages)
+    assert [(doc.metadata["page"], doc.metadata["section"]) for doc in sections] == [
+        (0, SECTION_EXPERIENCE), (1, SECTION_EXPERIENCE), (1, SECTION_PROJECTS),
+    ]
+
+
+def test_split_sections_drops_heading_only_page_end_and_carries_label():
+    pages = [
+        Document(page_content="■ 학력\n한국대학교\n■ 자기소개", metadata={"page": 0}),
+        Document(page_content="끈기 있게 문제를 해결합니다.", metadata={"page": 1}),
+    ]
+    sections = split_sections(pages)
+    assert [doc.page_content for doc in sections] == ["■ 학력\n한국대학교", "끈기 있게 문제를 해결합니다."]
+    assert sections[1].metadata["section"] == SECTION_INTRODUCTION
+
+
+def test_split_sections_without_headings_keeps_document_as_other():
+    sections = split_sections([Document(page_content="제목 없는 자기소개 글입니다.", metadata={})])
+    assert len(sections) == 1 and sections[0].metadata["section"] == SECTION_OTHER
@@ -0,0 +1,135 @@
+# test_shared_vector_index.py
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from shared_vector_index import PQ_MIN_TRAIN_SIZE, SharedVectorIndex  # noqa: E402
+
+DIMENSION = 16
+
+
+def _vectors(count, seed):
+    return np.random.default_rng(seed).random((count, DIMENSION), dtype="float32")
+
+
+def _add(index, user_id, file_hash, count, seed=0, prefix=None):
+    prefix = prefix or f"{user_id}/{file_hash}"
+    texts = [f"{prefix} 청크 {i}" for i in range(count)]
+    return index.add(user_id, file_hash, texts, _vectors(count, seed), [{"position": i} for i in range(count)])
+
+
+def test_ivfpq_train_size_is_at_least_the_pq_minimum():
+    index = SharedVectorIndex(lambda: None, "ivfpq", ivf_nlist=4, pq_m=4, train_size=100)
+    assert index.train_size == PQ_MIN_TRAIN_SIZE
+
+
+def test_ivfpq_switches_after_train_size_vectors_and_keeps_tenant_filter():
+    index = SharedVectorIndex(lambda: None, "ivfpq", ivf_nlist=4, pq_m=4, train_size=100)
+    for user in range(5):
+        _add(index, f"user{user}", "h", 60, seed=user)
+    assert index.get_stats()["active_index_type"] == "ivfpq"
+    documents = index.search_by_vector("user1", _vectors(1, 99)[0], 5)
+    assert len(documents) == 5
+    assert {doc.metadata["user_id"] for doc in documents} == {"user1"}
+
+
+def test_failed_ivfpq_training_keeps_flat_index_usable(monkeypatch):
+    index = SharedVectorIndex(lambda: None, "ivfpq", ivf_nlist=4, pq_m=4, train_size=100)
+
+    def fail():
+        raise RuntimeError("training failed")
+
+    monkeypatch.setattr(index, "_train_ivfpq", fail)
+    for user in range(5):
+        assert _add(index, f"user{user}", "h", 60, seed=user) == 60
+    assert index.get_stats()["active_index_type"] == "flat"
+    assert index.get_stats()["tenants"] == 5
+
+    # 실패 후에는 train_size개가 더 모일 때까지 재학습하지 않고, 이후 업로드/검색은 정상 동작
+    attempts = []
+    monkeypatch.setattr(index, "_train_ivfpq", lambda: attempts.append(index.get_stats()["vectors"]))
+    _add(index, "user5", "h", 60, seed=5)
+    assert attempts == []
+    documents = index.search_by_vector("user3", _vectors(1, 99)[0], 3)
+    assert {doc.metadata["user_id"] for doc in documents} == {"user3"}
+
+
+@pytest.fixture
+def flat_index():
+    index = SharedVectorIndex(lambda: None, "flat")
+    _add(index, "alice", "resume-v1", 5, seed=1)
+    _add(index, "alice", "portfolio", 4, seed=2)
+    _add(index, "bob", "resume-v1", 6, seed=3)
+    return index
+
+
+def test_search_is_limited_to_the_user_and_file(flat_index):
+    # bob의 벡터와 완전히 같은 질의여도 alice의 청크만 반환
+    query = _vectors(6, 3)[0]
+    documents = flat_index.search_by_vector("alice", query, 20)
+    assert len(documents) == 9
+    assert {doc.metadata["user_id"] for doc in documents} == {"alice"}
+    documents = flat_index.search_by_vector("alice", query, 20, file_hash="portfolio")
+    assert {doc.metadata["file_hash"] for doc in documents} == {"portfolio"}
+    assert flat_index.search_by_vector("bob", query, 1)[0].page_content == "bob/resume-v1 청크 0"
+    assert flat_index.search_by_vector("carol", query, 5) == []
+
+
+def test_vector_search_ranks_tenant_chunks_by_distance(flat_index):
+    vectors = _vectors(5, 1)
+    query = vectors[3]
+    documents = flat_index.search_by_vector("alice", query, 5, file_hash="resume-v1")
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    assert [doc.metadata["position"] for doc in documents] == list(np.argsort(distances))
+
+
+def test_keyword_search_is_limited_to_the_user(flat_index):
+    documents = flat_index.keyword_search("bob", "청크", 10)
+    assert documents and {doc.metadata["user_id"] for doc in documents} == {"bob"}
+
+
+def test_re_adding_a_tenant_replaces_its_vectors(flat_index):
+    _add(flat_index, "alice", "resume-v1", 2, seed=9, prefix="new")
+    assert flat_index.get_stats()["vectors"] == 2 + 4 + 6
+    documents = flat_index.search_by_vector("alice", _vectors(1, 0)[0], 20, file_hash="resume-v1")
+    texts = {doc.page_content for doc in documents}
+    assert texts == {"new 청크 0", "new 청크 1"}
+
+
+def test_replace_user_drops_the_users_other_files(flat_index):
+    flat_index.add("alice", "resume-v2", ["새 이력서"], _vectors(1, 7), [{}], replace_user=True)
+    assert flat_index.has("alice", "resume-v2")
+    assert not flat_index.has("alice", "resume-v1") and not flat_index.has("alice", "portfolio")
+    assert [text for text, _ in flat_index.user_chunks("alice")] == ["새 이력서"]
+    assert flat_index.has("bob", "resume-v1")
+
+
+def test_user_chunks_returns_only_the_users_vectors(flat_index):
+    chunks = flat_index.user_chunks("bob")
+    assert [text for text, _ in chunks] == [f"bob/resume-v1 청크 {i}" for i in range(6)]
+    np.testing.assert_array_equal(np.vstack([vector for _, vector in chunks]), _vectors(6, 3))
+
+
+def test_delete_user_removes_every_tenant_of_that_user_only(flat_index):
+    assert flat_index.delete_user("alice") == 9
+    assert flat_index.delete_user("alice") == 0
+    stats = flat_index.get_stats()
+    assert (stats["tenants"], stats["users"], stats["vectors"]) == (1, 1, 6)
+    assert flat_index.search_by_vector("alice", _vectors(1, 1)[0], 5) == []
+    assert len(flat_index.search_by_vector("bob", _vectors(1, 1)[0], 5)) == 5
+
+
+@pytest.mark.parametrize("index_type", ["sq_fp16", "sq8"])
+def test_compact_index_types_keep_tenant_isolation(index_type):
+    index = SharedVectorIndex(lambda: None, index_type)
+    _add(index, "alice", "h", 20, seed=1)
+    _add(index, "bob", "h", 20, seed=2)
+    query = _vectors(20, 2)[4]
+    documents = index.search_by_vector("bob", query, 3)
+    assert documents[0].page_content == "bob/h 청크 4"
+    assert {doc.metadata["user_id"] for doc in documents} == {"bob"}
+    assert index.user_chunks("bob") == []  # 근사 벡터는 증분 인덱싱에 재사용하지 않음
+    assert index.delete_user("alice") == 20
+    assert index.get_stats()["vectors"] == 20
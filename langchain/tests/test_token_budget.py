@@ -0,0 +1,80 @@
+# test_token_budget.py
+
+from langchain_core.documents import Document
+
+from token_budget import MIN_TRUNCATED_TOKENS, count_tokens, pack_documents
+
+SEPARATOR = "\n\n"
+
+
+def _docs(*texts):
+    return [Document(page_content=text, metadata={"rank": i}) for i, text in enumerate(texts)]
+
+
+def _cost(docs):
+    # pack_documents와 같은 방식: 본문 토큰 합 + 문서 사이 구분자 토큰
+    return sum(count_tokens(doc.page_content) for doc in docs) + count_tokens(SEPARATOR) * max(0, len(docs) - 1)
+
+
+def _long_text(tokens):
+    text = "주문 API 응답 지연을 캐시로 해결했습니다. "
+    while count_tokens(text) < tokens:
+        text += text
+    return text
+
+
+def test_no_budget_returns_input_unchanged():
+    docs = _docs("경력 사항", "보유 기술")
+    assert pack_documents(docs, None) is docs
+    assert pack_documents(docs, 0) is docs
+
+
+def test_exact_budget_packs_every_document():
+    docs = _docs("Spring Boot 기반 주문 API 개발", "Redis 캐시 적용으로 응답 시간 개선", "팀 코드 리뷰 문화 정착")
+    packed = pack_documents(docs, _cost(docs))
+    assert [doc.page_content for doc in packed] == [doc.page_content for doc in docs]
+    assert not any(doc.metadata.get("truncated") for doc in packed)
+
+
+def test_one_token_short_truncates_last_document_when_enough_budget_remains():
+    docs = _docs("Spring Boot 기반 주문 API 개발", _long_text(MIN_TRUNCATED_TOKENS * 2))
+    budget = _cost(docs) - 1
+    packed = pack_documents(docs, budget)
+    assert len(packed) == 2
+    assert packed[0] is docs[0]
+    assert packed[1].metadata == {"rank": 1, "truncated": True}
+    assert docs[1].page_content.startswith(packed[1].page_content)
+    assert _cost(packed) <= budget
+
+
+def test_last_document_is_dropped_when_remaining_budget_is_too_small():
+    docs = _docs("Spring Boot 기반 주문 API 개발", _long_text(MIN_TRUNCATED_TOKENS * 2))
+    budget = _cost(docs[:1]) + count_tokens(SEPARATOR) + MIN_TRUNCATED_TOKENS - 1
+    assert pack_documents(docs, budget) == docs[:1]
+
+
+def test_truncation_boundary_is_min_truncated_tokens():
+    docs = _docs("Spring Boot 기반 주문 API 개발", _long_text(MIN_TRUNCATED_TOKENS * 2))
+    budget = _cost(docs[:1]) + count_tokens(SEPARATOR) + MIN_TRUNCATED_TOKENS
+    packed = pack_documents(docs, budget)
+    assert len(packed) == 2 and packed[1].metadata["truncated"]
+    assert _cost(packed) <= budget
+
+
+def test_documents_after_the_overflowing_one_are_not_packed():
+    docs = _docs("경력 사항", _long_text(MIN_TRUNCATED_TOKENS * 4), "보유 기술")
+    packed = pack_documents(docs, _cost(docs[:1]) + 10)
+    assert packed == docs[:1]
+
+
+def test_duplicate_documents_are_skipped_and_do_not_use_budget():
+    docs = _docs("Redis 캐시 적용", "Redis 캐시 적용", "팀 코드 리뷰 문화 정착")
+    unique = [docs[0], docs[2]]
+    packed = pack_documents(docs, _cost(unique))
+    assert packed == unique
+
+
+def test_packed_total_never_exceeds_budget():
+    docs = _docs(*(f"{i}번째 프로젝트: " + _long_text(30) for i in range(6)))
+    for budget in range(1, _cost(docs) + 2, 17):
+        assert _cost(pack_documents(docs, budget)) <= budget
@@ -0,0 +1,108 @@
+# test_tool_response_cache.py
+
+import sqlite3
+
+import pytest
+
+import local_cache
+from local_cache import PRUNE_EVERY_WRITES, LruSqliteCache
+from tool_response_cache import ToolResponseCache
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(local_cache, "time", clock)
+    return clock
+
+
+def _rows(db_path, table="tool_responses"):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_key_ignores_whitespace_and_case_but_not_inputs():
+    key = ToolResponseCache.make_key("hash", "job_recommendation", {"job": "  Backend\n 개발자 "}, "gpt", 0)
+    assert key == ToolResponseCache.make_key("hash", "job_recommendation", {"job": "backend 개발자"}, "gpt", 0.0)
+    assert key != ToolResponseCache.make_key("other", "job_recommendation", {"job": "backend 개발자"}, "gpt", 0)
+    assert key != ToolResponseCache.make_key("hash", "job_recommendation", {"job": "backend 개발자"}, "gpt", 0.7)
+    assert key != ToolResponseCache.make_key("hash", "interview_questions", {"job": "backend 개발자"}, "gpt", 0)
+
+
+def test_only_deterministic_calls_are_cached_by_default():
+    cache = ToolResponseCache(LruSqliteCache(None, "tool_responses"))
+    assert cache.enabled_for(0)
+    assert not cache.enabled_for(0.7)
+    assert cache.enabled_for(0.7, use_cache=True)
+    assert not cache.enabled_for(0, use_cache=False)
+    assert ToolResponseCache(LruSqliteCache(None, "t"), cache_all_temperatures=True).enabled_for(0.7)
+
+
+def test_result_round_trips_through_disk(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    ToolResponseCache(LruSqliteCache(db_path, "tool_responses")).set("k", '{"answer": "한글 결과"}')
+    reopened = ToolResponseCache(LruSqliteCache(db_path, "tool_responses"))
+    assert reopened.get("k") == '{"answer": "한글 결과"}'
+    assert reopened.get("missing") is None
+    stats = reopened.get_stats()
+    assert (stats["disk_hits"], stats["misses"]) == (1, 1)
+
+
+def test_expired_entries_are_misses_in_memory_and_on_disk(tmp_path, clock):
+    db_path = str(tmp_path / "cache.sqlite3")
+    store = LruSqliteCache(db_path, "tool_responses", ttl_seconds=60)
+    store.set("k", b"v")
+    clock.now += 30
+    assert store.get("k") == b"v"
+
+    clock.now += 31
+    assert store.get("k") is None
+    assert LruSqliteCache(db_path, "tool_responses", ttl_seconds=60).get("k") is None
+    stats = store.get_stats()
+    assert (stats["memory_hits"], stats["misses"], stats["expired"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_expired_rows_are_deleted_when_the_file_is_opened(tmp_path, clock):
+    db_path = str(tmp_path / "cache.sqlite3")
+    LruSqliteCache(db_path, "tool_responses", ttl_seconds=60).set_many({"a": b"1", "b": b"2"})
+    clock.now += 61
+    store = LruSqliteCache(db_path, "tool_responses", ttl_seconds=60)
+    store.set("c", b"3")
+    assert _rows(db_path) == 1
+    assert store.get_stats()["pruned"] == 2
+
+
+def test_disk_rows_are_bounded_oldest_first(tmp_path, clock):
+    db_path = str(tmp_path / "cache.sqlite3")
+    store = LruSqliteCache(db_path, "tool_responses", max_items=10, max_disk_items=5)
+    for i in range(PRUNE_EVERY_WRITES):
+        clock.now += 1
+        store.set(f"k{i}", b"v")
+    assert _rows(db_path) == 5
+    assert store.get_stats()["memory_items"] == 10
+
+    reopened = LruSqliteCache(db_path, "tool_responses")
+    last = PRUNE_EVERY_WRITES - 1
+    assert reopened.get(f"k{last}") == b"v"
+    assert reopened.get(f"k{last - 5}") is None
+
+
+def test_old_files_without_created_at_are_migrated(tmp_path, clock):
+    db_path = str(tmp_path / "cache.sqlite3")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE tool_responses (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        conn.execute("INSERT INTO tool_responses VALUES ('old', x'01')")
+
+    assert LruSqliteCache(db_path, "tool_responses").get("old") == b"\x01"
+    # 저장 시각을 알 수 없는 이전 행은 TTL이 있으면 만료로 취급
+    assert LruSqliteCache(db_path, "tool_responses", ttl_seconds=60).get("old") is None
+    assert _rows(db_path) == 0
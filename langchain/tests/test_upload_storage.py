@@ -0,0 +1,95 @@
+# test_upload_storage.py
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+pytest.importorskip("multipart")
+
+from fastapi import FastAPI, File, Request, UploadFile  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from upload_storage import (  # noqa: E402
+    MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware, UploadTooLargeError, save_upload_streaming,
+)
+
+MAX_BYTES = 1024
+UPLOAD_PATH = "/api/resume/upload"
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.state.handled = 0
+
+    @app.post(UPLOAD_PATH)
+    async def upload(file: UploadFile = File(...)):
+        app.state.handled += 1
+        size, file_hash = await save_upload_streaming(file, str(tmp_path / file.filename), MAX_BYTES)
+        return {"size": size, "hash": file_hash}
+
+    @app.post("/api/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(UploadSizeLimitMiddleware, path=UPLOAD_PATH, max_bytes=MAX_BYTES, detail="too large")
+    with TestClient(app) as test_client:
+        test_client.app_state = app.state
+        yield test_client
+
+
+def _multipart(size):
+    boundary = "test-boundary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"resume.txt\"\r\n"
+        f"Content-Type: text/plain\r\n\r\n"
+    ).encode() + b"a" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+
+def test_upload_within_limit_is_saved(client):
+    response = client.post(UPLOAD_PATH, files={"file": ("resume.txt", b"a" * MAX_BYTES, "text/plain")})
+    assert response.status_code == 200
+    assert response.json() == {"size": MAX_BYTES, "hash": hashlib.sha256(b"a" * MAX_BYTES).hexdigest()}
+
+
+def test_declared_content_length_over_limit_is_rejected_before_the_body(client):
+    body, headers = _multipart(MAX_BYTES + MULTIPART_OVERHEAD_BYTES + 1)
+    response = client.post(UPLOAD_PATH, content=body, headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "too large"}
+    assert client.app_state.handled == 0
+
+
+def test_chunked_body_over_limit_is_rejected_while_streaming(client):
+    body, headers = _multipart(MAX_BYTES + MULTIPART_OVERHEAD_BYTES + 1)
+
+    def chunks():
+        for start in range(0, len(body), 8192):
+            yield body[start:start + 8192]
+
+    response = client.post(UPLOAD_PATH, content=chunks(), headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "too large"}
+    assert client.app_state.handled == 0
+
+
+def test_other_paths_are_not_limited(client):
+    response = client.post("/api/echo", content=b"a" * (MAX_BYTES + MULTIPART_OVERHEAD_BYTES + 1))
+    assert response.status_code == 200
+
+
+def test_save_upload_streaming_removes_partial_file_over_limit(tmp_path):
+    class Upload:
+        def __init__(self, data):
+            self._buffer = io.BytesIO(data)
+
+        async def read(self, size):
+            return self._buffer.read(size)
+
+    dest = tmp_path / "resume.txt"
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload_streaming(Upload(b"a" * 100), str(dest), 50, chunk_size=10))
+    assert list(tmp_path.iterdir()) == []
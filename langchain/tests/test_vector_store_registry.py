@@ -0,0 +1,94 @@
+# test_vector_store_registry.py
+
+import threading
+import time
+
+import pytest
+
+from vector_store_registry import DEFAULT_CHUNK_OVERLAP, DEFAULT_CHUNK_SIZE, VectorStoreRegistry, compute_file_hash
+
+
+class CountingBuilder:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, file_path, chunk_size, chunk_overlap, file_hash=None):
+        with self._lock:
+            self.calls.append((chunk_size, chunk_overlap, file_hash))
+        time.sleep(self.delay)
+        return object()
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("홍길동 이력서\n주요 기술: Python", encoding="utf-8")
+    return str(path)
+
+
+def test_index_built_at_upload_is_reused_by_tools(resume):
+    registry = VectorStoreRegistry()
+    builder = CountingBuilder()
+    uploaded = registry.get_or_build(resume, builder, 500, 50)
+    # 툴은 청크 파라미터 없이 조회해도 업로드 시의 인덱스를 그대로 사용
+    assert registry.get_or_build(resume, builder) is uploaded
+    assert registry.get(resume) is uploaded
+    assert builder.calls == [(500, 50, compute_file_hash(resume))]
+
+
+def test_default_chunk_params_without_an_upload(resume):
+    registry = VectorStoreRegistry()
+    builder = CountingBuilder()
+    registry.get_or_build(resume, builder)
+    assert builder.calls[0][:2] == (DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP)
+
+
+def test_changed_file_content_is_rebuilt(resume):
+    registry = VectorStoreRegistry()
+    builder = CountingBuilder()
+    first = registry.get_or_build(resume, builder, 500, 50)
+    with open(resume, "a", encoding="utf-8") as f:
+        f.write("\n경력: 3년")
+    second = registry.get_or_build(resume, builder, 500, 50)
+    assert second is not first
+    assert builder.calls[1][2] == compute_file_hash(resume) != builder.calls[0][2]
+
+
+def test_concurrent_requests_build_once(resume):
+    registry = VectorStoreRegistry()
+    builder = CountingBuilder(delay=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get_or_build(resume, builder, 500, 50)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builder.calls) == 1
+    assert len({id(result) for result in results}) == 1
+
+
+def test_build_locks_are_released_when_not_kept_in_memory(tmp_path):
+    registry = VectorStoreRegistry(keep_in_memory=False)
+    builder = CountingBuilder()
+    for i in range(20):
+        path = tmp_path / f"resume-{i}.txt"
+        path.write_text(f"이력서 {i}", encoding="utf-8")
+        registry.get_or_build(str(path), builder, 500, 50)
+    assert len(builder.calls) == 20
+    assert registry._build_locks == {}
+    assert registry._entries == {}
+
+
+def test_build_lock_is_released_when_the_builder_fails(resume):
+    registry = VectorStoreRegistry()
+
+    def failing_builder(*args, **kwargs):
+        raise RuntimeError("embedding failed")
+
+    with pytest.raises(RuntimeError):
+        registry.get_or_build(resume, failing_builder, 500, 50)
+    assert registry._build_locks == {}
+    assert registry.get(resume, 500, 50) is None
@@ -0,0 +1,119 @@
+# token_budget.py
+
+# 토큰 수 기준 청크 분할과 프롬프트 {context} 토큰 예산 관리
+# - 토큰 수는 tiktoken(기본 cl100k_base, gpt-3.5-turbo와 같은 인코딩)으로 계산합니다.
+# - tiktoken은 처음 사용할 때 인코딩 파일을 인터넷에서 내려받습니다(TIKTOKEN_CACHE_DIR에 캐시).
+#   오프라인이거나 외부 접속이 막힌 Pod처럼 파일을 받을 수 없으면 문자 종류별 추정치로 대신하며,
+#   이때 청크 크기와 {context} 예산은 실제 토큰 수와 다를 수 있습니다. (/api/metrics의 tokenizer가 "estimate")
+#   Docker 이미지는 빌드 시 인코딩 파일을 미리 받아 둡니다.
+import os
+import threading
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+
+# 예산이 이보다 적게 남으면 마지막 문서를 잘라 넣지 않습니다.
+MIN_TRUNCATED_TOKENS = 50
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "documents_in": 0, "documents_packed": 0, "documents_truncated": 0, "tokens_packed": 0}
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"tiktoken 인코딩({TOKENIZER_ENCODING})을 불러오지 못해 토큰 수를 추정합니다: {e}")
+                _encoding = None
+            _encoding_loaded = True
+    return _encoding
+
+
+def _estimate_tokens(text: str) -> int:
+    # ASCII는 약 4자당 1토큰, 한글 등 그 외 문자는 약 1자당 1토큰
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    텍스트를 앞에서부터 max_tokens 토큰까지만 남깁니다.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    total = _estimate_tokens(text)
+    if total <= max_tokens:
+        return text
+    # 비율로 자른 뒤 추정치가 예산 안에 들어올 때까지 줄임 (ASCII 올림 때문에 1~2토큰 넘칠 수 있음)
+    end = max(0, len(text) * max_tokens // total)
+    while end > 0 and _estimate_tokens(text[:end]) > max_tokens:
+        end -= 1
+    return text[:end]
+
+
+def pack_documents(documents: List[Document], max_tokens: Optional[int],
+                   separator: str = "\n\n") -> List[Document]:
+    """
+    검색 순위대로 문서를 담되, 본문 합계가 max_tokens를 넘지 않도록 합니다.
+    같은 본문의 중복 청크는 건너뛰고, 예산이 남으면 마지막 문서는 잘라서 넣습니다.
+    max_tokens가 없거나 0 이하이면 그대로 반환합니다.
+    """
+    if not max_tokens or max_tokens <= 0:
+        return documents
+
+    separator_tokens = count_tokens(separator)
+    packed, seen, used, truncated = [], set(), 0, 0
+    for doc in documents:
+        if doc.page_content in seen:
+            continue
+        seen.add(doc.page_content)
+        cost = count_tokens(doc.page_content) + (separator_tokens if packed else 0)
+        if used + cost <= max_tokens:
+            packed.append(doc)
+            used += cost
+            continue
+        remaining = max_tokens - used - (separator_tokens if packed else 0)
+        if remaining >= MIN_TRUNCATED_TOKENS:
+            packed.append(Document(page_content=truncate_to_tokens(doc.page_content, remaining),
+                                   metadata={**doc.metadata, "truncated": True}))
+            used += remaining + (separator_tokens if len(packed) > 1 else 0)
+            truncated = 1
+        break
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["documents_in"] += len(documents)
+        _stats["documents_packed"] += len(packed)
+        _stats["documents_truncated"] += truncated
+        _stats["tokens_packed"] += used
+    return packed
+
+
+def get_packing_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["avg_context_tokens"] = round(stats["tokens_packed"] / stats["calls"], 1) if stats["calls"] else 0.0
+    stats["tokenizer"] = TOKENIZER_ENCODING if _get_encoding() is not None else "estimate"
+    return stats
@@ -0,0 +1,64 @@
+# tool_response_cache.py
+
+# 같은 입력의 툴 호출 결과 캐시 (메모리 LRU + SQLite, TTL 만료와 행 수 제한은 LruSqliteCache가 담당)
+# 키: (파일 내용 해시, 툴 이름, 정규화한 파라미터, 모델, temperature, 캐시 버전)
+# temperature가 0인 호출은 결과가 결정적이므로 기본으로 캐시하고, 그 외에는 요청한 경우(use_cache=true)에만 캐시합니다.
+import hashlib
+import json
+import re
+from typing import Optional
+
+from local_cache import LruSqliteCache
+
+# 툴 프롬프트나 결과 형식이 바뀌면 버전을 올립니다. (이전 버전 결과는 사용하지 않음)
+TOOL_CACHE_VERSION = 2
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_params(params: dict) -> dict:
+    """
+    결과에 영향을 주지 않는 표기 차이(앞뒤/연속 공백, 영문 대소문자)를 없앤 파라미터를 반환합니다.
+    """
+    normalized = {}
+    for name, value in sorted(params.items()):
+        if isinstance(value, str):
+            value = _WHITESPACE.sub(" ", value).strip().lower()
+        normalized[name] = value
+    return normalized
+
+
+class ToolResponseCache:
+    """
+    툴 결과(JSON 문자열)를 저장하고 조회합니다.
+    """
+
+    def __init__(self, store: LruSqliteCache, cache_all_temperatures: bool = False):
+        self.store = store
+        self.cache_all_temperatures = cache_all_temperatures
+
+    def enabled_for(self, temperature: float, use_cache: Optional[bool] = None) -> bool:
+        """
+        use_cache가 지정되면 그 값을 따르고, 아니면 temperature가 0일 때만(또는 전체 허용 설정 시) 캐시합니다.
+        """
+        if use_cache is not None:
+            return bool(use_cache)
+        return self.cache_all_temperatures or float(temperature) == 0.0
+
+    @staticmethod
+    def make_key(file_hash: str, tool_name: str, params: dict, model: str, temperature: float) -> str:
+        payload = json.dumps(
+            [TOOL_CACHE_VERSION, file_hash, tool_name, normalize_params(params), model, round(float(temperature), 2)],
+            ensure_ascii=False, sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.store.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, result: str):
+        self.store.set(key, result.encode("utf-8"))
+
+    def get_stats(self) -> dict:
+        return self.store.get_stats()
@@ -0,0 +1,119 @@
+# upload_storage.py
+
+# 업로드 파일을 청크 단위로 디스크에 저장합니다.
+# - 파일 쓰기는 별도 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+# - 저장하면서 sha256 해시를 함께 계산하고, 크기 제한을 넘는 즉시 중단합니다.
+# - 업로드 경로의 요청 본문은 ASGI 미들웨어에서 받는 대로 크기를 세어, multipart 파싱(임시 파일 기록) 중에도
+#   제한을 넘는 순간 중단합니다. (Content-Length 헤더가 없는 chunked 업로드 포함)
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Tuple
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# multipart 경계/헤더 등 파일 본문 외의 여유분
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """
+    업로드 파일이 허용된 최대 크기를 넘었을 때 발생합니다.
+    """
+
+
+def content_length_exceeds(headers, max_bytes: int) -> bool:
+    """
+    Content-Length 헤더 기준으로 요청 본문이 제한을 넘는지 확인합니다.
+    본문을 받기 전에 큰 업로드를 거절하는 데 사용합니다.
+    """
+    content_length = headers.get("content-length")
+    if not content_length or not content_length.isdigit():
+        return False
+    return int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES
+
+
+class UploadSizeLimitMiddleware:
+    """
+    path로 들어오는 요청 본문의 크기를 제한하는 ASGI 미들웨어입니다. 다른 경로(SSE 스트리밍 등)는 그대로 통과시킵니다.
+    - Content-Length가 제한을 넘으면 본문을 받기 전에 413으로 응답합니다.
+    - 그 외에는 receive로 받은 바이트 수를 누적하여 제한을 넘는 순간 HTTPException(413)을 발생시킵니다.
+      (FastAPI는 본문 파싱 중 발생한 HTTPException을 그대로 응답으로 변환)
+    """
+
+    def __init__(self, app, path: str, max_bytes: int, detail: str):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+        self.detail = detail
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        from fastapi import HTTPException, status
+        from fastapi.responses import JSONResponse
+        from starlette.datastructures import Headers
+
+        too_large = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        if content_length_exceeds(Headers(scope=scope), self.max_bytes):
+            await JSONResponse(status_code=too_large, content={"detail": self.detail})(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD_BYTES
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=too_large, detail=self.detail)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            # 앱이 응답으로 바꾸지 못한 경우(본문 파싱 밖에서 발생)에만 직접 응답
+            if e.status_code != too_large or response_started:
+                raise
+            await JSONResponse(status_code=too_large, content={"detail": self.detail})(scope, receive, send)
+
+
+async def save_upload_streaming(upload, dest_path: str, max_bytes: int,
+                                chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[int, str]:
+    """
+    UploadFile 내용을 임시 파일에 청크 단위로 기록한 뒤 dest_path로 교체합니다.
+    (저장된 바이트 수, sha256 해시)를 반환하며, 크기 제한을 넘으면 UploadTooLargeError를 발생시킵니다.
+    """
+    digest = hashlib.sha256()
+    written = 0
+    tmp_path = f"{dest_path}.part-{uuid.uuid4().hex[:8]}"
+    buffer = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLargeError(f"파일 크기가 최대 허용 크기({max_bytes} bytes)를 초과했습니다.")
+            digest.update(chunk)
+            await asyncio.to_thread(buffer.write, chunk)
+        await asyncio.to_thread(buffer.close)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        buffer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written, digest.hexdigest()
@@ -0,0 +1,177 @@
+# vector_store_registry.py
+
+# 업로드 시 생성한 FAISS 벡터 저장소를 재사용하기 위한 레지스트리
+# 키: (파일 절대 경로, 파일 내용 해시, chunk_size, chunk_overlap)
+# index_store가 주어지면 메모리에 없는 인덱스를 디스크에서 먼저 찾고, 새로 만든 인덱스는 디스크에 저장합니다.
+# keep_in_memory=False이면 생성/로드한 저장소를 보관하지 않고 반환만 합니다. (공유 인덱스에 복사하여 사용하는 경우)
+import os
+import hashlib
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+# 툴 호출 시 업로드 기록이 없는 파일에 사용할 기본 청크 파라미터
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHUNK_OVERLAP = 100
+
+# 파일 해시 계산 결과 캐시 {절대 경로: (크기, 수정 시각, sha256)}
+_file_hash_cache: Dict[str, Tuple[int, int, str]] = {}
+_file_hash_lock = threading.Lock()
+
+
+def compute_file_hash(file_path: str) -> str:
+    """
+    파일 내용의 sha256 해시를 계산합니다.
+    크기와 수정 시각이 그대로인 파일은 이전에 계산한 값을 재사용합니다.
+    """
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    with _file_hash_lock:
+        cached = _file_hash_cache.get(abs_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+    digest = hashlib.sha256()
+    with open(abs_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    file_hash = digest.hexdigest()
+
+    with _file_hash_lock:
+        _file_hash_cache[abs_path] = (stat.st_size, stat.st_mtime_ns, file_hash)
+    return file_hash
+
+
+def remember_file_hash(file_path: str, file_hash: str):
+    """
+    업로드 중 스트리밍으로 계산한 해시를 등록하여 이후 파일을 다시 읽지 않도록 합니다.
+    """
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    with _file_hash_lock:
+        _file_hash_cache[abs_path] = (stat.st_size, stat.st_mtime_ns, file_hash)
+
+
+class VectorStoreRegistry:
+    """
+    파일 경로, 내용 해시, 청크 파라미터별로 벡터 저장소를 보관합니다.
+    같은 파일 내용에 대해서는 임베딩을 한 번만 수행하도록 보장합니다.
+    """
+
+    def __init__(self, index_store=None, keep_in_memory: bool = True):
+        self.index_store = index_store
+        self.keep_in_memory = keep_in_memory
+        self._lock = threading.Lock()
+        self._entries = {}       # {(경로, 해시, chunk_size, chunk_overlap): vectorstore}
+        self._latest = {}        # {(경로, 해시): 가장 최근에 등록된 (chunk_size, chunk_overlap)}
+        self._build_locks = {}   # {키: [잠금, 사용 중인 요청 수]} 같은 키의 중복 생성 방지 (생성이 끝나면 제거)
+
+    @staticmethod
+    def _file_key(file_path: str, file_hash: Optional[str] = None) -> Tuple[str, str]:
+        abs_path = os.path.abspath(file_path)
+        return abs_path, file_hash or compute_file_hash(abs_path)
+
+    def _resolve_params(self, file_key, chunk_size, chunk_overlap):
+        # 청크 파라미터가 지정되지 않으면 업로드 시 사용한 값을 우선 사용
+        if chunk_size is None and chunk_overlap is None:
+            latest = self._latest.get(file_key)
+            if latest:
+                return latest
+            if self.index_store is not None:
+                # 재시작 후에는 디스크에 저장된 인덱스의 파라미터를 사용
+                latest = self.index_store.latest_params(file_key[1])
+                if latest:
+                    return latest
+        return (
+            DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size,
+            DEFAULT_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap,
+        )
+
+    def _drop_stale(self, abs_path: str, file_hash: str):
+        # 같은 경로에 다른 내용이 덮어써진 경우 이전 인덱스는 더 이상 사용하지 않음
+        for key in [k for k in self._entries if k[0] == abs_path and k[1] != file_hash]:
+            del self._entries[key]
+        for key in [k for k in self._latest if k[0] == abs_path and k[1] != file_hash]:
+            del self._latest[key]
+
+    def register(self, file_path: str, vectorstore, chunk_size: int, chunk_overlap: int,
+                 file_hash: Optional[str] = None):
+        """
+        이미 생성된 벡터 저장소를 레지스트리에 등록합니다.
+        """
+        abs_path, file_hash = self._file_key(file_path, file_hash)
+        with self._lock:
+            self._drop_stale(abs_path, file_hash)
+            if self.keep_in_memory:
+                self._entries[(abs_path, file_hash, chunk_size, chunk_overlap)] = vectorstore
+            self._latest[(abs_path, file_hash)] = (chunk_size, chunk_overlap)
+
+    def get(self, file_path: str, chunk_size: Optional[int] = None,
+            chunk_overlap: Optional[int] = None, file_hash: Optional[str] = None):
+        """
+        등록된 벡터 저장소를 반환합니다. 없으면 None을 반환합니다.
+        """
+        file_key = self._file_key(file_path, file_hash)
+        with self._lock:
+            params = self._resolve_params(file_key, chunk_size, chunk_overlap)
+            return self._entries.get(file_key + params)
+
+    def get_or_build(self, file_path: str, builder: Callable, chunk_size: Optional[int] = None,
+                     chunk_overlap: Optional[int] = None, file_hash: Optional[str] = None):
+        """
+        등록된 벡터 저장소를 반환하고, 없으면 디스크에서 로드하거나
+        builder(file_path, chunk_size, chunk_overlap, file_hash=...)로 생성한 뒤 등록합니다.
+        builder는 전달받은 해시의 내용으로만 생성해야 하며, 파일 내용이 그 해시와 다르면 예외를 발생시켜야 합니다.
+        (예외가 발생하면 디스크에 저장/등록하지 않으므로 다른 내용의 인덱스가 이 해시로 남지 않음)
+        청크 파라미터를 생략하면 해당 파일 업로드 시 사용한 값을 그대로 사용합니다.
+        """
+        file_key = self._file_key(file_path, file_hash)
+        with self._lock:
+            params = self._resolve_params(file_key, chunk_size, chunk_overlap)
+            key = file_key + params
+            vectorstore = self._entries.get(key)
+            if vectorstore is not None:
+                return vectorstore
+            build_lock = self._build_locks.setdefault(key, [threading.Lock(), 0])
+            build_lock[1] += 1
+
+        try:
+            with build_lock[0]:
+                # 다른 요청이 먼저 생성했는지 다시 확인
+                with self._lock:
+                    vectorstore = self._entries.get(key)
+                if vectorstore is not None:
+                    return vectorstore
+
+                if self.index_store is not None:
+                    vectorstore = self.index_store.load(file_key[1], params[0], params[1])
+                if vectorstore is None:
+                    vectorstore = builder(file_path, params[0], params[1], file_hash=file_key[1])
+                    self._persist(vectorstore, file_key, params)
+                self.register(file_path, vectorstore, params[0], params[1], file_key[1])
+                return vectorstore
+        finally:
+            # 마지막으로 잠금을 사용한 요청이 제거 (keep_in_memory=False여도 키별 잠금이 쌓이지 않음)
+            with self._lock:
+                build_lock[1] -= 1
+                if build_lock[1] == 0:
+                    del self._build_locks[key]
+
+    def _persist(self, vectorstore, file_key, params):
+        # 디스크 저장 실패는 요청 실패로 이어지지 않도록 로그만 남김
+        if self.index_store is None:
+            return
+        try:
+            self.index_store.save(vectorstore, file_key[1], params[0], params[1], source_path=file_key[0])
+        except Exception as e:
+            print(f"벡터 인덱스 저장 중 오류 발생: {e}")
+
+    def evict(self, file_path: str):
+        """
+        해당 파일 경로의 모든 벡터 저장소를 레지스트리에서 제거합니다.
+        """
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == abs_path]:
+                del self._entries[key]
+            for key in [k for k in self._latest if k[0] == abs_path]:
+                del self._latest[key]